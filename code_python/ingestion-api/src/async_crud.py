@@ -0,0 +1,43 @@
+import datetime as dt
+from datetime import datetime
+from typing import List, Sequence, Optional
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from .models import Record, RecordCreate
+from . import rollups
+
+async def create_record(db: AsyncSession, record: RecordCreate) -> Record:
+    """
+    Async crud.create_record.
+    """
+    row = record.model_dump()
+    row["timestamp"] = datetime.now(dt.UTC).replace(tzinfo=None)
+    db_record = Record(**row)
+    db.add(db_record)
+    await db.run_sync(rollups.add_rows, [row])
+    await db.commit()
+    await db.refresh(db_record)
+    return db_record
+
+async def insert_records(db: AsyncSession, records: Sequence[RecordCreate]) -> List[int]:
+    """
+    Async crud.insert_records: one INSERT ... RETURNING, one commit,
+    ids in input order.
+    """
+    if not records:
+        return []
+
+    now = datetime.now(dt.UTC).replace(tzinfo=None)
+    rows = [{**record.model_dump(), "timestamp": now} for record in records]
+    statement = insert(Record).returning(Record.id, sort_by_parameter_order=True)
+    try:
+        ids = list(await db.scalars(statement, rows))
+        await db.run_sync(rollups.add_rows, rows)
+        await db.commit()
+    except Exception:
+        await db.rollback()
+        raise
+    return ids
+
+async def get_record(db: AsyncSession, record_id: int) -> Optional[Record]:
+    return (await db.scalars(select(Record).where(Record.id == record_id))).first()
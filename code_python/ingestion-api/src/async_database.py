@@ -0,0 +1,49 @@
+from typing import Tuple, AsyncIterator
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+from .config import Settings, get_settings
+from .database import _sqlite_pragmas
+
+def async_url(url: str) -> str:
+    """
+    Maps a database URL to its asyncio driver: sqlite:// becomes sqlite+aiosqlite://.
+    """
+    parsed = make_url(url)
+    if parsed.drivername in ("sqlite", "sqlite+pysqlite"):
+        parsed = parsed.set(drivername="sqlite+aiosqlite")
+    return parsed.render_as_string(hide_password=False)
+
+def create_async_engines(settings: Settings) -> Tuple[AsyncEngine, AsyncEngine]:
+    """
+    Async counterpart of database.create_engines: one writer connection and
+    a pool of read_pool_size query-only readers, with the same pragmas.
+    """
+    url = async_url(settings.database_url)
+    write_engine = create_async_engine(url, pool_size=1, max_overflow=0)
+    read_engine = create_async_engine(url, pool_size=settings.read_pool_size, max_overflow=0)
+    if write_engine.dialect.name == "sqlite":
+        # Pool events are only available on the sync engine behind the async one
+        event.listen(write_engine.sync_engine, "connect", _sqlite_pragmas(settings, read_only=False))
+        event.listen(read_engine.sync_engine, "connect", _sqlite_pragmas(settings, read_only=True))
+    return write_engine, read_engine
+
+engine, read_engine = create_async_engines(get_settings())
+
+# expire_on_commit=False: attributes cannot be lazily refreshed outside an await
+AsyncSessionLocal = async_sessionmaker(engine, autoflush=False, expire_on_commit=False)
+AsyncReadSessionLocal = async_sessionmaker(read_engine, autoflush=False, expire_on_commit=False)
+
+async def get_db() -> AsyncIterator[AsyncSession]:
+    """
+    Dependency helper to yield an async read-only session from the read pool.
+    """
+    async with AsyncReadSessionLocal() as db:
+        yield db
+
+async def get_write_db() -> AsyncIterator[AsyncSession]:
+    """
+    Dependency helper to yield an async session on the single writer connection.
+    """
+    async with AsyncSessionLocal() as db:
+        yield db
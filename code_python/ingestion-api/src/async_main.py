@@ -0,0 +1,88 @@
+from contextlib import asynccontextmanager
+from typing import Optional
+from fastapi import FastAPI, Depends, HTTPException, Request, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from .async_database import engine, get_db, get_write_db
+from .database import Base
+from .models import RecordCreate, RecordResponse, BatchResponse
+from .batch import parse_batch, BatchFormatError, BatchTooLargeError
+from .cache import ResponseCache, get_record_cache
+from .partitions import get_partitions
+from . import async_crud
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Creates the tables on startup and closes the pools on shutdown.
+    """
+    if get_partitions() is not None:
+        raise RuntimeError("The async app does not support daily partitions (INGEST_PARTITION_BY_DAY).")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield
+    await engine.dispose()
+
+app = FastAPI(
+    title="High-Performance Ingestion API (async)",
+    description="The ingestion API on SQLAlchemy's asyncio extension: no endpoint uses the threadpool.",
+    version="1.0.0",
+    lifespan=lifespan
+)
+
+@app.post("/records/", response_model=RecordResponse, status_code=status.HTTP_201_CREATED)
+async def create_record(record: RecordCreate, db: AsyncSession = Depends(get_write_db)):
+    """
+    Ingest a new record into the system.
+    """
+    return await async_crud.create_record(db, record)
+
+@app.post("/records/batch", response_model=BatchResponse, status_code=status.HTTP_201_CREATED)
+async def create_records_batch(request: Request, db: AsyncSession = Depends(get_write_db)):
+    """
+    Ingest many records in one request and one transaction (see main.create_records_batch).
+    """
+    body = await request.body()
+    try:
+        parsed, errors = parse_batch(body, request.headers.get("content-type", ""))
+    except BatchTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except BatchFormatError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    new_ids = await async_crud.insert_records(db, [record for _, record in parsed])
+
+    ids = [None] * (len(parsed) + len(errors))
+    for (index, _), record_id in zip(parsed, new_ids):
+        ids[index] = record_id
+    return BatchResponse(inserted=len(new_ids), ids=ids, errors=errors)
+
+@app.get("/records/{record_id}", response_model=RecordResponse)
+async def read_record(
+    record_id: int,
+    db: AsyncSession = Depends(get_db),
+    record_cache: Optional[ResponseCache] = Depends(get_record_cache)
+):
+    """
+    Retrieve a specific record by ID, from the response cache when possible.
+    """
+    if record_cache is not None:
+        cached = record_cache.get(record_id)
+        if cached is not None:
+            return Response(content=cached, media_type="application/json")
+
+    db_record = await async_crud.get_record(db, record_id)
+    if db_record is None:
+        raise HTTPException(status_code=404, detail="Record not found")
+    if record_cache is None:
+        return db_record
+
+    body = RecordResponse.model_validate(db_record).model_dump_json().encode()
+    record_cache.put(record_id, body)
+    return Response(content=body, media_type="application/json")
+
+@app.get("/health")
+async def health_check():
+    """
+    Health check endpoint to ensure the service is running.
+    """
+    return {"status": "ok"}
@@ -0,0 +1,57 @@
+import json
+from typing import List, Tuple
+from pydantic import ValidationError
+from .models import RecordCreate, BatchItemError
+
+# Upper bound on items per batch request
+MAX_BATCH_SIZE = 10_000
+
+NDJSON_CONTENT_TYPES = ("application/x-ndjson", "application/ndjson", "application/jsonl")
+
+class BatchFormatError(ValueError):
+    """Raised when a batch body is neither a JSON array nor NDJSON"""
+    pass
+
+class BatchTooLargeError(BatchFormatError):
+    """Raised when a batch has more than MAX_BATCH_SIZE items"""
+    pass
+
+def _item_error(index: int, e: ValidationError) -> BatchItemError:
+    # Inputs and contexts can be large or not JSON-serializable; the location and message suffice
+    return BatchItemError(
+        index=index,
+        errors=e.errors(include_url=False, include_context=False, include_input=False)
+    )
+
+def parse_batch(body: bytes, content_type: str = "") -> Tuple[List[Tuple[int, RecordCreate]], List[BatchItemError]]:
+    """
+    Validates a batch body: a JSON array of records, or NDJSON (one record per
+    non-blank line). NDJSON is used for an NDJSON content type or when the
+    body does not start with '['.
+    Returns the valid records with their positions in the body, and the
+    errors for the invalid ones. Raises BatchFormatError for a body that
+    cannot be split into items at all, or BatchTooLargeError past MAX_BATCH_SIZE.
+    """
+    records: List[Tuple[int, RecordCreate]] = []
+    errors: List[BatchItemError] = []
+
+    is_ndjson = content_type.split(";")[0].strip() in NDJSON_CONTENT_TYPES or not body.lstrip().startswith(b"[")
+    if is_ndjson:
+        items = [line for line in body.splitlines() if line.strip()]
+        validate = RecordCreate.model_validate_json
+    else:
+        try:
+            items = json.loads(body)
+        except ValueError as e:
+            raise BatchFormatError(f"Invalid JSON array: {e}")
+        validate = RecordCreate.model_validate
+
+    if len(items) > MAX_BATCH_SIZE:
+        raise BatchTooLargeError(f"Batch has {len(items)} items; the limit is {MAX_BATCH_SIZE}.")
+
+    for index, item in enumerate(items):
+        try:
+            records.append((index, validate(item)))
+        except ValidationError as e:
+            errors.append(_item_error(index, e))
+    return records, errors
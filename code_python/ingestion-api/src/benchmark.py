@@ -0,0 +1,590 @@
+import argparse
+import asyncio
+import datetime as dt
+import json
+import os
+import random
+import statistics
+import tempfile
+import threading
+import time
+from contextlib import asynccontextmanager
+from typing import List, Dict, Any, Callable
+import httpx
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy.orm import sessionmaker
+from .config import Settings
+from .database import Base, create_engines, get_db, get_write_db, get_read_sessions, get_write_sessions
+from .buffer import WriteBuffer, get_write_buffer
+from .cache import ResponseCache, get_record_cache
+from .bloom import BloomFilter, get_idempotency_filter
+from .main import app
+from .models import Record
+from .compression import PayloadCodec, set_payload_codec, train_dictionary
+from .partitions import DailyPartitions, set_partitions
+from . import async_database, async_main, crud, rollups
+
+SEVERITIES = ["INFO", "INFO", "INFO", "DEBUG", "WARN", "ERROR"]
+
+METHODS = ["GET", "GET", "GET", "POST", "PUT", "DELETE"]
+
+def make_payload(i: int, rich: bool = False) -> Dict[str, Any]:
+    if not rich:
+        return {"request": i, "duration_ms": i % 500}
+    # Shaped like a typical access-log payload: repetitive keys, a few varying values
+    return {
+        "request_id": f"{i * 2654435761 % 2**32:08x}-{i % 10000:04d}",
+        "method": METHODS[i % len(METHODS)],
+        "path": f"/api/v1/{['orders', 'users', 'carts'][i % 3]}/{i * 7919 % 100000}",
+        "status": 500 if i % 50 == 0 else 200,
+        "duration_ms": i * 37 % 900,
+        "client": {"ip": f"10.0.{i % 256}.{i * 13 % 256}", "user_agent": "Mozilla/5.0 (X11; Linux x86_64) Firefox/131.0"},
+        "region": ["eu-west-1", "us-east-1"][i % 2]
+    }
+
+def make_records(count: int, rich_payload: bool = False, start: int = 0) -> List[Dict[str, Any]]:
+    return [
+        {
+            "service_name": f"service-{i % 8}",
+            "severity": SEVERITIES[i % len(SEVERITIES)],
+            "message": f"Request {i} handled",
+            "payload": make_payload(i, rich_payload)
+        }
+        for i in range(start, start + count)
+    ]
+
+def _session_dependency(session_factory: sessionmaker):
+    # Async like database.get_db, so teardown does not wait for a threadpool thread
+    async def override():
+        db = session_factory()
+        try:
+            yield db
+        finally:
+            db.close()
+    return override
+
+def use_database(settings: Settings):
+    """
+    Points the app at a fresh database configured by settings.
+    Returns the (writer, reader) engines and the writer session factory.
+    """
+    write_engine, read_engine = create_engines(settings)
+    Base.metadata.create_all(bind=write_engine)
+    session_factory = sessionmaker(autocommit=False, autoflush=False, bind=write_engine)
+    app.dependency_overrides[get_write_db] = _session_dependency(session_factory)
+    app.dependency_overrides[get_write_sessions] = lambda: session_factory
+    read_sessions = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
+    app.dependency_overrides[get_db] = _session_dependency(read_sessions)
+    app.dependency_overrides[get_read_sessions] = lambda: read_sessions
+    return write_engine, read_engine, session_factory
+
+def release_database(*engines):
+    app.dependency_overrides.pop(get_db, None)
+    app.dependency_overrides.pop(get_write_db, None)
+    app.dependency_overrides.pop(get_write_sessions, None)
+    app.dependency_overrides.pop(get_read_sessions, None)
+    for engine in engines:
+        engine.dispose()
+
+@asynccontextmanager
+async def use_async_database(settings: Settings):
+    """
+    Points the async app at the (existing) database configured by settings.
+    Must be entered on the event loop that will serve the requests.
+    """
+    write_engine, read_engine = async_database.create_async_engines(settings)
+
+    def session_dependency(engine):
+        sessions = async_sessionmaker(engine, autoflush=False, expire_on_commit=False)
+
+        async def override():
+            async with sessions() as db:
+                yield db
+        return override
+
+    async_main.app.dependency_overrides[async_database.get_write_db] = session_dependency(write_engine)
+    async_main.app.dependency_overrides[async_database.get_db] = session_dependency(read_engine)
+    try:
+        yield
+    finally:
+        async_main.app.dependency_overrides.pop(async_database.get_write_db, None)
+        async_main.app.dependency_overrides.pop(async_database.get_db, None)
+        await write_engine.dispose()
+        await read_engine.dispose()
+
+def post_single(records: List[Dict[str, Any]], args: argparse.Namespace, settings: Settings):
+    client = TestClient(app)
+    for record in records:
+        client.post("/records/", json=record).raise_for_status()
+
+def post_batch(records: List[Dict[str, Any]], args: argparse.Namespace, settings: Settings):
+    client = TestClient(app)
+    for start in range(0, len(records), args.batch_size):
+        client.post("/records/batch", json=records[start:start + args.batch_size]).raise_for_status()
+
+def post_ndjson(records: List[Dict[str, Any]], args: argparse.Namespace, settings: Settings):
+    client = TestClient(app)
+    for start in range(0, len(records), args.batch_size):
+        body = "\n".join(json.dumps(record) for record in records[start:start + args.batch_size])
+        client.post(
+            "/records/batch", content=body, headers={"Content-Type": "application/x-ndjson"}
+        ).raise_for_status()
+
+async def _concurrently(target: FastAPI, requests: List[Dict[str, Any]], concurrency: int):
+    """
+    Sends requests ({"method", "url", and httpx keyword arguments}) with at
+    most `concurrency` in flight, all on one event loop as under a real server.
+    """
+    transport = httpx.ASGITransport(app=target)
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+        slots = asyncio.Semaphore(concurrency)
+
+        async def send(request: Dict[str, Any]):
+            async with slots:
+                (await client.request(**request)).raise_for_status()
+
+        await asyncio.gather(*(send(request) for request in requests))
+
+def _posts(records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    return [{"method": "POST", "url": "/records/", "json": record} for record in records]
+
+def _keyed_posts(records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    return [
+        {"method": "POST", "url": "/records/", "json": record, "headers": {"Idempotency-Key": f"benchmark-{i}"}}
+        for i, record in enumerate(records)
+    ]
+
+def _reads(records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    # Ids 1..n exist once seed_records has run
+    return [{"method": "GET", "url": f"/records/{i + 1}"} for i in range(len(records))]
+
+def _hot_reads(records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    # Dashboard-like: the same 100 most recent records, over and over
+    hot = min(100, len(records))
+    return [{"method": "GET", "url": f"/records/{len(records) - i % hot}"} for i in range(len(records))]
+
+def post_concurrently(records: List[Dict[str, Any]], args: argparse.Namespace, settings: Settings):
+    asyncio.run(_concurrently(app, _posts(records), args.concurrency))
+
+def post_keyed(records: List[Dict[str, Any]], args: argparse.Namespace, settings: Settings):
+    asyncio.run(_concurrently(app, _keyed_posts(records), args.concurrency))
+
+def read_concurrently(records: List[Dict[str, Any]], args: argparse.Namespace, settings: Settings):
+    asyncio.run(_concurrently(app, _reads(records), args.concurrency))
+
+def read_hot(records: List[Dict[str, Any]], args: argparse.Namespace, settings: Settings):
+    asyncio.run(_concurrently(app, _hot_reads(records), args.concurrency))
+
+def _on_async_app(build: Callable[[List[Dict[str, Any]]], List[Dict[str, Any]]]):
+    def mode(records: List[Dict[str, Any]], args: argparse.Namespace, settings: Settings):
+        async def main():
+            async with use_async_database(settings):
+                await _concurrently(async_main.app, build(records), args.concurrency)
+        asyncio.run(main())
+    return mode
+
+def seed_records(records: List[Dict[str, Any]], session_factory: sessionmaker):
+    db = session_factory()
+    try:
+        crud.insert_rows(db, records)
+    finally:
+        db.close()
+
+# TestClient is not used as a context manager: its lifespan would create the default database
+MODES: Dict[str, Callable[[List[Dict[str, Any]], argparse.Namespace, Settings], None]] = {
+    "single": post_single,
+    "batch": post_batch,
+    "batch-ndjson": post_ndjson,
+    # Many clients sending single records at once, without and with group commit
+    "concurrent": post_concurrently,
+    "group-commit": post_concurrently,
+    # The same on the async app (src.async_main), which never uses the threadpool
+    "concurrent-async": _on_async_app(_posts),
+    # The same with a new Idempotency-Key per request, with and without the Bloom filter
+    "keyed": post_keyed,
+    "keyed-unfiltered": post_keyed,
+    # Many clients reading records by id, on the sync and the async app
+    "read": read_concurrently,
+    "read-async": _on_async_app(_reads),
+    # Repeated reads of a few records, with and without the response cache
+    "read-hot": read_hot,
+    "read-hot-uncached": read_hot,
+}
+
+# Modes that need the records in the database before the clock starts
+READ_MODES = {"read", "read-async", "read-hot", "read-hot-uncached"}
+
+def run(mode: str, records: List[Dict[str, Any]], args: argparse.Namespace, directory: str) -> float:
+    """
+    Ingests records through one endpoint into a new file-backed SQLite
+    database (so commits pay for real fsyncs), or for the read modes fetches
+    each of them back. Returns records per second.
+    """
+    settings = Settings(database_url=f"sqlite:///{os.path.join(directory, mode + '.db')}")
+    write_engine, read_engine, session_factory = use_database(settings)
+    write_buffer = WriteBuffer(session_factory) if mode == "group-commit" else None
+    app.dependency_overrides[get_write_buffer] = lambda: write_buffer
+    # A cold cache per mode, so that no mode reads another's entries
+    record_cache = None if mode == "read-hot-uncached" else ResponseCache()
+    app.dependency_overrides[get_record_cache] = lambda: record_cache
+    async_main.app.dependency_overrides[get_record_cache] = lambda: record_cache
+    idempotency_filter = None if mode == "keyed-unfiltered" else BloomFilter()
+    app.dependency_overrides[get_idempotency_filter] = lambda: idempotency_filter
+    try:
+        if mode in READ_MODES:
+            seed_records(records, session_factory)
+        start = time.perf_counter()
+        MODES[mode](records, args, settings)
+        elapsed = time.perf_counter() - start
+    finally:
+        app.dependency_overrides.pop(get_write_buffer, None)
+        app.dependency_overrides.pop(get_record_cache, None)
+        async_main.app.dependency_overrides.pop(get_record_cache, None)
+        app.dependency_overrides.pop(get_idempotency_filter, None)
+        release_database(write_engine, read_engine)
+    return len(records) / elapsed
+
+# SQLite profiles for the load test: the pre-WAL defaults against the configured defaults
+PROFILES: Dict[str, Dict[str, Any]] = {
+    "rollback": {
+        "sqlite_journal_mode": "DELETE",
+        "sqlite_synchronous": "FULL",
+        "sqlite_cache_size": -2000,
+        "sqlite_mmap_size": 0
+    },
+    "wal": {},
+}
+
+def load_test(profile: str, args: argparse.Namespace, directory: str) -> Dict[str, Any]:
+    """
+    Runs args.writers threads posting batches of args.batch_size records
+    while args.readers threads fetch random existing records by id, for
+    args.duration seconds. Returns read latency percentiles (ms), read and
+    write throughput, and the number of failed requests.
+    """
+    settings = Settings(
+        database_url=f"sqlite:///{os.path.join(directory, 'load-' + profile + '.db')}",
+        **PROFILES[profile]
+    )
+    write_engine, read_engine, _ = use_database(settings)
+    app.dependency_overrides[get_write_buffer] = lambda: None
+    # Failed requests are counted, not raised
+    client = TestClient(app, raise_server_exceptions=False)
+    seed = make_records(args.batch_size)
+    max_id = max(client.post("/records/batch", json=seed).json()["ids"])
+
+    stop = threading.Event()
+    lock = threading.Lock()
+    latencies: List[float] = []
+    counts = {"written": 0, "errors": 0}
+
+    def write():
+        while not stop.is_set():
+            response = client.post("/records/batch", json=seed)
+            with lock:
+                if response.is_success:
+                    counts["written"] += len(seed)
+                else:
+                    counts["errors"] += 1
+
+    def read(worker: int):
+        rng = random.Random(worker)
+        local = []
+        errors = 0
+        while not stop.is_set():
+            start = time.perf_counter()
+            response = client.get(f"/records/{rng.randint(1, max_id)}")
+            local.append(time.perf_counter() - start)
+            if not response.is_success:
+                errors += 1
+        with lock:
+            latencies.extend(local)
+            counts["errors"] += errors
+
+    threads = [threading.Thread(target=write) for _ in range(args.writers)]
+    threads += [threading.Thread(target=read, args=(i,)) for i in range(args.readers)]
+    try:
+        for thread in threads:
+            thread.start()
+        time.sleep(args.duration)
+        stop.set()
+        for thread in threads:
+            thread.join()
+    finally:
+        app.dependency_overrides.pop(get_write_buffer, None)
+        release_database(write_engine, read_engine)
+
+    latencies.sort()
+    return {
+        "reads/s": len(latencies) / args.duration,
+        "writes/s": counts["written"] / args.duration,
+        "p50 ms": statistics.median(latencies) * 1000 if latencies else 0.0,
+        "p99 ms": latencies[int(len(latencies) * 0.99)] * 1000 if latencies else 0.0,
+        "max ms": latencies[-1] * 1000 if latencies else 0.0,
+        "errors": counts["errors"]
+    }
+
+# Payload storage modes for the compression comparison: (codec, with dictionary)
+COMPRESSION_PROFILES = {
+    "none": ("none", False),
+    "zlib": ("zlib", False),
+    "zlib+dict": ("zlib", True),
+    "zstd": ("zstd", False),
+    "zstd+dict": ("zstd", True),
+}
+
+def compression_test(profile: str, records: List[Dict[str, Any]], args: argparse.Namespace, directory: str) -> Dict[str, Any]:
+    """
+    Stores records with one payload codec. Returns the stored payload size
+    (average bytes per record), the codec's own encode and decode time per
+    payload, and end-to-end ingest (batch POSTs) and export throughput.
+    """
+    name, with_dictionary = COMPRESSION_PROFILES[profile]
+    dictionary = None
+    if with_dictionary:
+        # Trained on other payloads than the ones measured
+        samples = [make_payload(i, rich=True) for i in range(len(records), len(records) + 2000)]
+        dictionary = train_dictionary(samples, name)
+    codec = PayloadCodec(name, dictionary=dictionary)
+
+    payloads = [record["payload"] for record in records]
+    start = time.perf_counter()
+    stored = [codec.encode(payload) for payload in payloads]
+    encode_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    for value in stored:
+        codec.decode(value)
+    decode_seconds = time.perf_counter() - start
+
+    settings = Settings(database_url=f"sqlite:///{os.path.join(directory, 'payload-' + profile + '.db')}")
+    write_engine, read_engine, _ = use_database(settings)
+    app.dependency_overrides[get_write_buffer] = lambda: None
+    set_payload_codec(codec)
+    try:
+        client = TestClient(app)
+        start = time.perf_counter()
+        for offset in range(0, len(records), args.batch_size):
+            client.post("/records/batch", json=records[offset:offset + args.batch_size]).raise_for_status()
+        ingest_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        exported = client.get("/records/export")
+        exported.raise_for_status()
+        export_seconds = time.perf_counter() - start
+
+        with write_engine.connect() as conn:
+            payload_bytes = conn.exec_driver_sql("SELECT SUM(LENGTH(CAST(payload AS BLOB))) FROM records").scalar()
+    finally:
+        set_payload_codec(None)
+        app.dependency_overrides.pop(get_write_buffer, None)
+        release_database(write_engine, read_engine)
+
+    return {
+        "bytes/rec": payload_bytes / len(records),
+        "encode us": encode_seconds / len(records) * 1e6,
+        "decode us": decode_seconds / len(records) * 1e6,
+        "ingest/s": len(records) / ingest_seconds,
+        "export/s": len(records) / export_seconds
+    }
+
+def retention_test(partitioned: bool, args: argparse.Namespace, directory: str) -> Dict[str, Any]:
+    """
+    Stores args.records records spread over args.days days, then removes the
+    oldest day: by DELETE on the single table, or by dropping its partition.
+    Returns the seconds taken and the database file size before and after.
+    """
+    name = "partitioned" if partitioned else "single-table"
+    path = os.path.join(directory, f"retention-{name}.db")
+    write_engine, read_engine, session_factory = use_database(Settings(database_url=f"sqlite:///{path}"))
+    partitions = DailyPartitions(retention_days=args.days - 1)
+    set_partitions(partitions if partitioned else None)
+    first_day = dt.datetime(2026, 1, 1)
+    step = dt.timedelta(days=args.days) / args.records
+    records = make_records(args.records)
+    for i, record in enumerate(records):
+        record["timestamp"] = first_day + step * i
+    try:
+        db = session_factory()
+        try:
+            for offset in range(0, len(records), args.batch_size):
+                crud.insert_rows(db, records[offset:offset + args.batch_size])
+            db.connection().exec_driver_sql("PRAGMA wal_checkpoint(TRUNCATE)")
+            size_before = os.path.getsize(path)
+
+            start = time.perf_counter()
+            if partitioned:
+                partitions.prune(db, on=(first_day + dt.timedelta(days=args.days)).date())
+            else:
+                db.execute(Record.__table__.delete().where(Record.timestamp < first_day + dt.timedelta(days=1)))
+                db.commit()
+            elapsed = time.perf_counter() - start
+            db.connection().exec_driver_sql("PRAGMA wal_checkpoint(TRUNCATE)")
+            size_after = os.path.getsize(path)
+        finally:
+            db.close()
+    finally:
+        set_partitions(None)
+        release_database(write_engine, read_engine)
+    return {"ms": elapsed * 1000, "MiB before": size_before / 2**20, "MiB after": size_after / 2**20}
+
+def stats_test(count: int, args: argparse.Namespace, directory: str) -> Dict[str, Any]:
+    """
+    Stores `count` records spread over a day, then times the dashboard count
+    by service and severity: GROUP BY over records, and from the rollup.
+    """
+    path = os.path.join(directory, f"stats-{count}.db")
+    write_engine, read_engine, session_factory = use_database(Settings(database_url=f"sqlite:///{path}"))
+    first_minute = dt.datetime(2026, 1, 1)
+    step = dt.timedelta(days=1) / count
+    records = make_records(count)
+    for i, record in enumerate(records):
+        record["timestamp"] = first_minute + step * i
+    group_by = select(Record.service_name, Record.severity, func.count()).group_by(Record.service_name, Record.severity)
+    try:
+        db = session_factory()
+        try:
+            for offset in range(0, len(records), args.batch_size):
+                crud.insert_rows(db, records[offset:offset + args.batch_size])
+            timings = {}
+            for name, query in (("group by ms", lambda: db.execute(group_by).all()), ("rollup ms", lambda: rollups.counts(db))):
+                start = time.perf_counter()
+                for _ in range(10):
+                    query()
+                timings[name] = (time.perf_counter() - start) / 10 * 1000
+        finally:
+            db.close()
+    finally:
+        release_database(write_engine, read_engine)
+    return {"records": count, **timings}
+
+def search_test(indexed: bool, args: argparse.Namespace, directory: str) -> Dict[str, Any]:
+    """
+    Stores args.records records, generated batch by batch, then looks up a
+    rare word (in one message) and a common one (in every message), 100
+    records at most: with FTS5, or with the full-text index dropped and a
+    LIKE '%word%' scan.
+    """
+    name = "fts5" if indexed else "like"
+    path = os.path.join(directory, f"search-{name}.db")
+    write_engine, read_engine, session_factory = use_database(Settings(database_url=f"sqlite:///{path}"))
+    try:
+        db = session_factory()
+        try:
+            if not indexed:
+                db.connection().exec_driver_sql("DROP TABLE records_fts")
+                for trigger in ("insert", "delete", "update"):
+                    db.connection().exec_driver_sql(f"DROP TRIGGER records_fts_{trigger}")
+                db.commit()
+            start = time.perf_counter()
+            for offset in range(0, args.records, args.batch_size):
+                crud.insert_rows(db, make_records(min(args.batch_size, args.records - offset), start=offset))
+            ingest_seconds = time.perf_counter() - start
+            db.connection().exec_driver_sql("PRAGMA wal_checkpoint(TRUNCATE)")
+
+            def find(word: str):
+                if indexed:
+                    return crud.search_records(db, word, limit=100)
+                return db.execute(select(Record.__table__).where(Record.message.like(f"%{word}%")).limit(100)).all()
+
+            timings = {}
+            for column, word in (("rare ms", str(args.records * 2 // 3)), ("common ms", "handled")):
+                start = time.perf_counter()
+                for _ in range(5):
+                    find(word)
+                timings[column] = (time.perf_counter() - start) / 5 * 1000
+        finally:
+            db.close()
+    finally:
+        release_database(write_engine, read_engine)
+    return {"ingest/s": args.records / ingest_seconds, "MiB": os.path.getsize(path) / 2**20, **timings}
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare single-record and batch ingestion throughput.")
+    parser.add_argument("--records", type=int, default=2000, help="Records ingested per mode.")
+    parser.add_argument("--batch-size", type=int, default=500, help="Records per batch request.")
+    parser.add_argument("--concurrency", type=int, default=64, help="In-flight requests in the concurrent modes.")
+    parser.add_argument("--modes", nargs="+", choices=list(MODES), default=list(MODES))
+    parser.add_argument(
+        "--load-test", action="store_true",
+        help="Instead, measure read latency while writes run, per SQLite profile."
+    )
+    parser.add_argument("--duration", type=float, default=5.0, help="Seconds per load test profile.")
+    parser.add_argument("--writers", type=int, default=2, help="Writer threads in the load test.")
+    parser.add_argument("--readers", type=int, default=4, help="Reader threads in the load test.")
+    parser.add_argument(
+        "--compression", action="store_true",
+        help="Instead, compare payload storage size and codec CPU cost per record."
+    )
+    parser.add_argument(
+        "--retention", action="store_true",
+        help="Instead, compare removing the oldest day by DELETE and by dropping its partition."
+    )
+    parser.add_argument("--days", type=int, default=14, help="Days of records in the retention comparison.")
+    parser.add_argument(
+        "--stats", action="store_true",
+        help="Instead, compare counting by service and severity with GROUP BY and from the rollup, at 1x, 10x and 100x --records."
+    )
+    parser.add_argument(
+        "--search", action="store_true",
+        help="Instead, compare full-text search against a LIKE scan over --records records."
+    )
+    args = parser.parse_args()
+
+    if args.search:
+        columns = ["ingest/s", "MiB", "rare ms", "common ms"]
+        print(f"{'search':<8}" + "".join(f"{column:>12}" for column in columns))
+        with tempfile.TemporaryDirectory() as directory:
+            for indexed in (False, True):
+                result = search_test(indexed, args, directory)
+                print(f"{'fts5' if indexed else 'like':<8}" + "".join(f"{result[column]:>12,.1f}" for column in columns))
+        return
+
+    if args.stats:
+        columns = ["group by ms", "rollup ms"]
+        print(f"{'records':>12}" + "".join(f"{column:>14}" for column in columns))
+        with tempfile.TemporaryDirectory() as directory:
+            for count in (args.records, args.records * 10, args.records * 100):
+                result = stats_test(count, args, directory)
+                print(f"{count:>12,}" + "".join(f"{result[column]:>14,.2f}" for column in columns))
+        return
+
+    if args.retention:
+        columns = ["ms", "MiB before", "MiB after"]
+        print(f"{'storage':<14}" + "".join(f"{column:>12}" for column in columns))
+        with tempfile.TemporaryDirectory() as directory:
+            for partitioned in (False, True):
+                result = retention_test(partitioned, args, directory)
+                name = "partitioned" if partitioned else "single-table"
+                print(f"{name:<14}" + "".join(f"{result[column]:>12,.1f}" for column in columns))
+        return
+
+    if args.compression:
+        records = make_records(args.records, rich_payload=True)
+        columns = ["bytes/rec", "encode us", "decode us", "ingest/s", "export/s"]
+        print(f"{'codec':<12}" + "".join(f"{column:>12}" for column in columns))
+        with tempfile.TemporaryDirectory() as directory:
+            for profile in COMPRESSION_PROFILES:
+                result = compression_test(profile, records, args, directory)
+                print(f"{profile:<12}" + "".join(f"{result[column]:>12,.1f}" for column in columns))
+        return
+
+    if args.load_test:
+        columns = ["reads/s", "writes/s", "p50 ms", "p99 ms", "max ms", "errors"]
+        print(f"{'profile':<10}" + "".join(f"{column:>12}" for column in columns))
+        with tempfile.TemporaryDirectory() as directory:
+            for profile in PROFILES:
+                result = load_test(profile, args, directory)
+                print(f"{profile:<10}" + "".join(f"{result[column]:>12,.1f}" for column in columns))
+        return
+
+    records = make_records(args.records)
+    print(f"{'mode':<18}{'records/s':>12}")
+    with tempfile.TemporaryDirectory() as directory:
+        for mode in args.modes:
+            print(f"{mode:<18}{run(mode, records, args, directory):>12,.0f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+import hashlib
+import math
+from typing import Optional, Dict, Any, Iterable
+from .config import get_settings
+
+class BloomFilter:
+    """
+    Set membership in a fixed bit array: `key in filter` is never wrong
+    about a key that was added, and wrong about a key that was not with
+    probability about error_rate while at most `capacity` keys are added.
+
+    Each key sets `hashes` bits, derived from one BLAKE2b digest by double
+    hashing. Keys cannot be removed. Accessed from the event loop only, so
+    it needs no lock.
+    """
+    def __init__(self, capacity: int = 1_000_000, error_rate: float = 0.01):
+        if capacity <= 0 or not 0 < error_rate < 1:
+            raise ValueError("BloomFilter needs a positive capacity and an error rate between 0 and 1.")
+        self.capacity = capacity
+        self.error_rate = error_rate
+        # Optimal sizes for n keys at false positive rate p: m = -n ln p / ln² 2 bits, k = m/n ln 2 hashes
+        self.bits = math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        self.hashes = max(1, round(self.bits / capacity * math.log(2)))
+        self._array = bytearray((self.bits + 7) // 8)
+        # Keys that set at least one new bit: distinct keys, less the few that were false positives
+        self.count = 0
+
+        # Metrics
+        self.checks = 0
+        # Checks answered "maybe present", including false positives
+        self.positives = 0
+
+    def _positions(self, key: str) -> Iterable[int]:
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        # Odd, so the probe sequence never collapses onto one bit
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return ((h1 + i * h2) % self.bits for i in range(self.hashes))
+
+    def add(self, key: str) -> bool:
+        """
+        Adds a key; returns False, and leaves count alone, if all its bits
+        were already set (the key, or one indistinguishable from it, was added).
+        """
+        new = False
+        for position in self._positions(key):
+            byte, bit = position >> 3, 1 << (position & 7)
+            if not self._array[byte] & bit:
+                self._array[byte] |= bit
+                new = True
+        self.count += new
+        return new
+
+    def __contains__(self, key: str) -> bool:
+        self.checks += 1
+        found = all(self._array[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+        self.positives += found
+        return found
+
+    def false_positive_rate(self) -> float:
+        """
+        Expected false positive rate at the current number of added keys.
+        """
+        return (1 - math.exp(-self.hashes * self.count / self.bits)) ** self.hashes
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "keys": self.count,
+            "capacity": self.capacity,
+            "bytes": len(self._array),
+            "hashes": self.hashes,
+            "checks": self.checks,
+            "positives": self.positives,
+            "false_positive_rate": self.false_positive_rate()
+        }
+
+_idempotency_filter: Optional[BloomFilter] = None
+
+def get_idempotency_filter() -> Optional[BloomFilter]:
+    """
+    Dependency returning the Bloom filter of stored idempotency keys, or
+    None when it is disabled (INGEST_IDEMPOTENCY_FILTER_CAPACITY=0) and every
+    keyed request looks its key up.
+    """
+    global _idempotency_filter
+    settings = get_settings()
+    if settings.idempotency_filter_capacity <= 0:
+        return None
+    if _idempotency_filter is None:
+        _idempotency_filter = BloomFilter(settings.idempotency_filter_capacity, settings.idempotency_filter_error_rate)
+    return _idempotency_filter
+
+def set_idempotency_filter(bloom_filter: Optional[BloomFilter]):
+    """
+    Replaces the filter (None: a new, empty one from the settings on next use).
+    """
+    global _idempotency_filter
+    _idempotency_filter = bloom_filter
@@ -0,0 +1,174 @@
+import asyncio
+import time
+from typing import Optional, List, Tuple, Dict, Any, Callable
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session
+from .config import get_settings
+from .database import SessionLocal
+from . import crud
+
+class WriteBuffer:
+    """
+    Group commit for single-record inserts.
+
+    submit() queues a row and waits; a background flusher inserts everything
+    queued with one INSERT ... RETURNING and one commit as soon as
+    `max_records` rows are waiting or the oldest has waited `max_delay_ms`,
+    whichever comes first. Each waiter then gets its own id. Nothing is
+    acknowledged before its commit, so durability is unchanged while the
+    commit (and its fsync) is shared by the whole batch.
+
+    Runs on the event loop of its callers; the flusher task is (re)started on
+    first use in a loop.
+    """
+    def __init__(
+        self,
+        session_factory: Callable[[], Session] = SessionLocal,
+        max_records: int = 100,
+        max_delay_ms: float = 10.0
+    ):
+        self.session_factory = session_factory
+        self.max_records = max_records
+        self.max_delay = max_delay_ms / 1000
+        # (row, waiter, time queued)
+        self._pending: List[Tuple[Dict[str, Any], asyncio.Future, float]] = []
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._task: Optional[asyncio.Task] = None
+        self._has_items: Optional[asyncio.Event] = None
+        self._full: Optional[asyncio.Event] = None
+
+        # Metrics
+        self.flushes = 0
+        self.records_flushed = 0
+        self.failed_flushes = 0
+        self.last_flush_seconds = 0.0
+        self.max_flush_seconds = 0.0
+        self.total_flush_seconds = 0.0
+        # From the oldest row of a batch being queued to its commit: what a client waits at most
+        self.last_latency_seconds = 0.0
+        self.max_latency_seconds = 0.0
+
+    @property
+    def depth(self) -> int:
+        return len(self._pending)
+
+    def _ensure_flusher(self):
+        loop = asyncio.get_running_loop()
+        if self._task is not None and not self._task.done() and self._loop is loop:
+            return
+        self._loop = loop
+        self._has_items = asyncio.Event()
+        self._full = asyncio.Event()
+        if self._pending:
+            self._has_items.set()
+        self._task = loop.create_task(self._run())
+
+    async def submit(self, row: Dict[str, Any]) -> int:
+        """
+        Queues one row (column -> value) and returns its id once committed.
+        """
+        self._ensure_flusher()
+        future = self._loop.create_future()
+        self._pending.append((row, future, time.perf_counter()))
+        self._has_items.set()
+        if len(self._pending) >= self.max_records:
+            self._full.set()
+        return await future
+
+    async def _run(self):
+        while True:
+            await self._has_items.wait()
+            # Give the batch until the oldest waiter has waited max_delay to fill
+            remaining = self.max_delay - (time.perf_counter() - self._pending[0][2])
+            if len(self._pending) < self.max_records and remaining > 0:
+                try:
+                    await asyncio.wait_for(self._full.wait(), timeout=remaining)
+                except asyncio.TimeoutError:
+                    pass
+            await self.flush()
+
+    async def flush(self):
+        """
+        Commits up to max_records queued rows now.
+        """
+        batch, self._pending = self._pending[:self.max_records], self._pending[self.max_records:]
+        if len(self._pending) < self.max_records:
+            self._full.clear()
+        if not self._pending:
+            self._has_items.clear()
+        if not batch:
+            return
+
+        start = time.perf_counter()
+        try:
+            ids = await run_in_threadpool(self._insert, [row for row, _, _ in batch])
+        except Exception as e:
+            self.failed_flushes += 1
+            for _, future, _ in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        end = time.perf_counter()
+        elapsed = end - start
+        self.last_latency_seconds = end - batch[0][2]
+        self.max_latency_seconds = max(self.max_latency_seconds, self.last_latency_seconds)
+        self.flushes += 1
+        self.records_flushed += len(batch)
+        self.last_flush_seconds = elapsed
+        self.max_flush_seconds = max(self.max_flush_seconds, elapsed)
+        self.total_flush_seconds += elapsed
+        for (_, future, _), record_id in zip(batch, ids):
+            if not future.done():
+                future.set_result(record_id)
+
+    def _insert(self, rows: List[Dict[str, Any]]) -> List[int]:
+        db = self.session_factory()
+        try:
+            return crud.insert_rows(db, rows)
+        finally:
+            db.close()
+
+    async def close(self):
+        """
+        Commits everything still queued and stops the flusher.
+        """
+        while self._pending:
+            await self.flush()
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "depth": self.depth,
+            "max_records": self.max_records,
+            "max_delay_ms": self.max_delay * 1000,
+            "flushes": self.flushes,
+            "failed_flushes": self.failed_flushes,
+            "records_flushed": self.records_flushed,
+            "avg_batch_size": self.records_flushed / self.flushes if self.flushes else 0.0,
+            "last_flush_ms": self.last_flush_seconds * 1000,
+            "avg_flush_ms": self.total_flush_seconds / self.flushes * 1000 if self.flushes else 0.0,
+            "max_flush_ms": self.max_flush_seconds * 1000,
+            "last_latency_ms": self.last_latency_seconds * 1000,
+            "max_latency_ms": self.max_latency_seconds * 1000
+        }
+
+_write_buffer: Optional[WriteBuffer] = None
+
+def get_write_buffer() -> Optional[WriteBuffer]:
+    """
+    Dependency returning the shared WriteBuffer, or None when group commit
+    is disabled (INGEST_GROUP_COMMIT unset).
+    """
+    global _write_buffer
+    settings = get_settings()
+    if not settings.group_commit:
+        return None
+    if _write_buffer is None:
+        _write_buffer = WriteBuffer(
+            max_records=settings.group_commit_max_records,
+            max_delay_ms=settings.group_commit_max_delay_ms
+        )
+    return _write_buffer
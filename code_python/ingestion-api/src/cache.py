@@ -0,0 +1,90 @@
+from collections import OrderedDict
+from typing import Optional, Dict, Any
+from .config import get_settings
+
+# Rough per-entry bookkeeping cost (dict slot, key, bytes object header),
+# counted against the memory cap on top of the payload itself
+ENTRY_OVERHEAD = 128
+
+class ResponseCache:
+    """
+    LRU cache of serialized responses (JSON bytes) keyed by record id,
+    capped at max_bytes of payload plus per-entry overhead.
+
+    Records are never updated after insert, so entries never go stale and
+    are only evicted for space. Accessed from the event loop only, so it
+    needs no lock.
+    """
+    def __init__(self, max_bytes: int = 16 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._entries: "OrderedDict[int, bytes]" = OrderedDict()
+
+        # Metrics
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: int) -> Optional[bytes]:
+        value = self._entries.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key: int, value: bytes):
+        cost = len(value) + ENTRY_OVERHEAD
+        if cost > self.max_bytes:
+            return
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self.size -= len(previous) + ENTRY_OVERHEAD
+        self._entries[key] = value
+        self.size += cost
+        while self.size > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self.size -= len(evicted) + ENTRY_OVERHEAD
+            self.evictions += 1
+
+    def discard_below(self, key: int):
+        """
+        Drops every entry with a key below `key` (records removed by retention).
+        """
+        for stale in [k for k in self._entries if k < key]:
+            self.size -= len(self._entries.pop(stale)) + ENTRY_OVERHEAD
+
+    def clear(self):
+        self._entries.clear()
+        self.size = 0
+
+    def metrics(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self.size,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions
+        }
+
+_record_cache: Optional[ResponseCache] = None
+
+def get_record_cache() -> Optional[ResponseCache]:
+    """
+    Dependency returning the shared cache of GET /records/{id} responses,
+    or None when it is disabled (INGEST_RECORD_CACHE_MAX_BYTES=0).
+    """
+    global _record_cache
+    settings = get_settings()
+    if settings.record_cache_max_bytes <= 0:
+        return None
+    if _record_cache is None:
+        _record_cache = ResponseCache(settings.record_cache_max_bytes)
+    return _record_cache
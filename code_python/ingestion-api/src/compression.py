@@ -0,0 +1,241 @@
+import argparse
+import json
+import struct
+import threading
+import zlib
+from typing import Optional, Any, Dict, List, Sequence, Union
+from sqlalchemy import LargeBinary, Text
+from sqlalchemy.types import TypeDecorator
+from .config import Settings, get_settings
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+CODECS = ("none", "zlib", "zstd")
+
+# First byte of a compressed value. Plain JSON text never starts with these
+# (control characters are not valid JSON outside strings), so compressed and
+# plain values, including rows written before compression was enabled, can
+# share the column.
+ZLIB = 0x01
+ZLIB_DICT = 0x02
+ZSTD = 0x03
+ZSTD_DICT = 0x04
+# Dictionary codecs are followed by the dictionary id (4 bytes, big-endian)
+DICT_ID = struct.Struct(">I")
+
+DEFAULT_DICTIONARY_SIZE = 16 * 1024
+
+def dictionary_id(dictionary: bytes) -> int:
+    return zlib.crc32(dictionary)
+
+class PayloadCodec:
+    """
+    Encodes JSON payloads for storage with zlib or zstd, optionally with a
+    shared dictionary trained on sample payloads (see train_dictionary).
+    Small payloads compress poorly on their own; a dictionary of their
+    common keys and values is what makes per-row compression worthwhile.
+
+    decode() reads every format the column can hold: plain JSON text and
+    values compressed with either codec. A value compressed with a
+    dictionary needs that dictionary (matched by id) to be loaded, either
+    as the current one or among older_dictionaries, which are only read.
+    """
+    def __init__(
+        self,
+        codec: str = "none",
+        level: Optional[int] = None,
+        dictionary: Optional[bytes] = None,
+        older_dictionaries: Sequence[bytes] = ()
+    ):
+        if codec not in CODECS:
+            raise ValueError(f"Unknown payload codec '{codec}'. Expected one of {', '.join(CODECS)}.")
+        if codec == "zstd" and zstandard is None:
+            raise ImportError("zstd payload compression requires the zstandard package.")
+        self.codec = codec
+        self.level = level
+        self.dictionary = dictionary
+        self.dictionary_id = dictionary_id(dictionary) if dictionary else None
+        # Every loaded dictionary by id, for decoding
+        self._dictionaries: Dict[int, bytes] = {dictionary_id(older): older for older in older_dictionaries}
+        if dictionary:
+            self._dictionaries[self.dictionary_id] = dictionary
+        self._zstd_dicts = {}
+        if zstandard is not None:
+            self._zstd_dicts = {id_: zstandard.ZstdCompressionDict(data) for id_, data in self._dictionaries.items()}
+        # zstandard (de)compressors must not be shared between threads
+        self._local = threading.local()
+
+    def _zstd(self, name: str, dictionary: Optional[int] = None):
+        key = f"{name}_{dictionary}"
+        instance = getattr(self._local, key, None)
+        if instance is None:
+            dict_data = self._zstd_dicts[dictionary] if dictionary is not None else None
+            if name == "compressor":
+                level = self.level if self.level is not None else 3
+                instance = zstandard.ZstdCompressor(level=level, dict_data=dict_data)
+            else:
+                instance = zstandard.ZstdDecompressor(dict_data=dict_data)
+            setattr(self._local, key, instance)
+        return instance
+
+    def encode(self, value: Any) -> Union[str, bytes]:
+        """
+        Returns the stored form of a payload: JSON text with codec "none",
+        otherwise a header byte (plus dictionary id) and the compressed JSON.
+        """
+        text = json.dumps(value, separators=(",", ":"))
+        if self.codec == "none":
+            return text
+
+        data = text.encode("utf-8")
+        if self.codec == "zlib":
+            level = self.level if self.level is not None else zlib.Z_DEFAULT_COMPRESSION
+            if self.dictionary:
+                compressor = zlib.compressobj(level, zdict=self.dictionary)
+                body = compressor.compress(data) + compressor.flush()
+                return bytes([ZLIB_DICT]) + DICT_ID.pack(self.dictionary_id) + body
+            return bytes([ZLIB]) + zlib.compress(data, level)
+
+        body = self._zstd("compressor", self.dictionary_id).compress(data)
+        if self.dictionary:
+            return bytes([ZSTD_DICT]) + DICT_ID.pack(self.dictionary_id) + body
+        return bytes([ZSTD]) + body
+
+    def decode(self, stored: Union[str, bytes]) -> Any:
+        if isinstance(stored, str):
+            return json.loads(stored)
+        stored = bytes(stored)
+        codec = stored[0] if stored else None
+        if codec not in (ZLIB, ZLIB_DICT, ZSTD, ZSTD_DICT):
+            # Plain JSON stored as bytes (non-SQLite databases)
+            return json.loads(stored)
+
+        body = stored[1:]
+        stored_id = None
+        if codec in (ZLIB_DICT, ZSTD_DICT):
+            stored_id, = DICT_ID.unpack_from(body)
+            if stored_id not in self._dictionaries:
+                raise LookupError(f"Payload was compressed with dictionary {stored_id:#010x}, which is not loaded.")
+            body = body[DICT_ID.size:]
+
+        if codec == ZLIB:
+            data = zlib.decompress(body)
+        elif codec == ZLIB_DICT:
+            decompressor = zlib.decompressobj(zdict=self._dictionaries[stored_id])
+            data = decompressor.decompress(body) + decompressor.flush()
+        else:
+            if zstandard is None:
+                raise ImportError("Reading zstd-compressed payloads requires the zstandard package.")
+            data = self._zstd("decompressor", stored_id).decompress(body)
+        return json.loads(data)
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> "PayloadCodec":
+        # Comma-separated files, oldest first: the last is written with, the others are kept for reading
+        dictionaries = []
+        for path in (settings.payload_dictionary or "").split(","):
+            if path.strip():
+                with open(path.strip(), "rb") as f:
+                    dictionaries.append(f.read())
+        dictionary = dictionaries.pop() if dictionaries else None
+        return cls(settings.payload_compression, settings.payload_compression_level, dictionary, dictionaries)
+
+_payload_codec: Optional[PayloadCodec] = None
+
+def get_payload_codec() -> PayloadCodec:
+    """
+    The codec used for Record.payload, configured from the INGEST_PAYLOAD_* settings.
+    """
+    global _payload_codec
+    if _payload_codec is None:
+        _payload_codec = PayloadCodec.from_settings(get_settings())
+    return _payload_codec
+
+def set_payload_codec(codec: Optional[PayloadCodec]):
+    """
+    Replaces the codec (None: reconfigure from the settings on next use).
+    """
+    global _payload_codec
+    _payload_codec = codec
+
+class CompressedJSON(TypeDecorator):
+    """
+    JSON column stored through the payload codec. Values come back as the
+    decoded JSON, so nothing above the column sees the compression.
+
+    On SQLite the column is TEXT: being dynamically typed, it holds plain
+    JSON text and compressed blobs side by side. Elsewhere it is binary and
+    plain JSON is stored UTF-8 encoded.
+    """
+    impl = Text
+    cache_ok = True
+
+    def load_dialect_impl(self, dialect):
+        if dialect.name == "sqlite":
+            return dialect.type_descriptor(Text())
+        return dialect.type_descriptor(LargeBinary())
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        stored = get_payload_codec().encode(value)
+        if isinstance(stored, str) and dialect.name != "sqlite":
+            return stored.encode("utf-8")
+        return stored
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        return get_payload_codec().decode(value)
+
+def train_dictionary(samples: List[Any], codec: str = "zstd", size: int = DEFAULT_DICTIONARY_SIZE) -> bytes:
+    """
+    Builds a shared dictionary from sample payloads.
+
+    zstd trains a proper dictionary. zlib has no trainer; its dictionary is
+    the serialized samples themselves, last `size` bytes, which zlib matches
+    against as if they preceded every payload.
+    """
+    encoded = [json.dumps(sample, separators=(",", ":")).encode("utf-8") for sample in samples]
+    if codec == "zstd":
+        if zstandard is None:
+            raise ImportError("Training a zstd dictionary requires the zstandard package.")
+        return zstandard.train_dictionary(size, encoded).as_bytes()
+    if codec == "zlib":
+        # zlib only looks back 32 KiB, and prefers matches near the end
+        return b"".join(encoded)[-min(size, 32 * 1024):]
+    raise ValueError(f"Dictionaries are for 'zlib' or 'zstd', not '{codec}'.")
+
+def main():
+    parser = argparse.ArgumentParser(description="Train a payload compression dictionary from stored records.")
+    parser.add_argument("output", help="Dictionary file to write; append it to INGEST_PAYLOAD_DICTIONARY.")
+    parser.add_argument("--codec", choices=["zstd", "zlib"], default="zstd")
+    parser.add_argument("--samples", type=int, default=5000, help="Most recent payloads to train on.")
+    parser.add_argument("--size", type=int, default=DEFAULT_DICTIONARY_SIZE, help="Dictionary size in bytes.")
+    args = parser.parse_args()
+
+    from sqlalchemy import select
+    from .database import SessionLocal
+    from .models import Record
+
+    db = SessionLocal()
+    try:
+        samples = list(db.scalars(
+            select(Record.payload).where(Record.payload.is_not(None)).order_by(Record.id.desc()).limit(args.samples)
+        ))
+    finally:
+        db.close()
+    if not samples:
+        parser.error("No stored payloads to train on.")
+
+    dictionary = train_dictionary(samples, args.codec, args.size)
+    with open(args.output, "wb") as f:
+        f.write(dictionary)
+    print(f"Wrote a {len(dictionary):,} byte {args.codec} dictionary "
+          f"(id {dictionary_id(dictionary):#010x}) trained on {len(samples):,} payloads to {args.output}")
+
+if __name__ == "__main__":
+    main()
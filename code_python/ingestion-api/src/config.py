@@ -0,0 +1,65 @@
+import os
+from functools import lru_cache
+from typing import Mapping, Literal, Optional
+from pydantic import BaseModel
+
+# Every setting can be overridden by the environment variable INGEST_<FIELD NAME>
+ENV_PREFIX = "INGEST_"
+
+class Settings(BaseModel):
+    """Runtime settings, read from INGEST_* environment variables"""
+    database_url: str = "sqlite:///./ingestion.db"
+
+    # SQLite pragmas applied to every connection
+    sqlite_journal_mode: Literal["WAL", "DELETE", "TRUNCATE", "PERSIST", "MEMORY"] = "WAL"
+    # NORMAL is durable against application crashes in WAL mode; FULL also against power loss
+    sqlite_synchronous: Literal["OFF", "NORMAL", "FULL", "EXTRA"] = "NORMAL"
+    # Negative values are KiB, as in PRAGMA cache_size
+    sqlite_cache_size: int = -64_000
+    sqlite_mmap_size: int = 256 * 1024 * 1024
+    sqlite_busy_timeout_ms: int = 5000
+    # Connections in the read pool; writes always go through a single connection
+    read_pool_size: int = 8
+
+    # Memory cap of the GET /records/{id} response cache; 0 disables it
+    record_cache_max_bytes: int = 16 * 1024 * 1024
+
+    # Storage of Record.payload: plain JSON, or compressed with zlib or zstd
+    payload_compression: Literal["none", "zlib", "zstd"] = "none"
+    # None: the codec's default level
+    payload_compression_level: Optional[int] = None
+    # Shared dictionary files (python -m src.compression), for small payloads:
+    # comma-separated, oldest first; the last one is used for writing
+    payload_dictionary: Optional[str] = None
+
+    # Full-text index of messages for GET /records/search: whole words, or
+    # trigrams for substring matches (larger index); fixed when the index is created
+    search_tokenizer: Literal["unicode61", "trigram"] = "unicode61"
+
+    # Bloom filter of stored Idempotency-Key values, so that new keys need no
+    # lookup; 0 disables it. Past capacity, false positives (lookups) grow.
+    idempotency_filter_capacity: int = 1_000_000
+    idempotency_filter_error_rate: float = 0.01
+
+    # Store records in one table per UTC day; retention drops whole days
+    partition_by_day: bool = False
+    # Days of partitions kept besides today's; 0 keeps everything
+    retention_days: int = 14
+
+    # Group commit: single-record inserts are buffered and committed together
+    group_commit: bool = False
+    group_commit_max_records: int = 100
+    group_commit_max_delay_ms: float = 10.0
+
+    @classmethod
+    def from_env(cls, environ: Mapping[str, str] = os.environ) -> "Settings":
+        values = {}
+        for name in cls.model_fields:
+            key = ENV_PREFIX + name.upper()
+            if key in environ:
+                values[name] = environ[key]
+        return cls(**values)
+
+@lru_cache
+def get_settings() -> Settings:
+    return Settings.from_env()
@@ -0,0 +1,320 @@
+import datetime as dt
+from collections import defaultdict
+from datetime import datetime
+from typing import List, Sequence, Dict, Any, Optional, Tuple, Iterator
+from sqlalchemy import func, insert, literal_column, select, tuple_, Row, Select, Table
+from sqlalchemy.exc import IntegrityError, OperationalError
+from sqlalchemy.orm import Session
+from .models import IdempotencyKey, Record, RecordCreate
+from .pagination import CursorError
+from . import rollups, search
+from .partitions import DailyPartitions, get_partitions, day_base, record_id as partition_record_id, split_record_id
+
+def create_record(db: Session, record: RecordCreate, idempotency_key: Optional[str] = None) -> Record:
+    """
+    Inserts a single record through the ORM and returns it with its
+    generated id and timestamp loaded.
+    With an idempotency key, the key is stored in the same transaction;
+    a key that is already stored raises IntegrityError and inserts nothing.
+    """
+    row = record.model_dump()
+    row["timestamp"] = datetime.now(dt.UTC).replace(tzinfo=None)
+    if get_partitions() is not None or idempotency_key is not None:
+        record_id, = insert_rows(db, [row], idempotency_keys=[idempotency_key])
+        return Record(id=record_id, **row)
+
+    db_record = Record(**row)
+    db.add(db_record)
+    rollups.add_rows(db, [row])
+    db.commit()
+    db.refresh(db_record)
+    return db_record
+
+def insert_records(db: Session, records: Sequence[RecordCreate]) -> List[int]:
+    """
+    Inserts many records in one transaction with a single executemany-style
+    INSERT ... RETURNING and returns their ids in input order.
+    Rows without a timestamp get the time of the call.
+    """
+    return insert_rows(db, [record.model_dump() for record in records])
+
+def insert_rows(
+    db: Session,
+    rows: Sequence[Dict[str, Any]],
+    idempotency_keys: Optional[Sequence[Optional[str]]] = None
+) -> List[int]:
+    """
+    insert_records for rows that are already column -> value dicts.
+    idempotency_keys, one per row (None for rows without one), are stored
+    with the rows' ids in the same transaction.
+    """
+    if not rows:
+        return []
+    # The rollup needs every row's timestamp, so the default is applied here
+    now = datetime.now(dt.UTC).replace(tzinfo=None)
+    rows = [row if row.get("timestamp") is not None else {**row, "timestamp": now} for row in rows]
+    partitions = get_partitions()
+    if partitions is not None:
+        return _insert_partitioned(db, partitions, rows, idempotency_keys)
+
+    # sort_by_parameter_order ties each returned id to its parameter set,
+    # even when SQLAlchemy splits the rows across several statements
+    statement = insert(Record).returning(Record.id, sort_by_parameter_order=True)
+    try:
+        ids = list(db.scalars(statement, rows))
+        rollups.add_rows(db, rows)
+        _store_idempotency_keys(db, idempotency_keys, ids, rows)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return ids
+
+def _insert_partitioned(
+    db: Session,
+    partitions: DailyPartitions,
+    rows: Sequence[Dict[str, Any]],
+    idempotency_keys: Optional[Sequence[Optional[str]]] = None
+) -> List[int]:
+    """
+    insert_rows into daily partitions: rows are grouped by the UTC day of
+    their timestamp and each group is inserted into its day's table, all in
+    one transaction.
+    """
+    by_day = defaultdict(list)
+    for index, row in enumerate(rows):
+        by_day[row["timestamp"].date()].append((index, row))
+
+    ids = [0] * len(rows)
+    try:
+        for day, indexed_rows in by_day.items():
+            table = partitions.ensure(db, day)
+            statement = insert(table).returning(table.c.id, sort_by_parameter_order=True)
+            local_ids = db.scalars(statement, [row for _, row in indexed_rows])
+            for (index, _), local_id in zip(indexed_rows, local_ids):
+                ids[index] = partition_record_id(day, local_id)
+        rollups.add_rows(db, rows)
+        _store_idempotency_keys(db, idempotency_keys, ids, rows)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    partitions.created(set(by_day))
+    return ids
+
+def _store_idempotency_keys(
+    db: Session,
+    keys: Optional[Sequence[Optional[str]]],
+    ids: Sequence[int],
+    rows: Sequence[Dict[str, Any]]
+):
+    if not keys:
+        return
+    # Dated like their records, so retention expires both together
+    stored = [
+        {"key": key, "record_id": record_id, "created_at": row["timestamp"]}
+        for key, record_id, row in zip(keys, ids, rows) if key is not None
+    ]
+    if stored:
+        db.execute(insert(IdempotencyKey), stored)
+
+def create_record_once(
+    db: Session,
+    record: RecordCreate,
+    idempotency_key: str,
+    maybe_stored: bool = True
+) -> Tuple[Record, bool]:
+    """
+    create_record with an idempotency key: returns the new record and True,
+    or, if the key is already stored, the record it created and False.
+
+    With maybe_stored, the key is looked up first. Pass False for a key
+    known to be new (a Bloom filter miss) to go straight to the insert.
+    Either way the key's unique index decides, so concurrent requests with
+    one key, or ones served by different processes, create a single record.
+    """
+    if maybe_stored:
+        existing = get_record_by_idempotency_key(db, idempotency_key)
+        if existing is not None:
+            return existing, False
+    try:
+        return create_record(db, record, idempotency_key), True
+    except IntegrityError:
+        existing = get_record_by_idempotency_key(db, idempotency_key)
+        if existing is None:
+            raise
+        return existing, False
+
+def get_record_by_idempotency_key(db: Session, idempotency_key: str) -> Optional[Record]:
+    record_id = db.scalar(select(IdempotencyKey.record_id).where(IdempotencyKey.key == idempotency_key))
+    return get_record(db, record_id) if record_id is not None else None
+
+def iter_idempotency_keys(db: Session, batch_size: int = 10000) -> Iterator[str]:
+    """
+    Every stored idempotency key, streamed; for seeding the Bloom filter.
+    """
+    yield from db.scalars(select(IdempotencyKey.key).execution_options(yield_per=batch_size))
+
+def _partition_columns(table: Table, day) -> list:
+    # The partition's columns, with the rowid turned into the record id
+    return [(table.c.id + day_base(day)).label("id")] + [c for c in table.c if c.name != "id"]
+
+def get_record(db: Session, record_id: int) -> Optional[Record]:
+    partitions = get_partitions()
+    if partitions is None:
+        return db.scalars(select(Record).where(Record.id == record_id)).first()
+
+    try:
+        day, local_id = split_record_id(record_id)
+    except ValueError:
+        return None
+    table = partitions.table(day)
+    # One lookup in the day's table; a missing table means no such record
+    try:
+        row = db.execute(select(*_partition_columns(table, day)).where(table.c.id == local_id)).first()
+    except OperationalError as e:
+        if "no such table" not in str(e.orig):
+            raise
+        return None
+    # Detached Record, so callers see the same type in either storage mode
+    return Record(**row._mapping) if row is not None else None
+
+def _where_filters(
+    statement: Select,
+    table: Table,
+    service_name: Optional[str] = None,
+    severity: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None
+) -> Select:
+    columns = table.c
+    if service_name is not None:
+        statement = statement.where(columns.service_name == service_name)
+    if severity is not None:
+        statement = statement.where(columns.severity == severity)
+    if since is not None:
+        statement = statement.where(columns.timestamp >= since)
+    if until is not None:
+        statement = statement.where(columns.timestamp < until)
+    return statement
+
+def _filter_records(
+    statement: Select,
+    service_name: Optional[str] = None,
+    severity: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    after: Optional[Tuple[datetime, int]] = None,
+    table: Table = Record.__table__
+) -> Select:
+    columns = table.c
+    statement = _where_filters(statement, table, service_name, severity, since, until)
+    if after is not None:
+        # Row-value comparison, so SQLite can seek the index to the position
+        statement = statement.where(tuple_(columns.timestamp, columns.id) > tuple_(*after))
+    return statement.order_by(columns.timestamp, columns.id)
+
+def _partition_queries(
+    db: Session,
+    partitions: DailyPartitions,
+    after: Optional[Tuple[datetime, int]] = None,
+    **filters
+) -> Iterator[Select]:
+    """
+    One filtered query per partition overlapping the filters' time range,
+    in day order; together they return the rows in (timestamp, id) order.
+    Raises CursorError if `after` holds an id no partition can have.
+    """
+    after_day = None
+    if after is not None:
+        try:
+            after_day, after_local_id = split_record_id(after[1])
+        except ValueError:
+            raise CursorError("Invalid cursor.")
+    for day in partitions.days_between(db, filters.get("since"), filters.get("until")):
+        if after_day is not None and day < after_day:
+            continue
+        table = partitions.table(day)
+        # Within the cursor's day, continue after its row; later days start at their beginning
+        day_after = (after[0], after_local_id) if day == after_day else None
+        yield _filter_records(select(*_partition_columns(table, day)), after=day_after, table=table, **filters)
+
+def list_records_query(limit: int = 100, **filters) -> Select:
+    """
+    Records matching all given filters (service_name, severity, since,
+    until), in (timestamp, id) order, starting after the keyset position
+    `after`. since is inclusive, until exclusive.
+
+    Every combination is served by one of Record's composite indexes
+    (filter column, timestamp, id) or (timestamp, id): the index both finds
+    the rows and yields them in order, so neither a scan nor a sort is needed.
+    """
+    return _filter_records(select(Record), **filters).limit(limit)
+
+def list_records(db: Session, limit: int = 100, **filters) -> List[Record]:
+    """
+    Runs list_records_query(**filters), or with daily partitions, the same
+    query on each partition in turn until `limit` records are found.
+    """
+    partitions = get_partitions()
+    if partitions is None:
+        return list(db.scalars(list_records_query(limit=limit, **filters)))
+
+    records = []
+    for statement in _partition_queries(db, partitions, **filters):
+        records += [Record(**row._mapping) for row in db.execute(statement.limit(limit - len(records)))]
+        if len(records) >= limit:
+            break
+    return records
+
+def iter_record_rows(db: Session, batch_size: int = 1000, **filters) -> Iterator[Row]:
+    """
+    Streams every record matching the list_records filters as plain rows
+    (no ORM objects or identity map), fetching batch_size rows at a time
+    from the cursor, so memory does not grow with the number of rows.
+    """
+    partitions = get_partitions()
+    if partitions is None:
+        statements = [_filter_records(select(Record.__table__), **filters)]
+    else:
+        statements = _partition_queries(db, partitions, **filters)
+    for statement in statements:
+        yield from db.execute(statement.execution_options(yield_per=batch_size))
+
+def _search_query(table: Table, columns: list, match: str, limit: int, **filters) -> Select:
+    fts = search.fts_table(table.name)
+    # bm25() is lower for better matches; score is higher for better matches
+    score = (-func.bm25(literal_column(fts.name))).label("score")
+    statement = select(*columns, score).select_from(fts.join(table, table.c.id == fts.c.rowid))
+    statement = _where_filters(statement.where(fts.c.message.match(match)), table, **filters)
+    return statement.order_by(score.desc(), table.c.id).limit(limit)
+
+def _scored_record(row: Row) -> Tuple[Record, float]:
+    *values, score = row
+    return Record(**dict(zip(row._fields[:-1], values))), score
+
+def search_records(db: Session, q: str, limit: int = 100, **filters) -> List[Tuple[Record, float]]:
+    """
+    Records whose message contains every term of q (see search.match_query)
+    and that match the list_records filters, best match first, each with
+    its BM25 score.
+
+    FTS5 finds the matching rows from its inverted index, so only they are
+    read from the table; a LIKE '%term%' would scan every message.
+    With daily partitions, each day in the time range is searched and the
+    best `limit` matches overall are kept. Scores come from each day's own
+    index statistics, so they are comparable across days only roughly.
+    """
+    match = search.match_query(q)
+    partitions = get_partitions()
+    if partitions is None:
+        statement = _search_query(Record.__table__, list(Record.__table__.c), match, limit, **filters)
+        return [_scored_record(row) for row in db.execute(statement)]
+
+    matches = []
+    for day in partitions.days_between(db, filters.get("since"), filters.get("until")):
+        table = partitions.table(day)
+        statement = _search_query(table, _partition_columns(table, day), match, limit, **filters)
+        matches += [_scored_record(row) for row in db.execute(statement)]
+    matches.sort(key=lambda match: (-match[1], match[0].id))
+    return matches[:limit]
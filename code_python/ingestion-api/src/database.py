@@ -1,30 +1,103 @@
-from sqlalchemy import create_engine
+from typing import Tuple
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
 from sqlalchemy.orm import sessionmaker, declarative_base
+from .config import Settings, get_settings
 
-# SQLite database URL
-# Using a file-based SQLite database.
-SQLALCHEMY_DATABASE_URL = "sqlite:///./ingestion.db"
+def _sqlite_pragmas(settings: Settings, read_only: bool):
+    """
+    Returns a connect-event listener applying the configured pragmas.
+    """
+    pragmas = [
+        f"PRAGMA journal_mode={settings.sqlite_journal_mode}",
+        f"PRAGMA synchronous={settings.sqlite_synchronous}",
+        f"PRAGMA cache_size={int(settings.sqlite_cache_size)}",
+        f"PRAGMA mmap_size={int(settings.sqlite_mmap_size)}",
+        f"PRAGMA busy_timeout={int(settings.sqlite_busy_timeout_ms)}",
+    ]
+    if read_only:
+        pragmas.append("PRAGMA query_only=ON")
+
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for pragma in pragmas:
+                cursor.execute(pragma)
+        finally:
+            cursor.close()
+    return set_pragmas
 
-# Create engine
-# connect_args={"check_same_thread": False} is needed for SQLite to allow multiple threads
-# to interact with the database, which is common in FastAPI (though SQLite handles it safely with WAL)
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
-)
+def create_engines(settings: Settings) -> Tuple[Engine, Engine]:
+    """
+    Builds the (writer, reader) engine pair for settings.database_url.
+
+    The writer pool holds exactly one connection, so writes queue in the
+    pool instead of contending for SQLite's write lock. Readers get a pool of
+    read_pool_size query-only connections; in WAL mode they read a consistent
+    snapshot while a write is in progress instead of waiting for it.
+    """
+    # check_same_thread=False: FastAPI hands connections between threads of its pool
+    connect_args = {"check_same_thread": False}
+    write_engine = create_engine(
+        settings.database_url, connect_args=connect_args, pool_size=1, max_overflow=0
+    )
+    read_engine = create_engine(
+        settings.database_url, connect_args=connect_args,
+        pool_size=settings.read_pool_size, max_overflow=0
+    )
+    if write_engine.dialect.name == "sqlite":
+        event.listen(write_engine, "connect", _sqlite_pragmas(settings, read_only=False))
+        event.listen(read_engine, "connect", _sqlite_pragmas(settings, read_only=True))
+    return write_engine, read_engine
 
-# Create session factory
+engine, read_engine = create_engines(get_settings())
+
+# Create session factories: SessionLocal for writes, ReadSessionLocal for reads
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
 
 # Base class for models
 Base = declarative_base()
 
-def get_db():
+# The session dependencies are async so that closing a session (and returning
+# its connection to the pool) happens on the event loop. Endpoints likewise run
+# only their database calls in the threadpool. Otherwise, with more requests
+# than pooled connections, every thread can end up blocked waiting for a
+# connection that only a finished request's teardown would release, and that
+# teardown would itself be waiting for a thread.
+
+async def get_db():
     """
-    Dependency helper to yield a database session.
+    Dependency helper to yield a read-only database session from the read pool.
     Ensures the session is closed after the request is finished.
     """
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+async def get_write_db():
+    """
+    Dependency helper to yield a session on the single writer connection.
+    """
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+def get_write_sessions() -> sessionmaker:
+    """
+    Dependency returning the writer session factory itself, for endpoints
+    that need a write session on some paths only; they open and close it.
+    """
+    return SessionLocal
+
+def get_read_sessions() -> sessionmaker:
+    """
+    Dependency returning the read session factory itself, for responses that
+    are still being produced after the request handler has returned
+    (streaming); they open and close their own session.
+    """
+    return ReadSessionLocal
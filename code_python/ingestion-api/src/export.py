@@ -0,0 +1,74 @@
+import csv
+import io
+import json
+from typing import Iterator, Dict, Any, Callable, Iterable
+from sqlalchemy import Row
+from sqlalchemy.orm import Session
+from . import crud
+
+# Format -> media type
+EXPORT_FORMATS = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+CSV_COLUMNS = ["id", "timestamp", "service_name", "severity", "message", "payload"]
+
+# Encoded output is sent in chunks of about this size
+CHUNK_SIZE = 64 * 1024
+
+def _ndjson_lines(rows: Iterable[Row]) -> Iterator[str]:
+    for row in rows:
+        record = dict(row._mapping)
+        # Same form as RecordResponse serializes it
+        record["timestamp"] = record["timestamp"].isoformat()
+        yield json.dumps(record) + "\n"
+
+def _csv_lines(rows: Iterable[Row]) -> Iterator[str]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(CSV_COLUMNS)
+    for row in rows:
+        writer.writerow([
+            row.id,
+            row.timestamp.isoformat(),
+            row.service_name,
+            row.severity,
+            row.message,
+            json.dumps(row.payload) if row.payload is not None else ""
+        ])
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    yield buffer.getvalue()
+
+ENCODERS: Dict[str, Callable[[Iterable[Row]], Iterator[str]]] = {
+    "ndjson": _ndjson_lines,
+    "csv": _csv_lines,
+}
+
+def stream_records(
+    session_factory: Callable[[], Session],
+    export_format: str,
+    chunk_size: int = CHUNK_SIZE,
+    **filters: Any
+) -> Iterator[bytes]:
+    """
+    Yields every record matching the list filters, encoded as export_format,
+    in chunks of about chunk_size bytes.
+
+    The generator opens and closes its own session: it outlives the request
+    handler (and its dependencies) while the response is being sent. If the
+    client disconnects, closing the generator closes the session.
+    """
+    db = session_factory()
+    try:
+        chunk = []
+        size = 0
+        for line in ENCODERS[export_format](crud.iter_record_rows(db, **filters)):
+            chunk.append(line)
+            size += len(line)
+            if size >= chunk_size:
+                yield "".join(chunk).encode("utf-8")
+                chunk = []
+                size = 0
+        if chunk:
+            yield "".join(chunk).encode("utf-8")
+    finally:
+        db.close()
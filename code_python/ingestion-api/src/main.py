@@ -1,8 +1,61 @@
+import asyncio
+import logging
 from contextlib import asynccontextmanager
-from fastapi import FastAPI, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from .database import engine, Base, get_db
-from .models import Record, RecordCreate, RecordResponse
+from datetime import datetime, timedelta
+from typing import Optional, Literal, Dict, Any
+import datetime as dt
+from fastapi import FastAPI, Depends, Header, HTTPException, Query, Request, Response, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session, sessionmaker
+from .database import engine, Base, SessionLocal, get_db, get_write_db, get_read_sessions, get_write_sessions
+from .models import RecordCreate, RecordResponse, RecordPage, RecordMatch, SearchResponse, BatchResponse, StatsCount, StatsMinute, StatsResponse
+from .batch import parse_batch, BatchFormatError, BatchTooLargeError
+from .buffer import WriteBuffer, get_write_buffer
+from .cache import ResponseCache, get_record_cache
+from .bloom import BloomFilter, get_idempotency_filter
+from .pagination import MAX_PAGE_SIZE, CursorError, decode_cursor, encode_cursor, to_stored_time
+from .export import EXPORT_FORMATS, stream_records
+from .partitions import DailyPartitions, get_partitions, day_base
+from .search import SearchQueryError
+from . import crud, rollups
+
+logger = logging.getLogger(__name__)
+
+# How often expired daily partitions are dropped
+RETENTION_INTERVAL_SECONDS = 3600
+
+def _prune(partitions: DailyPartitions):
+    db = SessionLocal()
+    try:
+        return partitions.prune(db)
+    finally:
+        db.close()
+
+async def enforce_retention(partitions: DailyPartitions):
+    """
+    Drops partitions past their retention now and then every
+    RETENTION_INTERVAL_SECONDS, evicting their records from the cache.
+    """
+    while True:
+        try:
+            dropped = await run_in_threadpool(_prune, partitions)
+        except Exception:
+            logger.exception("Dropping expired partitions failed")
+        else:
+            record_cache = get_record_cache()
+            if dropped and record_cache is not None:
+                record_cache.discard_below(day_base(max(dropped) + timedelta(days=1)))
+        await asyncio.sleep(RETENTION_INTERVAL_SECONDS)
+
+def _seed_idempotency_filter(idempotency_filter: BloomFilter):
+    # Runs before requests are served, so nothing else touches the filter yet
+    db = SessionLocal()
+    try:
+        for key in crud.iter_idempotency_keys(db):
+            idempotency_filter.add(key)
+    finally:
+        db.close()
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -14,8 +67,18 @@ async def lifespan(app: FastAPI):
     # In a real production scenario, we would use Alembic for migrations.
     # For this sprint, we initialize them here for simplicity.
     Base.metadata.create_all(bind=engine)
+    idempotency_filter = get_idempotency_filter()
+    if idempotency_filter is not None:
+        await run_in_threadpool(_seed_idempotency_filter, idempotency_filter)
+    partitions = get_partitions()
+    retention = asyncio.create_task(enforce_retention(partitions)) if partitions is not None else None
     yield
-    # Cleanup if necessary
+    if retention is not None:
+        retention.cancel()
+    # Commit whatever the group-commit buffer still holds
+    write_buffer = get_write_buffer()
+    if write_buffer is not None:
+        await write_buffer.close()
 
 app = FastAPI(
     title="High-Performance Ingestion API",
@@ -25,7 +88,14 @@ app = FastAPI(
 )
 
 @app.post("/records/", response_model=RecordResponse, status_code=status.HTTP_201_CREATED)
-def create_record(record: RecordCreate, db: Session = Depends(get_db)):
+async def create_record(
+    record: RecordCreate,
+    response: Response,
+    idempotency_key: Optional[str] = Header(None, min_length=1, max_length=255),
+    session_factory: sessionmaker = Depends(get_write_sessions),
+    write_buffer: Optional[WriteBuffer] = Depends(get_write_buffer),
+    idempotency_filter: Optional[BloomFilter] = Depends(get_idempotency_filter)
+):
     """
     Ingest a new record into the system.
 
@@ -33,27 +103,239 @@ def create_record(record: RecordCreate, db: Session = Depends(get_db)):
     - **severity**: Log level (INFO, WARN, ERROR, DEBUG, CRITICAL).
     - **message**: The content of the log.
     - **payload**: Optional JSON dictionary with extra context.
+
+    With group commit enabled, the response is sent once the record's shared
+    batch commit has completed.
+
+    With an `Idempotency-Key` header, retries are safe: a key that was
+    already used returns the record it created (status 200, header
+    `Idempotent-Replayed: true`) and inserts nothing. Keyed requests bypass
+    group commit.
     """
-    db_record = Record(
-        service_name=record.service_name,
-        severity=record.severity,
-        message=record.message,
-        payload=record.payload
-    )
-    db.add(db_record)
-    db.commit()
-    db.refresh(db_record)
+    if idempotency_key is not None or write_buffer is None:
+        # Only these paths take a session on the single writer connection;
+        # buffered records are inserted by the buffer's own session
+        db = session_factory()
+        try:
+            if idempotency_key is not None:
+                return await _create_record_once(record, idempotency_key, response, db, idempotency_filter)
+            return await run_in_threadpool(crud.create_record, db, record)
+        finally:
+            db.close()
+
+    row = record.model_dump()
+    # Stored without its offset, exactly as a read-back would return it
+    row["timestamp"] = datetime.now(dt.UTC).replace(tzinfo=None)
+    record_id = await write_buffer.submit(row)
+    return RecordResponse(id=record_id, **row)
+
+async def _create_record_once(
+    record: RecordCreate,
+    idempotency_key: str,
+    response: Response,
+    db: Session,
+    idempotency_filter: Optional[BloomFilter]
+):
+    # A key the filter has never seen is new: insert without looking it up.
+    # Keys it may have seen are looked up first; on a false positive the
+    # lookup finds nothing and the insert goes ahead. The unique key still
+    # catches duplicates the filter cannot know of (other processes, races).
+    # One threadpool call, so the write connection is never held while
+    # waiting for a thread.
+    maybe_stored = idempotency_filter is None or idempotency_key in idempotency_filter
+    db_record, created = await run_in_threadpool(crud.create_record_once, db, record, idempotency_key, maybe_stored)
+    if idempotency_filter is not None:
+        # Also on replays, so a key stored by another process is learnt; a
+        # key already in the filter is not counted again
+        idempotency_filter.add(idempotency_key)
+    if not created:
+        response.status_code = status.HTTP_200_OK
+        response.headers["Idempotent-Replayed"] = "true"
     return db_record
 
+@app.post("/records/batch", response_model=BatchResponse, status_code=status.HTTP_201_CREATED)
+async def create_records_batch(request: Request, db: Session = Depends(get_write_db)):
+    """
+    Ingest many records in one request and one transaction.
+
+    The body is a JSON array of records, or NDJSON (one record per line,
+    `Content-Type: application/x-ndjson`). Every item is validated; valid ones
+    are inserted together and invalid ones are reported by position.
+    `ids` has one entry per item: the new record's id, or null if rejected.
+    """
+    body = await request.body()
+    try:
+        parsed, errors = parse_batch(body, request.headers.get("content-type", ""))
+    except BatchTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except BatchFormatError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    # The insert is blocking I/O; keep it off the event loop
+    new_ids = await run_in_threadpool(crud.insert_records, db, [record for _, record in parsed])
+
+    ids = [None] * (len(parsed) + len(errors))
+    for (index, _), record_id in zip(parsed, new_ids):
+        ids[index] = record_id
+    return BatchResponse(inserted=len(new_ids), ids=ids, errors=errors)
+
+def record_filters(
+    service_name: Optional[str] = None,
+    severity: Optional[str] = Query(None, pattern="^(INFO|WARN|ERROR|DEBUG|CRITICAL)$"),
+    since: Optional[datetime] = Query(None, description="Only records at or after this time"),
+    until: Optional[datetime] = Query(None, description="Only records before this time")
+) -> Dict[str, Any]:
+    """
+    Query parameters shared by the listing endpoints, as crud filter arguments.
+    """
+    return {
+        "service_name": service_name,
+        "severity": severity,
+        "since": to_stored_time(since),
+        "until": to_stored_time(until)
+    }
+
+@app.get("/records", response_model=RecordPage)
+@app.get("/records/", response_model=RecordPage, include_in_schema=False)
+async def list_records(
+    filters: Dict[str, Any] = Depends(record_filters),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
+    db: Session = Depends(get_db)
+):
+    """
+    List records matching all given filters, oldest first.
+
+    Pages are keyset-paginated on (timestamp, id): follow `next_cursor` until
+    it is null. A cursor stays valid while records are being added, so a
+    consumer can keep polling with its last cursor to receive new records.
+    Naive times are taken as UTC.
+    """
+    try:
+        after = decode_cursor(cursor) if cursor is not None else None
+        # One row more than requested tells whether there is a next page
+        records = await run_in_threadpool(crud.list_records, db, after=after, limit=limit + 1, **filters)
+    except CursorError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    next_cursor = None
+    if len(records) > limit:
+        records = records[:limit]
+        next_cursor = encode_cursor(records[-1].timestamp, records[-1].id)
+    return RecordPage(items=records, next_cursor=next_cursor)
+
+# Declared before /records/{record_id}, which would otherwise match "export" (and "search")
+@app.get("/records/export", response_class=StreamingResponse)
+async def export_records(
+    format: Literal["ndjson", "csv"] = "ndjson",
+    filters: Dict[str, Any] = Depends(record_filters),
+    session_factory: sessionmaker = Depends(get_read_sessions)
+):
+    """
+    Export every record matching the filters as NDJSON or CSV, oldest first.
+
+    Rows are read from a server-side cursor and sent in chunks as they are
+    encoded, so memory use does not depend on the size of the export.
+    """
+    return StreamingResponse(
+        stream_records(session_factory, format, **filters),
+        media_type=EXPORT_FORMATS[format],
+        headers={"Content-Disposition": f'attachment; filename="records.{format}"'}
+    )
+
+@app.get("/records/search", response_model=SearchResponse)
+async def search_records(
+    q: str = Query(..., min_length=1, description="Words that must all appear in the message"),
+    filters: Dict[str, Any] = Depends(record_filters),
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
+    db: Session = Depends(get_db)
+):
+    """
+    Full-text search of record messages, best match first (BM25).
+
+    Every whitespace-separated word of `q` must appear in the message, as a
+    whole word, or as a substring with INGEST_SEARCH_TOKENIZER=trigram.
+    The filters are those of GET /records.
+    """
+    try:
+        matches = await run_in_threadpool(crud.search_records, db, q, limit=limit, **filters)
+    except SearchQueryError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    return SearchResponse(items=[
+        RecordMatch(score=score, **RecordResponse.model_validate(record).model_dump()) for record, score in matches
+    ])
+
 @app.get("/records/{record_id}", response_model=RecordResponse)
-def read_record(record_id: int, db: Session = Depends(get_db)):
+async def read_record(
+    record_id: int,
+    db: Session = Depends(get_db),
+    record_cache: Optional[ResponseCache] = Depends(get_record_cache)
+):
     """
     Retrieve a specific record by ID.
+
+    Records never change after insert, so serialized responses are cached
+    by id and repeated reads skip the query and serialization entirely.
     """
-    db_record = db.query(Record).filter(Record.id == record_id).first()
+    if record_cache is not None:
+        cached = record_cache.get(record_id)
+        if cached is not None:
+            return Response(content=cached, media_type="application/json")
+
+    # Only the query runs in the threadpool; serializing the response and
+    # closing the session happen on the event loop and never wait for a thread
+    db_record = await run_in_threadpool(crud.get_record, db, record_id)
     if db_record is None:
         raise HTTPException(status_code=404, detail="Record not found")
-    return db_record
+    if record_cache is None:
+        return db_record
+
+    body = RecordResponse.model_validate(db_record).model_dump_json().encode()
+    record_cache.put(record_id, body)
+    return Response(content=body, media_type="application/json")
+
+@app.get("/stats", response_model=StatsResponse)
+async def read_stats(
+    filters: Dict[str, Any] = Depends(record_filters),
+    per_minute: bool = Query(False, description="Also return the counts of every minute"),
+    db: Session = Depends(get_db)
+):
+    """
+    Record counts per service and severity, optionally filtered.
+
+    Answered from the per-minute rollup that every insert updates, never by
+    counting records: the cost depends on the number of services, severities
+    and (with since/until) minutes covered, not on how many records exist.
+    since and until select whole minutes: those starting in [since rounded
+    down to the minute, until).
+    """
+    counts = await run_in_threadpool(rollups.counts, db, **filters)
+    minutes = None
+    if per_minute:
+        minutes = [
+            StatsMinute(minute=minute, service_name=service_name, severity=severity, count=count)
+            for minute, service_name, severity, count in await run_in_threadpool(rollups.minutes, db, **filters)
+        ]
+    return StatsResponse(
+        total=sum(count for _, _, count in counts),
+        counts=[StatsCount(service_name=service_name, severity=severity, count=count) for service_name, severity, count in counts],
+        minutes=minutes
+    )
+
+@app.get("/metrics")
+def read_metrics(
+    write_buffer: Optional[WriteBuffer] = Depends(get_write_buffer),
+    record_cache: Optional[ResponseCache] = Depends(get_record_cache),
+    idempotency_filter: Optional[BloomFilter] = Depends(get_idempotency_filter)
+):
+    """
+    Runtime metrics: group-commit buffer depth, batch sizes and flush latency,
+    record cache size and hit/miss counts, and idempotency filter fill.
+    """
+    return {
+        "write_buffer": write_buffer.metrics() if write_buffer is not None else None,
+        "record_cache": record_cache.metrics() if record_cache is not None else None,
+        "idempotency_filter": idempotency_filter.metrics() if idempotency_filter is not None else None
+    }
 
 @app.get("/health")
 def health_check():
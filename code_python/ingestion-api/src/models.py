@@ -1,10 +1,12 @@
 from datetime import datetime
-from typing import Optional, Dict, Any
-from sqlalchemy import Column, Integer, String, DateTime, JSON
+from typing import Optional, Dict, Any, List
+from sqlalchemy import Column, Integer, String, DateTime, Index
 from pydantic import BaseModel, Field, ConfigDict
 import datetime as dt
 
 from .database import Base
+from .compression import CompressedJSON
+from . import search
 
 # SQLAlchemy Model
 class Record(Base):
@@ -12,10 +14,60 @@ class Record(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     timestamp = Column(DateTime, default=lambda: datetime.now(dt.UTC))
-    service_name = Column(String, index=True, nullable=False)
+    service_name = Column(String, nullable=False)
     severity = Column(String, nullable=False)
     message = Column(String, nullable=False)
-    payload = Column(JSON, nullable=True)  # Renamed from meta_data/metadata to payload for clarity
+    # Renamed from meta_data/metadata to payload for clarity.
+    # Stored through the payload codec (plain JSON unless INGEST_PAYLOAD_COMPRESSION is set)
+    payload = Column(CompressedJSON, nullable=True)
+
+    # Access paths of GET /records, all in keyset (timestamp, id) order.
+    # The service_name index also serves plain service_name lookups.
+    __table_args__ = (
+        Index("ix_records_service_name_timestamp_id", "service_name", "timestamp", "id"),
+        Index("ix_records_severity_timestamp_id", "severity", "timestamp", "id"),
+        Index("ix_records_timestamp_id", "timestamp", "id"),
+    )
+
+# Full-text index of messages (records_fts), for GET /records/search
+search.attach(Record.__table__)
+
+class IdempotencyKey(Base):
+    """
+    Idempotency-Key of a POST /records/ and the record it created. The key
+    is the primary key of a WITHOUT ROWID table: a unique index that holds
+    the record id too, so a duplicate is resolved by one index lookup.
+    """
+    __tablename__ = "idempotency_keys"
+
+    key = Column(String, primary_key=True)
+    record_id = Column(Integer, nullable=False)
+    created_at = Column(DateTime, nullable=False)
+
+    __table_args__ = {"sqlite_with_rowid": False}
+
+class RecordRollup(Base):
+    """
+    Record counts per minute (bucket start, naive UTC), service and severity,
+    kept up to date by every insert (see src.rollups).
+    """
+    __tablename__ = "record_rollups"
+
+    minute = Column(DateTime, primary_key=True)
+    service_name = Column(String, primary_key=True)
+    severity = Column(String, primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
+
+class RecordTotal(Base):
+    """
+    All-time record counts per service and severity: the sum of RecordRollup
+    over every minute, so totals never need that sum.
+    """
+    __tablename__ = "record_totals"
+
+    service_name = Column(String, primary_key=True)
+    severity = Column(String, primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
 
 # Pydantic Schemas
 
@@ -35,3 +87,47 @@ class RecordResponse(RecordBase):
     timestamp: datetime
 
     model_config = ConfigDict(from_attributes=True)
+
+class RecordPage(BaseModel):
+    """One page of GET /records"""
+    items: List[RecordResponse]
+    # Pass as ?cursor= to get the next page; None when this page is the last
+    next_cursor: Optional[str] = None
+
+class RecordMatch(RecordResponse):
+    """A record found by GET /records/search"""
+    # BM25 relevance: higher is a better match
+    score: float
+
+class SearchResponse(BaseModel):
+    """Result of GET /records/search, best match first"""
+    items: List[RecordMatch]
+
+class BatchItemError(BaseModel):
+    """Validation errors for one item of a batch, by its position in the body"""
+    index: int
+    errors: List[Dict[str, Any]]
+
+class BatchResponse(BaseModel):
+    """Result of a batch ingestion"""
+    inserted: int
+    # One entry per item in the body: the new record's id, or None if the item was rejected
+    ids: List[Optional[int]]
+    errors: List[BatchItemError]
+
+class StatsCount(BaseModel):
+    """Number of records of one service and severity"""
+    service_name: str
+    severity: str
+    count: int
+
+class StatsMinute(StatsCount):
+    """StatsCount for the minute starting at `minute`"""
+    minute: datetime
+
+class StatsResponse(BaseModel):
+    """Result of GET /stats"""
+    total: int
+    counts: List[StatsCount]
+    # Per-minute breakdown, only when requested with ?per_minute=true
+    minutes: Optional[List[StatsMinute]] = None
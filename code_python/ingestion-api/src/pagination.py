@@ -0,0 +1,33 @@
+import base64
+import datetime as dt
+from datetime import datetime
+from typing import Tuple, Optional
+
+MAX_PAGE_SIZE = 1000
+
+class CursorError(ValueError):
+    """The cursor was not produced by this API."""
+
+def encode_cursor(timestamp: datetime, record_id: int) -> str:
+    """
+    Opaque cursor pointing just past (timestamp, record_id).
+    """
+    raw = f"{timestamp.isoformat()}|{record_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        timestamp, record_id = raw.rsplit("|", 1)
+        return datetime.fromisoformat(timestamp), int(record_id)
+    except ValueError:
+        raise CursorError("Invalid cursor.")
+
+def to_stored_time(value: Optional[datetime]) -> Optional[datetime]:
+    """
+    Timestamps are stored as naive UTC; converts an aware filter value to match.
+    Naive values are taken as UTC already.
+    """
+    if value is None or value.tzinfo is None:
+        return value
+    return value.astimezone(dt.UTC).replace(tzinfo=None)
@@ -0,0 +1,179 @@
+import argparse
+import datetime as dt
+from datetime import date, datetime, timedelta
+from typing import Optional, List, Tuple, Set
+from sqlalchemy import MetaData, Table, Index, delete, func, select, text
+from sqlalchemy.orm import Session
+from .config import get_settings
+from .models import IdempotencyKey, Record
+from . import rollups, search
+
+EPOCH = date(1970, 1, 1)
+# Record ids are (days since the epoch << DAY_SHIFT) | rowid within the day's table
+DAY_SHIFT = 32
+LOCAL_ID_MASK = (1 << DAY_SHIFT) - 1
+TABLE_PREFIX = "records_"
+
+def record_id(day: date, local_id: int) -> int:
+    return ((day - EPOCH).days << DAY_SHIFT) | local_id
+
+def split_record_id(record_id: int) -> Tuple[date, int]:
+    """
+    (day, rowid in that day's table) of a partitioned record id. Raises
+    ValueError for an id whose day is outside the date range.
+    """
+    try:
+        return EPOCH + timedelta(days=record_id >> DAY_SHIFT), record_id & LOCAL_ID_MASK
+    except OverflowError:
+        raise ValueError(f"Record id {record_id} is out of range.")
+
+def day_base(day: date) -> int:
+    """
+    The id of a day's partition row 0: rowid + day_base(day) is the record id.
+    """
+    return record_id(day, 0)
+
+def table_name(day: date) -> str:
+    return f"{TABLE_PREFIX}{day:%Y%m%d}"
+
+def today() -> date:
+    return datetime.now(dt.UTC).date()
+
+class DailyPartitions:
+    """
+    Record storage split into one table per UTC day (records_YYYYMMDD),
+    each with the columns and indexes of `records`, and its own full-text index.
+
+    Record ids carry their day, so a read by id goes straight to one table,
+    and a time-range read only visits the days it covers. Retention drops
+    whole tables instead of deleting rows: one DROP TABLE per day, whose
+    pages go back to SQLite's freelist for reuse.
+
+    A day's table holds at most 2**32 - 1 records.
+    """
+    def __init__(self, retention_days: int = 14):
+        self.retention_days = retention_days
+        self.metadata = MetaData()
+        # Days whose table is known to exist (created or seen by this process)
+        self._created: Set[date] = set()
+
+    def table(self, day: date) -> Table:
+        name = table_name(day)
+        if name not in self.metadata.tables:
+            columns = [column._copy() for column in Record.__table__.columns]
+            table = Table(name, self.metadata, *columns)
+            # Index names are global in SQLite: rename them per table.
+            # Columns declared with index=True bring their own, already named for the table.
+            existing = {index.name for index in table.indexes}
+            for index in Record.__table__.indexes:
+                index_name = index.name.replace("ix_records_", f"ix_{name}_")
+                if index_name not in existing:
+                    Index(index_name, *[table.c[column.name] for column in index.columns])
+            search.attach(table)
+        return self.metadata.tables[name]
+
+    def days(self, db: Session) -> List[date]:
+        """
+        Days that have a partition table, oldest first.
+        """
+        names = db.execute(
+            text("SELECT name FROM sqlite_master WHERE type = 'table' AND name GLOB :pattern"),
+            {"pattern": TABLE_PREFIX + "[0-9]" * 8}
+        ).scalars()
+        return sorted(datetime.strptime(name[len(TABLE_PREFIX):], "%Y%m%d").date() for name in names)
+
+    def days_between(
+        self,
+        db: Session,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None
+    ) -> List[date]:
+        """
+        Days that have a partition and overlap [since, until).
+        """
+        return [
+            day for day in self.days(db)
+            if (since is None or day >= since.date()) and (until is None or datetime.combine(day, datetime.min.time()) < until)
+        ]
+
+    def ensure(self, db: Session, day: date) -> Table:
+        """
+        Creates the day's table and indexes if needed, in db's transaction.
+        Call created() once that transaction has committed.
+        """
+        table = self.table(day)
+        if day not in self._created:
+            table.create(db.connection(), checkfirst=True)
+        return table
+
+    def created(self, days: Set[date]):
+        self._created |= days
+
+    def prune(self, db: Session, on: Optional[date] = None) -> List[date]:
+        """
+        Drops the partitions of days more than retention_days before `on`
+        (default: today, UTC), along with their minutes of the count rollup
+        and their idempotency keys, and commits. Returns the dropped days.
+        """
+        if self.retention_days <= 0:
+            return []
+        cutoff = (on or today()) - timedelta(days=self.retention_days)
+        dropped = [day for day in self.days(db) if day < cutoff]
+        try:
+            for day in dropped:
+                self.table(day).drop(db.connection())
+            if dropped:
+                expired = datetime.combine(max(dropped) + timedelta(days=1), datetime.min.time())
+                rollups.expire_before(db, expired)
+                # Their records are gone, so a retry can no longer be answered with them
+                db.execute(delete(IdempotencyKey).where(IdempotencyKey.created_at < expired))
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        self._created -= set(dropped)
+        return dropped
+
+_partitions: Optional[DailyPartitions] = None
+
+def get_partitions() -> Optional[DailyPartitions]:
+    """
+    The daily partitions records are stored in, or None when records go to
+    the single `records` table (INGEST_PARTITION_BY_DAY unset).
+    """
+    global _partitions
+    settings = get_settings()
+    if _partitions is None and settings.partition_by_day:
+        _partitions = DailyPartitions(settings.retention_days)
+    return _partitions
+
+def set_partitions(partitions: Optional[DailyPartitions]):
+    """
+    Replaces the partitions (None: back to the settings on next use).
+    """
+    global _partitions
+    _partitions = partitions
+
+def main():
+    parser = argparse.ArgumentParser(description="Manage daily record partitions.")
+    parser.add_argument("command", choices=["list", "prune"])
+    parser.add_argument("--retention-days", type=int, default=get_settings().retention_days)
+    args = parser.parse_args()
+
+    from .database import SessionLocal
+
+    partitions = DailyPartitions(args.retention_days)
+    db = SessionLocal()
+    try:
+        if args.command == "list":
+            for day in partitions.days(db):
+                count = db.execute(select(func.count()).select_from(partitions.table(day))).scalar()
+                print(f"{table_name(day)}  {count:>12,}")
+        else:
+            dropped = partitions.prune(db)
+            print(f"Dropped {len(dropped)} partition(s): {', '.join(map(table_name, dropped)) or '-'}")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
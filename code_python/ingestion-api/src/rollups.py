@@ -0,0 +1,175 @@
+import argparse
+from collections import Counter
+from datetime import datetime
+from typing import Optional, List, Dict, Any, Sequence, Tuple, Iterable
+from sqlalchemy import Table, delete, func, select, update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+from .models import Record, RecordRollup, RecordTotal
+from .pagination import to_stored_time
+
+def minute_of(timestamp: datetime) -> datetime:
+    """
+    Start of the minute bucket a (naive UTC or aware) timestamp falls in.
+    """
+    return to_stored_time(timestamp).replace(second=0, microsecond=0)
+
+def count_rows(rows: Iterable[Dict[str, Any]]) -> Counter:
+    """
+    (minute, service_name, severity) counts of rows about to be inserted.
+    Every row needs its timestamp.
+    """
+    return Counter((minute_of(row["timestamp"]), row["service_name"], row["severity"]) for row in rows)
+
+def _upsert(db: Session, table: Table, params: List[Dict[str, Any]]):
+    key = [column.name for column in table.primary_key]
+    statement = sqlite_insert(table)
+    statement = statement.on_conflict_do_update(
+        index_elements=key,
+        set_={"count": table.c.count + statement.excluded.count}
+    )
+    db.execute(statement, params)
+
+def add_counts(db: Session, counts: Counter):
+    """
+    Adds counts to the per-minute rollup and the totals, in db's transaction:
+    call it in the transaction that inserts the counted records, so the
+    rollup commits (or rolls back) with them.
+
+    Each is one executemany upsert with a parameter set per distinct bucket,
+    not per record.
+    """
+    if not counts:
+        return
+    totals = Counter()
+    for (_, service_name, severity), count in counts.items():
+        totals[service_name, severity] += count
+    _upsert(db, RecordRollup.__table__, [
+        {"minute": minute, "service_name": service_name, "severity": severity, "count": count}
+        for (minute, service_name, severity), count in counts.items()
+    ])
+    _upsert(db, RecordTotal.__table__, [
+        {"service_name": service_name, "severity": severity, "count": count}
+        for (service_name, severity), count in totals.items()
+    ])
+
+def add_rows(db: Session, rows: Sequence[Dict[str, Any]]):
+    add_counts(db, count_rows(rows))
+
+def expire_before(db: Session, cutoff: datetime):
+    """
+    Removes the minutes before cutoff from the rollup and their counts from
+    the totals, in db's transaction; for records deleted by retention.
+    """
+    expired = select(
+        RecordRollup.service_name, RecordRollup.severity, func.sum(RecordRollup.count)
+    ).where(RecordRollup.minute < cutoff).group_by(RecordRollup.service_name, RecordRollup.severity)
+    for service_name, severity, count in db.execute(expired).all():
+        db.execute(
+            update(RecordTotal)
+            .where(RecordTotal.service_name == service_name, RecordTotal.severity == severity)
+            .values(count=RecordTotal.count - count)
+        )
+    db.execute(delete(RecordTotal).where(RecordTotal.count <= 0))
+    db.execute(delete(RecordRollup).where(RecordRollup.minute < cutoff))
+
+def _rollup_filters(statement, service_name: Optional[str], severity: Optional[str], table):
+    if service_name is not None:
+        statement = statement.where(table.service_name == service_name)
+    if severity is not None:
+        statement = statement.where(table.severity == severity)
+    return statement
+
+def counts(
+    db: Session,
+    service_name: Optional[str] = None,
+    severity: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None
+) -> List[Tuple[str, str, int]]:
+    """
+    (service_name, severity, count) of records matching the filters.
+
+    Without a time range this reads the totals, one row per service and
+    severity. With one, it sums the rollup minutes starting in
+    [minute_of(since), until): work bounded by the minutes in the range,
+    never by the number of records.
+    """
+    if since is None and until is None:
+        statement = select(RecordTotal.service_name, RecordTotal.severity, RecordTotal.count)
+        statement = _rollup_filters(statement, service_name, severity, RecordTotal)
+        return [tuple(row) for row in db.execute(statement.order_by(RecordTotal.service_name, RecordTotal.severity))]
+
+    statement = select(RecordRollup.service_name, RecordRollup.severity, func.sum(RecordRollup.count))
+    statement = _rollup_filters(_minute_range(statement, since, until), service_name, severity, RecordRollup)
+    statement = statement.group_by(RecordRollup.service_name, RecordRollup.severity)
+    return [tuple(row) for row in db.execute(statement.order_by(RecordRollup.service_name, RecordRollup.severity))]
+
+def minutes(
+    db: Session,
+    service_name: Optional[str] = None,
+    severity: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None
+) -> List[Tuple[datetime, str, str, int]]:
+    """
+    (minute, service_name, severity, count) rollup rows matching the filters, oldest first.
+    """
+    statement = select(RecordRollup.minute, RecordRollup.service_name, RecordRollup.severity, RecordRollup.count)
+    statement = _rollup_filters(_minute_range(statement, since, until), service_name, severity, RecordRollup)
+    statement = statement.order_by(RecordRollup.minute, RecordRollup.service_name, RecordRollup.severity)
+    return [tuple(row) for row in db.execute(statement)]
+
+def _minute_range(statement, since: Optional[datetime], until: Optional[datetime]):
+    if since is not None:
+        statement = statement.where(RecordRollup.minute >= minute_of(since))
+    if until is not None:
+        statement = statement.where(RecordRollup.minute < to_stored_time(until))
+    return statement
+
+def rebuild(db: Session, tables: Sequence[Table]) -> int:
+    """
+    Recomputes the rollup and totals from the records in `tables` and
+    commits; for records stored before the rollup existed.
+    Returns the number of records counted.
+    """
+    rebuilt = Counter()
+    for table in tables:
+        # Timestamps are stored as 'YYYY-MM-DD HH:MM:SS.ffffff': the first 16 characters are the minute
+        minute = func.substr(table.c.timestamp, 1, 16)
+        grouped = select(minute, table.c.service_name, table.c.severity, func.count()).group_by(
+            minute, table.c.service_name, table.c.severity
+        )
+        for stored_minute, service_name, severity, count in db.execute(grouped):
+            rebuilt[datetime.strptime(stored_minute, "%Y-%m-%d %H:%M"), service_name, severity] += count
+    try:
+        db.execute(delete(RecordRollup))
+        db.execute(delete(RecordTotal))
+        add_counts(db, rebuilt)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return sum(rebuilt.values())
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild the per-minute record count rollup.")
+    parser.add_argument("command", choices=["rebuild"])
+    parser.parse_args()
+
+    from .database import Base, SessionLocal, engine
+    from .partitions import get_partitions
+
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        partitions = get_partitions()
+        tables = [Record.__table__]
+        if partitions is not None:
+            tables += [partitions.table(day) for day in partitions.days(db)]
+        print(f"Counted {rebuild(db, tables):,} records")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+import argparse
+import re
+from typing import Optional, List
+from sqlalchemy import Column, Integer, MetaData, String, Table, event
+from sqlalchemy.engine import Connection
+from .config import get_settings
+
+# FTS5 tokenizers: whole words (case and accent folded), or any substring of 3+ characters
+TOKENIZERS = {
+    "unicode61": "unicode61 remove_diacritics 2",
+    "trigram": "trigram",
+}
+
+_metadata = MetaData()
+
+class SearchQueryError(ValueError):
+    pass
+
+def fts_name(table_name: str) -> str:
+    return f"{table_name}_fts"
+
+def fts_table(table_name: str) -> Table:
+    """
+    The full-text index of a record table, for use in queries: its rowid is
+    the record's id. Not part of Base.metadata; create_index() creates it.
+    """
+    name = fts_name(table_name)
+    if name not in _metadata.tables:
+        Table(name, _metadata, Column("rowid", Integer, primary_key=True), Column("message", String))
+    return _metadata.tables[name]
+
+def _ddl(table_name: str, tokenizer: str) -> List[str]:
+    fts = fts_name(table_name)
+    # External content: the index stores only the inverted index, and reads
+    # message text from the record table by rowid. Triggers keep it in sync.
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5("
+        f"message, content='{table_name}', content_rowid='id', tokenize='{TOKENIZERS[tokenizer]}')",
+        f"CREATE TRIGGER IF NOT EXISTS {table_name}_fts_insert AFTER INSERT ON {table_name} BEGIN "
+        f"INSERT INTO {fts}(rowid, message) VALUES (new.id, new.message); END",
+        f"CREATE TRIGGER IF NOT EXISTS {table_name}_fts_delete AFTER DELETE ON {table_name} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, message) VALUES ('delete', old.id, old.message); END",
+        f"CREATE TRIGGER IF NOT EXISTS {table_name}_fts_update AFTER UPDATE OF message ON {table_name} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, message) VALUES ('delete', old.id, old.message); "
+        f"INSERT INTO {fts}(rowid, message) VALUES (new.id, new.message); END",
+    ]
+
+def create_index(connection: Connection, table_name: str, tokenizer: Optional[str] = None):
+    """
+    Creates a record table's full-text index and its sync triggers, if
+    missing. The tokenizer (default: INGEST_SEARCH_TOKENIZER) only applies
+    to a new index.
+    """
+    for statement in _ddl(table_name, tokenizer or get_settings().search_tokenizer):
+        connection.exec_driver_sql(statement)
+
+def _after_create(table: Table, connection: Connection, **kw):
+    if connection.dialect.name == "sqlite":
+        create_index(connection, table.name)
+
+def _before_drop(table: Table, connection: Connection, **kw):
+    # The triggers go with the record table; the index has to be dropped by hand
+    if connection.dialect.name == "sqlite":
+        connection.exec_driver_sql(f"DROP TABLE IF EXISTS {fts_name(table.name)}")
+
+def attach(table: Table):
+    """
+    Gives a record table a full-text index of its messages, created and
+    dropped along with the table.
+    """
+    event.listen(table, "after_create", _after_create)
+    event.listen(table, "before_drop", _before_drop)
+
+def rebuild(connection: Connection, table_name: str, tokenizer: Optional[str] = None):
+    """
+    Creates the index if missing and (re)indexes every record of the table;
+    for tables created before search existed.
+    """
+    create_index(connection, table_name, tokenizer)
+    fts = fts_name(table_name)
+    connection.exec_driver_sql(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+
+def match_query(q: str) -> str:
+    """
+    FTS5 MATCH expression for plain search text: records containing every
+    whitespace-separated term. Terms are quoted, so FTS5 operators and
+    punctuation in them are searched for, not interpreted.
+    """
+    # FTS5 ends a string at NUL, then fails on the unterminated quote;
+    # other control characters are matched like any separator
+    if "\0" in q:
+        raise SearchQueryError("Search text must not contain NUL characters.")
+    terms = [term for term in re.split(r"\s+", q) if term]
+    if not terms:
+        raise SearchQueryError("Search text is empty.")
+    return " ".join('"{}"'.format(term.replace('"', '""')) for term in terms)
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the full-text index of record messages.")
+    parser.add_argument("command", choices=["rebuild"])
+    parser.add_argument("--tokenizer", choices=list(TOKENIZERS), help="For a new index; default INGEST_SEARCH_TOKENIZER.")
+    args = parser.parse_args()
+
+    from .database import Base, SessionLocal, engine
+    from .models import Record
+    from .partitions import get_partitions
+
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        tables = [Record.__table__]
+        partitions = get_partitions()
+        if partitions is not None:
+            tables += [partitions.table(day) for day in partitions.days(db)]
+        for table in tables:
+            rebuild(db.connection(), table.name, args.tokenizer)
+            print(f"Indexed {table.name}")
+        db.commit()
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from src.cache import get_record_cache
+from src.database import Base, get_db, get_read_sessions, get_write_db, get_write_sessions
+from src.main import app
+
+@pytest.fixture(autouse=True)
+def clear_record_cache():
+    # Every test starts from an empty database, so cached ids from earlier tests would be stale
+    record_cache = get_record_cache()
+    if record_cache is not None:
+        record_cache.clear()
+    yield
+
+@pytest.fixture
+def engine():
+    """
+    A fresh in-memory database with every table; one connection shared by all sessions.
+    """
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    yield engine
+    engine.dispose()
+
+@pytest.fixture
+def sessions(engine):
+    return sessionmaker(bind=engine)
+
+@pytest.fixture
+def db(sessions):
+    db = sessions()
+    yield db
+    db.close()
+
+@pytest.fixture
+def client(sessions, monkeypatch):
+    """
+    TestClient of the app with every session dependency on the test database.
+    """
+    def override():
+        db = sessions()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    for dependency in (get_db, get_write_db):
+        monkeypatch.setitem(app.dependency_overrides, dependency, override)
+    for dependency in (get_write_sessions, get_read_sessions):
+        monkeypatch.setitem(app.dependency_overrides, dependency, lambda: sessions)
+    return TestClient(app)
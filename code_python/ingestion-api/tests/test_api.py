@@ -4,7 +4,7 @@ from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import StaticPool
 import pytest
 
-from src.main import app, get_db
+from src.main import app, get_db, get_write_db, get_read_sessions, get_write_sessions
 from src.database import Base
 
 # Create in-memory SQLite database for testing
@@ -25,6 +25,9 @@ def override_get_db():
         db.close()
 
 app.dependency_overrides[get_db] = override_get_db
+app.dependency_overrides[get_write_db] = override_get_db
+app.dependency_overrides[get_read_sessions] = lambda: TestingSessionLocal
+app.dependency_overrides[get_write_sessions] = lambda: TestingSessionLocal
 
 client = TestClient(app)
 
@@ -88,3 +91,304 @@ def test_health_check():
     response = client.get("/health")
     assert response.status_code == 200
     assert response.json() == {"status": "ok"}
+
+def _record(i, severity="INFO"):
+    return {"service_name": "batch-service", "severity": severity, "message": f"Event {i}", "payload": {"i": i}}
+
+def test_create_records_batch_json_array():
+    response = client.post("/records/batch", json=[_record(0), _record(1, "NOPE"), _record(2)])
+    assert response.status_code == 201
+    data = response.json()
+    assert data["inserted"] == 2
+    assert data["ids"][1] is None
+    assert [e["index"] for e in data["errors"]] == [1]
+    assert data["errors"][0]["errors"][0]["loc"] == ["severity"]
+
+    # ids are assigned in body order and point at the matching rows
+    first, _, last = data["ids"]
+    assert first < last
+    assert client.get(f"/records/{last}").json()["payload"] == {"i": 2}
+
+def test_create_records_batch_ndjson():
+    import json
+    lines = [json.dumps(_record(i)) for i in range(5)]
+    body = "\n".join(lines[:2] + ["", "{not json"] + lines[2:]) + "\n"
+    response = client.post(
+        "/records/batch",
+        content=body,
+        headers={"Content-Type": "application/x-ndjson"}
+    )
+    assert response.status_code == 201
+    data = response.json()
+    assert data["inserted"] == 5
+    assert data["ids"][2] is None
+    assert data["errors"][0]["errors"][0]["type"] == "json_invalid"
+    assert client.get(f"/records/{data['ids'][5]}").json()["message"] == "Event 4"
+
+def test_create_records_batch_rejects_bad_bodies(monkeypatch):
+    response = client.post("/records/batch", content=b"[{", headers={"Content-Type": "application/json"})
+    assert response.status_code == 400
+
+    import src.batch
+    monkeypatch.setattr(src.batch, "MAX_BATCH_SIZE", 2)
+    response = client.post("/records/batch", json=[_record(i) for i in range(3)])
+    assert response.status_code == 413
+
+    response = client.post("/records/batch", json=[])
+    assert response.status_code == 201
+    assert response.json() == {"inserted": 0, "ids": [], "errors": []}
+
+def test_group_commit_buffer_batches_concurrent_inserts():
+    import asyncio
+    from src.buffer import WriteBuffer
+
+    write_buffer = WriteBuffer(TestingSessionLocal, max_records=8, max_delay_ms=50)
+
+    async def submit_all():
+        rows = [{"service_name": "gc", "severity": "INFO", "message": f"m{i}"} for i in range(20)]
+        ids = await asyncio.gather(*(write_buffer.submit(row) for row in rows))
+        await write_buffer.close()
+        return ids
+
+    ids = asyncio.run(submit_all())
+    assert ids == sorted(ids) and len(set(ids)) == 20
+    metrics = write_buffer.metrics()
+    # 8 + 8 flushed as soon as they were full, the last 4 after the delay
+    assert metrics["flushes"] == 3
+    assert metrics["records_flushed"] == 20
+    assert metrics["depth"] == 0
+    assert client.get(f"/records/{ids[-1]}").json()["message"] == "m19"
+
+def test_create_record_with_group_commit():
+    from src.buffer import WriteBuffer, get_write_buffer
+
+    write_buffer = WriteBuffer(TestingSessionLocal, max_records=100, max_delay_ms=1)
+    app.dependency_overrides[get_write_buffer] = lambda: write_buffer
+    try:
+        response = client.post(
+            "/records/",
+            json={"service_name": "gc-service", "severity": "WARN", "message": "Buffered"},
+        )
+        assert response.status_code == 201
+        data = response.json()
+        assert client.get(f"/records/{data['id']}").json() == data
+
+        metrics = client.get("/metrics").json()["write_buffer"]
+        assert metrics["records_flushed"] == 1
+        assert metrics["last_latency_ms"] >= metrics["last_flush_ms"] > 0
+    finally:
+        del app.dependency_overrides[get_write_buffer]
+
+    assert client.get("/metrics").json()["write_buffer"] is None
+
+def test_read_record_cached():
+    from src.cache import get_record_cache
+
+    record_id = client.post(
+        "/records/", json={"service_name": "cache-service", "severity": "INFO", "message": "Cached"}
+    ).json()["id"]
+    # Counters are cumulative over the process
+    before = client.get("/metrics").json()["record_cache"]
+    first = client.get(f"/records/{record_id}")
+    # Deleted behind the cache's back: the second read must not touch the database
+    with engine.begin() as conn:
+        conn.exec_driver_sql("DELETE FROM records")
+    second = client.get(f"/records/{record_id}")
+    assert second.status_code == 200
+    assert second.content == first.content
+    assert second.json()["message"] == "Cached"
+
+    metrics = client.get("/metrics").json()["record_cache"]
+    assert metrics["hits"] - before["hits"] == 1
+    assert metrics["misses"] - before["misses"] == 1
+    assert metrics["entries"] == 1
+
+    app.dependency_overrides[get_record_cache] = lambda: None
+    try:
+        assert client.get(f"/records/{record_id}").status_code == 404
+    finally:
+        del app.dependency_overrides[get_record_cache]
+
+def _seed_for_listing():
+    records = [
+        {"service_name": f"svc-{i % 3}", "severity": ["INFO", "WARN", "ERROR"][i % 3 == 0 and 2 or i % 2], "message": f"m{i}"}
+        for i in range(25)
+    ]
+    return client.post("/records/batch", json=records).json()["ids"]
+
+def test_list_records_keyset_pagination():
+    ids = _seed_for_listing()
+    seen = []
+    cursor = None
+    while True:
+        params = {"limit": 10}
+        if cursor is not None:
+            params["cursor"] = cursor
+        page = client.get("/records", params=params).json()
+        seen += [item["id"] for item in page["items"]]
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    assert seen == ids
+
+    # Polling with the last cursor picks up records added later
+    last = client.get("/records", params={"limit": 25}).json()["items"][-1]
+    from src.pagination import encode_cursor
+    from datetime import datetime
+    cursor = encode_cursor(datetime.fromisoformat(last["timestamp"]), last["id"])
+    assert client.get("/records", params={"cursor": cursor}).json()["items"] == []
+    new_id = client.post("/records/", json={"service_name": "late", "severity": "INFO", "message": "new"}).json()["id"]
+    assert [item["id"] for item in client.get("/records", params={"cursor": cursor}).json()["items"]] == [new_id]
+
+def test_list_records_filters():
+    _seed_for_listing()
+    page = client.get("/records", params={"service_name": "svc-1", "severity": "WARN"}).json()
+    assert page["items"] and page["next_cursor"] is None
+    assert all(item["service_name"] == "svc-1" and item["severity"] == "WARN" for item in page["items"])
+
+    items = client.get("/records").json()["items"]
+    middle = items[10]["timestamp"]
+    since = client.get("/records", params={"since": middle}).json()["items"]
+    until = client.get("/records", params={"until": middle}).json()["items"]
+    assert len(since) + len(until) == len(items)
+    assert all(item["timestamp"] >= middle for item in since)
+
+    assert client.get("/records", params={"cursor": "not-a-cursor"}).status_code == 400
+    assert client.get("/records", params={"severity": "LOUD"}).status_code == 422
+    assert client.get("/records", params={"limit": 0}).status_code == 422
+
+@pytest.mark.parametrize("filters", [
+    {},
+    {"service_name": "svc-1"},
+    {"severity": "ERROR"},
+    {"service_name": "svc-1", "severity": "ERROR"},
+    {"since": "2024-01-01T00:00:00", "until": "2030-01-01T00:00:00"},
+    {"service_name": "svc-1", "since": "2024-01-01T00:00:00", "after": ("2024-06-01T00:00:00", 10)},
+    {"severity": "WARN", "after": ("2024-06-01T00:00:00", 10)},
+    {"after": ("2024-06-01T00:00:00", 10)},
+])
+def test_list_records_query_uses_indexes(filters):
+    from datetime import datetime
+    from src.crud import list_records_query
+
+    filters = dict(filters)
+    for key in ("since", "until"):
+        if key in filters:
+            filters[key] = datetime.fromisoformat(filters[key])
+    if "after" in filters:
+        filters["after"] = (datetime.fromisoformat(filters["after"][0]), filters["after"][1])
+
+    compiled = list_records_query(**filters).compile(dialect=engine.dialect)
+    parameters = compiled.construct_params()
+    with engine.connect() as conn:
+        plan = [
+            row[3] for row in conn.exec_driver_sql(
+                "EXPLAIN QUERY PLAN " + str(compiled),
+                tuple(parameters[name] for name in compiled.positiontup)
+            )
+        ]
+    # Neither a full table scan nor a sort: an index finds the rows in keyset order
+    assert all("USING INDEX" in step or "USING INTEGER PRIMARY KEY" in step for step in plan), plan
+    assert not any("TEMP B-TREE" in step for step in plan), plan
+    if filters:
+        assert all(step.startswith("SEARCH") for step in plan), plan
+
+def test_export_ndjson():
+    import json
+    ids = _seed_for_listing()
+    response = client.get("/records/export", params={"service_name": "svc-1"})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    exported = [json.loads(line) for line in response.text.splitlines()]
+    listed = client.get("/records", params={"service_name": "svc-1"}).json()["items"]
+    assert exported == listed
+    assert len(client.get("/records/export").text.splitlines()) == len(ids)
+
+def test_export_csv():
+    import csv
+    import io
+    _seed_for_listing()
+    response = client.get("/records/export", params={"format": "csv", "severity": "ERROR"})
+    assert response.headers["content-type"].startswith("text/csv")
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    listed = client.get("/records", params={"severity": "ERROR"}).json()["items"]
+    assert [int(row["id"]) for row in rows] == [item["id"] for item in listed]
+    assert rows[0]["payload"] == ""
+    assert client.get("/records/export", params={"format": "xml"}).status_code == 422
+
+def test_export_memory_does_not_grow_with_size():
+    import tracemalloc
+    from src.crud import insert_rows
+    from src.export import stream_records
+
+    def add_rows(count):
+        db = TestingSessionLocal()
+        try:
+            insert_rows(db, [{"service_name": "bulk", "severity": "INFO", "message": "x" * 100}] * count)
+        finally:
+            db.close()
+
+    def export_peak():
+        tracemalloc.start()
+        try:
+            exported = sum(len(chunk) for chunk in stream_records(TestingSessionLocal, "ndjson", chunk_size=16 * 1024))
+            return exported, tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+    add_rows(2_000)
+    small_size, small_peak = export_peak()
+    add_rows(18_000)
+    large_size, large_peak = export_peak()
+    assert large_size > small_size * 9
+    assert large_peak < small_peak * 1.5
+
+def test_idempotency_key_returns_original_record(monkeypatch):
+    import src.crud
+    from src.bloom import BloomFilter, set_idempotency_filter
+
+    set_idempotency_filter(BloomFilter(capacity=1000))
+    lookups = []
+    lookup = src.crud.get_record_by_idempotency_key
+    monkeypatch.setattr(src.crud, "get_record_by_idempotency_key", lambda *args: lookups.append(args) or lookup(*args))
+    try:
+        record = {"service_name": "billing", "severity": "INFO", "message": "charged"}
+        first = client.post("/records/", json=record, headers={"Idempotency-Key": "charge-1"})
+        assert first.status_code == 201
+        # A key the filter has not seen is inserted without a lookup
+        assert lookups == []
+
+        retry = client.post("/records/", json=record, headers={"Idempotency-Key": "charge-1"})
+        assert retry.status_code == 200
+        assert retry.headers["Idempotent-Replayed"] == "true"
+        assert retry.json() == first.json()
+
+        other = client.post("/records/", json=record, headers={"Idempotency-Key": "charge-2"})
+        assert other.status_code == 201
+        assert client.post("/records/", json=record).status_code == 201
+        assert len(client.get("/records").json()["items"]) == 3
+        # The replay of charge-1 did not count its key twice
+        assert client.get("/metrics").json()["idempotency_filter"]["keys"] == 2
+
+        # A filter that never saw the key (another process, a restart) misses
+        # it; the unique key still turns the insert into a replay
+        set_idempotency_filter(BloomFilter(capacity=1000))
+        lookups.clear()
+        replay = client.post("/records/", json=record, headers={"Idempotency-Key": "charge-2"})
+        assert replay.status_code == 200
+        assert replay.json()["id"] == other.json()["id"]
+        assert len(client.get("/records").json()["items"]) == 3
+        assert client.get("/metrics").json()["idempotency_filter"]["keys"] == 1
+    finally:
+        set_idempotency_filter(None)
+
+def test_idempotency_key_without_filter(monkeypatch):
+    from src.bloom import get_idempotency_filter
+
+    monkeypatch.setitem(app.dependency_overrides, get_idempotency_filter, lambda: None)
+    record = {"service_name": "billing", "severity": "INFO", "message": "charged"}
+    first = client.post("/records/", json=record, headers={"Idempotency-Key": "k"})
+    retry = client.post("/records/", json=record, headers={"Idempotency-Key": "k"})
+    assert (first.status_code, retry.status_code) == (201, 200)
+    assert retry.json()["id"] == first.json()["id"]
+    assert client.post("/records/", json=record, headers={"Idempotency-Key": ""}).status_code == 422
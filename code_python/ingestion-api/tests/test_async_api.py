@@ -0,0 +1,83 @@
+import asyncio
+import httpx
+import pytest
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from src.async_main import app
+from src.async_database import async_url, create_async_engines, get_db, get_write_db
+from src.config import Settings
+from src.database import Base
+
+@pytest.fixture
+def run(tmp_path):
+    """
+    Runs a test coroutine against the async app on a fresh file database,
+    with all requests on one event loop as under a real server.
+    """
+    def run_with_client(test):
+        async def main():
+            write_engine, read_engine = create_async_engines(
+                Settings(database_url=f"sqlite:///{tmp_path / 'test.db'}")
+            )
+            async with write_engine.begin() as conn:
+                await conn.run_sync(Base.metadata.create_all)
+
+            def session_dependency(engine):
+                sessions = async_sessionmaker(engine, autoflush=False, expire_on_commit=False)
+
+                async def override():
+                    async with sessions() as db:
+                        yield db
+                return override
+
+            app.dependency_overrides[get_write_db] = session_dependency(write_engine)
+            app.dependency_overrides[get_db] = session_dependency(read_engine)
+            try:
+                transport = httpx.ASGITransport(app=app)
+                async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                    await test(client)
+            finally:
+                app.dependency_overrides.clear()
+                await write_engine.dispose()
+                await read_engine.dispose()
+        asyncio.run(main())
+    return run_with_client
+
+def test_async_url():
+    assert async_url("sqlite:///./ingestion.db") == "sqlite+aiosqlite:///./ingestion.db"
+    assert async_url("sqlite+aiosqlite:///x.db") == "sqlite+aiosqlite:///x.db"
+
+def test_create_and_read_record(run):
+    async def test(client):
+        response = await client.post(
+            "/records/",
+            json={"service_name": "auth-service", "severity": "ERROR", "message": "Login failed", "payload": {"a": 1}},
+        )
+        assert response.status_code == 201
+        data = response.json()
+        assert (await client.get(f"/records/{data['id']}")).json() == data
+        assert (await client.get("/records/99999")).status_code == 404
+    run(test)
+
+def test_concurrent_inserts(run):
+    async def test(client):
+        responses = await asyncio.gather(*(
+            client.post("/records/", json={"service_name": "svc", "severity": "INFO", "message": f"m{i}"})
+            for i in range(50)
+        ))
+        ids = [response.json()["id"] for response in responses]
+        assert len(set(ids)) == 50
+    run(test)
+
+def test_create_records_batch(run):
+    async def test(client):
+        records = [
+            {"service_name": "batch", "severity": severity, "message": f"Event {i}"}
+            for i, severity in enumerate(["INFO", "NOPE", "WARN"])
+        ]
+        data = (await client.post("/records/batch", json=records)).json()
+        assert data["inserted"] == 2
+        assert data["ids"][1] is None
+        assert (await client.get(f"/records/{data['ids'][2]}")).json()["message"] == "Event 2"
+        assert (await client.post("/records/batch", content=b"[{")).status_code == 400
+    run(test)
@@ -0,0 +1,42 @@
+import pytest
+
+from src.bloom import BloomFilter
+
+def test_no_false_negatives():
+    bloom_filter = BloomFilter(capacity=1000, error_rate=0.01)
+    keys = [f"key-{i}" for i in range(1000)]
+    for key in keys:
+        bloom_filter.add(key)
+    assert all(key in bloom_filter for key in keys)
+    # Near capacity, a few new keys find all their bits set and go uncounted
+    assert 990 <= bloom_filter.count <= 1000
+
+def test_adding_a_key_again_does_not_count():
+    bloom_filter = BloomFilter(capacity=1000, error_rate=0.01)
+    assert bloom_filter.add("key") is True
+    assert bloom_filter.add("key") is False
+    assert bloom_filter.count == 1
+
+def test_false_positive_rate_near_target():
+    bloom_filter = BloomFilter(capacity=10_000, error_rate=0.01)
+    for i in range(10_000):
+        bloom_filter.add(f"added-{i}")
+    false_positives = sum(f"other-{i}" in bloom_filter for i in range(20_000))
+    assert false_positives / 20_000 < 0.02
+    assert bloom_filter.false_positive_rate() == pytest.approx(0.01, rel=0.1)
+
+def test_sizing_and_metrics():
+    bloom_filter = BloomFilter(capacity=1_000_000, error_rate=0.01)
+    # About 9.6 bits and 7 hashes per key at 1%
+    assert bloom_filter.hashes == 7
+    assert 1_150_000 < bloom_filter.metrics()["bytes"] < 1_250_000
+    assert "absent" not in bloom_filter
+    bloom_filter.add("present")
+    assert "present" in bloom_filter
+    metrics = bloom_filter.metrics()
+    assert (metrics["keys"], metrics["checks"], metrics["positives"]) == (1, 2, 1)
+
+    with pytest.raises(ValueError):
+        BloomFilter(capacity=0)
+    with pytest.raises(ValueError):
+        BloomFilter(error_rate=1.5)
@@ -0,0 +1,39 @@
+from src.cache import ResponseCache, ENTRY_OVERHEAD
+
+def test_lru_eviction_by_bytes():
+    cache = ResponseCache(max_bytes=3 * (10 + ENTRY_OVERHEAD))
+    for key in range(3):
+        cache.put(key, b"x" * 10)
+    assert cache.get(0) == b"x" * 10
+
+    # 1 is now least recently used
+    cache.put(3, b"y" * 10)
+    assert cache.get(1) is None
+    assert [cache.get(key) is not None for key in (0, 2, 3)] == [True, True, True]
+    assert cache.size == 3 * (10 + ENTRY_OVERHEAD)
+    assert cache.metrics()["evictions"] == 1
+
+    cache.put(4, b"z" * (cache.max_bytes - ENTRY_OVERHEAD))
+    assert len(cache) == 1
+    assert cache.metrics()["hits"] == 4 and cache.metrics()["misses"] == 1
+
+def test_oversized_and_replaced_entries():
+    cache = ResponseCache(max_bytes=200)
+    cache.put(1, b"x" * 500)
+    assert cache.get(1) is None and cache.size == 0
+
+    cache.put(1, b"a" * 10)
+    cache.put(1, b"b" * 20)
+    assert cache.get(1) == b"b" * 20
+    assert cache.size == 20 + ENTRY_OVERHEAD
+
+    cache.clear()
+    assert len(cache) == 0 and cache.size == 0
+
+def test_discard_below():
+    cache = ResponseCache()
+    for key in (5, 1, 9, 3):
+        cache.put(key, b"v")
+    cache.discard_below(5)
+    assert len(cache) == 2 and cache.get(5) == b"v" and cache.get(3) is None
+    assert cache.size == 2 * (1 + ENTRY_OVERHEAD)
@@ -0,0 +1,113 @@
+import pytest
+
+from src import crud
+from src.compression import (
+    DICT_ID, PayloadCodec, dictionary_id, set_payload_codec, train_dictionary, zstandard,
+    ZLIB, ZLIB_DICT, ZSTD, ZSTD_DICT
+)
+from src.config import Settings
+from src.models import Record, RecordResponse
+
+def _payload(i):
+    return {
+        "request_id": f"req-{i:08d}",
+        "method": "GET",
+        "path": f"/api/v1/orders/{i}",
+        "status": 200,
+        "user_agent": "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36",
+        "duration_ms": i % 300,
+    }
+
+SAMPLES = [_payload(i) for i in range(1000, 1500)]
+
+CODECS = [
+    ("none", False, None),
+    ("zlib", False, ZLIB),
+    ("zlib", True, ZLIB_DICT),
+    pytest.param("zstd", False, ZSTD, marks=pytest.mark.skipif(zstandard is None, reason="needs zstandard")),
+    pytest.param("zstd", True, ZSTD_DICT, marks=pytest.mark.skipif(zstandard is None, reason="needs zstandard")),
+]
+
+def _codec(name, with_dictionary):
+    dictionary = train_dictionary(SAMPLES, name, size=4096) if with_dictionary else None
+    return PayloadCodec(name, dictionary=dictionary)
+
+@pytest.fixture
+def session_factory(sessions):
+    yield sessions
+    set_payload_codec(None)
+
+@pytest.mark.parametrize("name,with_dictionary,header", CODECS)
+def test_codec_round_trip(name, with_dictionary, header):
+    codec = _codec(name, with_dictionary)
+    payload = _payload(7)
+    stored = codec.encode(payload)
+    assert codec.decode(stored) == payload
+    if header is None:
+        assert isinstance(stored, str)
+    else:
+        assert stored[0] == header
+    # Plain JSON, as stored before compression was enabled, stays readable
+    assert codec.decode('{"a": [1, 2]}') == {"a": [1, 2]}
+
+def test_dictionary_shrinks_small_payloads():
+    plain = len(PayloadCodec("none").encode(_payload(3)))
+    zlib_only = len(_codec("zlib", False).encode(_payload(3)))
+    with_dictionary = len(_codec("zlib", True).encode(_payload(3)))
+    assert with_dictionary < zlib_only < plain
+    assert with_dictionary < plain / 2
+
+def test_missing_dictionary():
+    stored = _codec("zlib", True).encode(_payload(1))
+    with pytest.raises(LookupError):
+        PayloadCodec("zlib").decode(stored)
+    with pytest.raises(ValueError):
+        PayloadCodec("lz4")
+
+@pytest.mark.parametrize("name", [
+    "zlib", pytest.param("zstd", marks=pytest.mark.skipif(zstandard is None, reason="needs zstandard"))
+])
+def test_dictionary_rotation(name, tmp_path):
+    first = train_dictionary(SAMPLES, name, size=4096)
+    second = train_dictionary([{**sample, "region": "eu-west-1"} for sample in SAMPLES], name, size=2048)
+    old_stored = PayloadCodec(name, dictionary=first).encode(_payload(1))
+
+    (tmp_path / "first.dict").write_bytes(first)
+    (tmp_path / "second.dict").write_bytes(second)
+    settings = Settings(
+        payload_compression=name,
+        payload_dictionary=f"{tmp_path / 'first.dict'}, {tmp_path / 'second.dict'}"
+    )
+    codec = PayloadCodec.from_settings(settings)
+    # Writes with the newest dictionary, reads payloads written with either
+    new_stored = codec.encode(_payload(2))
+    assert new_stored[1:5] == DICT_ID.pack(dictionary_id(second))
+    assert codec.decode(old_stored) == _payload(1)
+    assert codec.decode(new_stored) == _payload(2)
+    with pytest.raises(LookupError):
+        PayloadCodec(name, dictionary=second).decode(old_stored)
+
+@pytest.mark.parametrize("name,with_dictionary,header", CODECS)
+def test_column_is_transparent(session_factory, name, with_dictionary, header):
+    db = session_factory()
+    # Written before compression was enabled
+    db.execute(
+        Record.__table__.insert(),
+        {"service_name": "old", "severity": "INFO", "message": "m", "payload": None}
+    )
+    db.connection().exec_driver_sql("UPDATE records SET payload = '{\"legacy\": true}'")
+    db.commit()
+
+    set_payload_codec(_codec(name, with_dictionary))
+    ids = crud.insert_rows(db, [
+        {"service_name": "svc", "severity": "INFO", "message": "m", "payload": _payload(i)} for i in range(3)
+    ] + [{"service_name": "svc", "severity": "INFO", "message": "m", "payload": None}])
+
+    assert crud.get_record(db, 1).payload == {"legacy": True}
+    response = RecordResponse.model_validate(crud.get_record(db, ids[0]))
+    assert response.payload == _payload(0)
+    assert crud.get_record(db, ids[-1]).payload is None
+
+    raw = db.connection().exec_driver_sql("SELECT payload FROM records WHERE id = ?", (ids[0],)).scalar()
+    assert isinstance(raw, str) if header is None else raw[0] == header
+    db.close()
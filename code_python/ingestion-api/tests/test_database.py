@@ -0,0 +1,101 @@
+import asyncio
+import httpx
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+import src.database as database
+from src.bloom import get_idempotency_filter
+from src.config import Settings
+from src.database import Base, create_engines
+from src.main import app
+
+@pytest.fixture
+def engines(tmp_path):
+    write_engine, read_engine = create_engines(
+        Settings(database_url=f"sqlite:///{tmp_path / 'test.db'}", read_pool_size=2)
+    )
+    Base.metadata.create_all(bind=write_engine)
+    yield write_engine, read_engine
+    write_engine.dispose()
+    read_engine.dispose()
+
+def test_pragmas_applied(engines):
+    write_engine, read_engine = engines
+    with write_engine.connect() as conn:
+        assert conn.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+        # NORMAL
+        assert conn.execute(text("PRAGMA synchronous")).scalar() == 1
+        assert conn.execute(text("PRAGMA cache_size")).scalar() == -64_000
+        assert conn.execute(text("PRAGMA query_only")).scalar() == 0
+    with read_engine.connect() as conn:
+        assert conn.execute(text("PRAGMA query_only")).scalar() == 1
+        with pytest.raises(OperationalError):
+            conn.execute(text("DELETE FROM records"))
+
+def test_pool_sizes(engines):
+    write_engine, read_engine = engines
+    assert write_engine.pool.size() == 1
+    assert read_engine.pool.size() == 2
+
+def test_reads_not_blocked_by_open_write(engines):
+    write_engine, read_engine = engines
+    with write_engine.begin() as writer:
+        writer.execute(text(
+            "INSERT INTO records (service_name, severity, message, timestamp) "
+            "VALUES ('svc', 'INFO', 'pending', CURRENT_TIMESTAMP)"
+        ))
+        # The uncommitted row is invisible, but the read does not wait for the writer
+        with read_engine.connect() as reader:
+            assert reader.execute(text("SELECT COUNT(*) FROM records")).scalar() == 0
+    with read_engine.connect() as reader:
+        assert reader.execute(text("SELECT COUNT(*) FROM records")).scalar() == 1
+
+def test_settings_from_env():
+    settings = Settings.from_env({
+        "INGEST_DATABASE_URL": "sqlite:///other.db",
+        "INGEST_SQLITE_SYNCHRONOUS": "FULL",
+        "INGEST_READ_POOL_SIZE": "3",
+        "INGEST_GROUP_COMMIT": "true",
+        "UNRELATED": "1",
+    })
+    assert settings.database_url == "sqlite:///other.db"
+    assert settings.sqlite_synchronous == "FULL"
+    assert settings.read_pool_size == 3
+    assert settings.group_commit is True
+    assert settings.sqlite_journal_mode == "WAL"
+
+    with pytest.raises(ValueError):
+        Settings.from_env({"INGEST_SQLITE_JOURNAL_MODE": "BOGUS"})
+
+def test_more_concurrent_requests_than_connections(tmp_path, monkeypatch):
+    write_engine, read_engine = create_engines(
+        Settings(database_url=f"sqlite:///{tmp_path / 'test.db'}", read_pool_size=2)
+    )
+    Base.metadata.create_all(bind=write_engine)
+    monkeypatch.setattr(database, "SessionLocal", sessionmaker(bind=write_engine))
+    monkeypatch.setattr(database, "ReadSessionLocal", sessionmaker(bind=read_engine))
+    for dependency in (database.get_db, database.get_write_db, database.get_write_sessions):
+        monkeypatch.delitem(app.dependency_overrides, dependency, raising=False)
+    monkeypatch.setitem(app.dependency_overrides, get_idempotency_filter, lambda: None)
+    # Fail fast instead of waiting out the default 30 s if connections are not released
+    read_engine.pool._timeout = write_engine.pool._timeout = 5
+
+    async def main():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            record = {"service_name": "svc", "severity": "INFO", "message": "m"}
+            posts = await asyncio.gather(*(client.post("/records/", json=record) for _ in range(60)))
+            gets = await asyncio.gather(*(client.get(f"/records/{r.json()['id']}") for r in posts))
+            # Keyed posts look their key up (no filter) before inserting
+            keyed = await asyncio.gather(*(
+                client.post("/records/", json=record, headers={"Idempotency-Key": f"key-{i % 30}"}) for i in range(60)
+            ))
+            return [r.status_code for r in posts + gets + keyed]
+
+    try:
+        assert set(asyncio.run(main())) == {200, 201}
+    finally:
+        write_engine.dispose()
+        read_engine.dispose()
@@ -0,0 +1,108 @@
+from datetime import datetime, date, timedelta
+
+import pytest
+from sqlalchemy import event, inspect
+
+from src import crud, rollups
+from src.models import IdempotencyKey
+from src.pagination import encode_cursor
+from src.partitions import DailyPartitions, set_partitions, split_record_id, table_name
+
+DAYS = [date(2026, 3, 1), date(2026, 3, 2), date(2026, 3, 4)]
+
+@pytest.fixture
+def engine(engine):
+    set_partitions(DailyPartitions(retention_days=14))
+    yield engine
+    set_partitions(None)
+
+def _rows(day, count, service_name="svc"):
+    start = datetime.combine(day, datetime.min.time())
+    return [
+        {"service_name": service_name, "severity": "INFO", "message": f"{day} #{i}", "timestamp": start + timedelta(hours=i)}
+        for i in range(count)
+    ]
+
+def test_records_go_to_day_tables(db, engine):
+    ids = crud.insert_rows(db, _rows(DAYS[1], 2) + _rows(DAYS[0], 3))
+    assert [split_record_id(i)[0] for i in ids] == [DAYS[1]] * 2 + [DAYS[0]] * 3
+    assert ids[2:] == sorted(ids[2:])
+
+    tables = inspect(engine).get_table_names()
+    assert table_name(DAYS[0]) in tables and table_name(DAYS[1]) in tables
+    assert crud.get_record(db, ids[0]).message == f"{DAYS[1]} #0"
+    with pytest.raises(ValueError):
+        split_record_id(2**62)
+    assert crud.get_record(db, 2**62) is None
+    assert crud.get_record(db, ids[0]).id == ids[0]
+    assert crud.get_record(db, ids[0] + 100) is None
+    assert crud.get_record(db, 1) is None
+
+    # A read by id runs one query, on its day's table only
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+    assert crud.get_record(db, ids[0]).id == ids[0]
+    assert len(statements) == 1 and table_name(DAYS[1]) in statements[0]
+
+def test_listing_across_partitions(db, engine):
+    for day in DAYS:
+        crud.insert_rows(db, _rows(day, 4) + _rows(day, 1, service_name="other"))
+    everything = crud.list_records(db, limit=100)
+    assert [r.timestamp for r in everything] == sorted(r.timestamp for r in everything)
+    assert len(everything) == 15
+
+    # Keyset pages cross partition boundaries
+    paged, after = [], None
+    while True:
+        page = crud.list_records(db, limit=4, after=after, service_name="svc")
+        if not page:
+            break
+        paged += page
+        after = (page[-1].timestamp, page[-1].id)
+    assert [r.id for r in paged] == [r.id for r in everything if r.service_name == "svc"]
+
+    exported = list(crud.iter_record_rows(db))
+    assert [row.id for row in exported] == [r.id for r in everything]
+
+    # A time range only reads the partitions it covers
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+    since = datetime.combine(DAYS[1], datetime.min.time())
+    records = crud.list_records(db, since=since, until=since + timedelta(hours=2))
+    assert [r.message for r in records] == [f"{DAYS[1]} #0", f"{DAYS[1]} #0", f"{DAYS[1]} #1"]
+    queried = " ".join(statements)
+    assert table_name(DAYS[1]) in queried
+    assert table_name(DAYS[0]) not in queried and table_name(DAYS[2]) not in queried
+
+def test_retention_drops_whole_days(db, engine):
+    ids = {day: crud.insert_rows(db, _rows(day, 2), idempotency_keys=[f"{day}", None]) for day in DAYS}
+    partitions = DailyPartitions(retention_days=2)
+    # Keeps the 2 days before DAYS[2] (March 2 and 3)
+    assert partitions.prune(db, on=DAYS[2]) == [DAYS[0]]
+    assert table_name(DAYS[0]) not in inspect(engine).get_table_names()
+    assert crud.get_record(db, ids[DAYS[0]][0]) is None
+    assert crud.get_record(db, ids[DAYS[1]][0]) is not None
+    # The dropped day's counts and idempotency keys go with it
+    assert rollups.counts(db) == [("svc", "INFO", 4)]
+    assert [row.key for row in db.query(IdempotencyKey)] == [f"{DAYS[1]}", f"{DAYS[2]}"]
+    assert crud.get_record_by_idempotency_key(db, f"{DAYS[1]}").id == ids[DAYS[1]][0]
+    # New records for a dropped day recreate its table
+    set_partitions(partitions)
+    assert crud.get_record(db, crud.insert_rows(db, _rows(DAYS[0], 1))[0]) is not None
+
+def test_api_on_partitions(client):
+    record = {"service_name": "api", "severity": "WARN", "message": "partitioned"}
+    created = client.post("/records/", json=record).json()
+    batch = client.post("/records/batch", json=[record, record]).json()
+    assert split_record_id(created["id"])[0] == datetime.fromisoformat(created["timestamp"]).date()
+    assert client.get(f"/records/{created['id']}").json() == created
+    listed = client.get("/records").json()["items"]
+    assert [item["id"] for item in listed] == [created["id"]] + batch["ids"]
+    assert len(client.get("/records/export").text.splitlines()) == 3
+
+    # Ids and cursors whose day is past the last representable date
+    assert client.get(f"/records/{2**63 - 1}").status_code == 404
+    cursor = encode_cursor(datetime(2026, 3, 1), 2**62)
+    response = client.get("/records", params={"cursor": cursor})
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Invalid cursor."
@@ -0,0 +1,93 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import func, insert, select
+from sqlalchemy.exc import IntegrityError
+
+from src import crud, rollups
+from src.models import Record, RecordCreate
+
+START = datetime(2026, 3, 1, 12, 0)
+
+def _rows():
+    # 3 minutes, 2 services, 2 severities, at uneven seconds within each minute
+    return [
+        {
+            "service_name": f"svc-{i % 2}",
+            "severity": "ERROR" if i % 3 == 0 else "INFO",
+            "message": f"#{i}",
+            "timestamp": START + timedelta(seconds=7 * i)
+        }
+        for i in range(25)
+    ]
+
+def _grouped(db):
+    statement = select(Record.service_name, Record.severity, func.count()).group_by(
+        Record.service_name, Record.severity
+    ).order_by(Record.service_name, Record.severity)
+    return [tuple(row) for row in db.execute(statement)]
+
+def test_every_insert_path_counts(db):
+    crud.insert_rows(db, _rows())
+    crud.insert_records(db, [RecordCreate(service_name="svc-1", severity="WARN", message="batch")] * 3)
+    crud.create_record(db, RecordCreate(service_name="svc-2", severity="INFO", message="single"))
+    assert rollups.counts(db) == _grouped(db)
+    assert sum(count for *_, count in rollups.minutes(db)) == 29
+
+def test_minutes_and_ranges(db):
+    crud.insert_rows(db, _rows())
+    minutes = rollups.minutes(db, service_name="svc-0", severity="ERROR")
+    assert [minute for minute, *_ in minutes] == [START, START + timedelta(minutes=1), START + timedelta(minutes=2)]
+    assert [count for *_, count in minutes] == [2, 1, 2]
+
+    # since is rounded down to its minute; until excludes the minute it starts
+    in_range = rollups.counts(db, since=START + timedelta(seconds=70), until=START + timedelta(minutes=2))
+    assert sum(count for *_, count in in_range) == 9
+    assert sum(count for *_, count in rollups.counts(db, since=START + timedelta(minutes=2))) == 25 - 18
+
+def test_failed_insert_counts_nothing(db):
+    rows = _rows()
+    rows[-1]["message"] = None
+    with pytest.raises(IntegrityError):
+        crud.insert_rows(db, rows)
+    assert rollups.counts(db) == []
+    assert rollups.minutes(db) == []
+
+def test_rebuild(db):
+    # Records written without going through crud, e.g. before the rollup existed
+    db.execute(insert(Record), _rows())
+    db.commit()
+    assert rollups.counts(db) == []
+    assert rollups.rebuild(db, [Record.__table__]) == 25
+    assert rollups.counts(db) == _grouped(db)
+    assert len(rollups.minutes(db)) == 3 * 4
+
+def test_expire_before(db):
+    crud.insert_rows(db, _rows())
+    rollups.expire_before(db, START + timedelta(minutes=1))
+    db.commit()
+    assert sum(count for *_, count in rollups.counts(db)) == 25 - 9
+    assert rollups.minutes(db)[0][0] == START + timedelta(minutes=1)
+
+def test_stats_endpoint(client):
+    record = {"service_name": "api", "severity": "WARN", "message": "m"}
+    client.post("/records/", json=record)
+    client.post("/records/batch", json=[record, {**record, "severity": "ERROR"}])
+
+    stats = client.get("/stats").json()
+    assert stats == {
+        "total": 3,
+        "counts": [
+            {"service_name": "api", "severity": "ERROR", "count": 1},
+            {"service_name": "api", "severity": "WARN", "count": 2}
+        ],
+        "minutes": None
+    }
+    assert client.get("/stats", params={"severity": "WARN"}).json()["total"] == 2
+    assert client.get("/stats", params={"service_name": "other"}).json()["total"] == 0
+
+    per_minute = client.get("/stats", params={"per_minute": True, "since": "2000-01-01T00:00:00Z"}).json()
+    assert per_minute["total"] == 3
+    assert sum(minute["count"] for minute in per_minute["minutes"]) == 3
+    assert client.get("/stats", params={"until": "2000-01-01T00:00:00Z"}).json()["total"] == 0
+    assert client.get("/stats", params={"severity": "BOGUS"}).status_code == 422
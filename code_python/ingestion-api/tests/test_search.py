@@ -0,0 +1,103 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import delete, text, update
+
+from src import crud, search
+from src.crud import _search_query
+from src.models import Record
+from src.partitions import DailyPartitions, set_partitions
+
+MESSAGES = [
+    "Disk full on /var",
+    "disk quota exceeded, disk cleanup scheduled",
+    "Connection reset by peer",
+    "Payment gateway timeout",
+    "Gateway returned 502",
+]
+
+def _rows(start=datetime(2026, 3, 1, 12, 0)):
+    return [
+        {"service_name": f"svc-{i % 2}", "severity": "ERROR", "message": message, "timestamp": start + timedelta(minutes=i)}
+        for i, message in enumerate(MESSAGES)
+    ]
+
+def _messages(matches):
+    return [record.message for record, _ in matches]
+
+def test_ranked_matches(db):
+    crud.insert_rows(db, _rows())
+    matches = crud.search_records(db, "disk")
+    # Case-insensitive whole words; more occurrences in a shorter text rank higher
+    assert _messages(matches) == [MESSAGES[1], MESSAGES[0]]
+    assert matches[0][1] > matches[1][1] > 0
+    assert _messages(crud.search_records(db, "gateway timeout")) == [MESSAGES[3]]
+    assert crud.search_records(db, "dis") == []
+
+def test_filters(db):
+    crud.insert_rows(db, _rows())
+    assert _messages(crud.search_records(db, "gateway", service_name="svc-0")) == [MESSAGES[4]]
+    assert _messages(crud.search_records(db, "gateway", until=datetime(2026, 3, 1, 12, 4))) == [MESSAGES[3]]
+    assert len(crud.search_records(db, "disk", limit=1)) == 1
+
+def test_query_syntax_is_not_interpreted(db):
+    crud.insert_rows(db, _rows())
+    # FTS5 operators and punctuation are searched for as text, never a syntax error
+    assert crud.search_records(db, 'disk OR "payment" NOT') == []
+    assert _messages(crud.search_records(db, "/var")) == [MESSAGES[0]]
+    with pytest.raises(search.SearchQueryError):
+        crud.search_records(db, "   ")
+    with pytest.raises(search.SearchQueryError):
+        crud.search_records(db, "disk\0full")
+    assert set(_messages(crud.search_records(db, "disk\x07"))) == {MESSAGES[0], MESSAGES[1]}
+
+def test_index_follows_deletes_and_updates(db):
+    ids = crud.insert_rows(db, _rows())
+    db.execute(delete(Record).where(Record.id == ids[0]))
+    db.execute(update(Record).where(Record.id == ids[2]).values(message="disk offline"))
+    db.commit()
+    assert set(_messages(crud.search_records(db, "disk"))) == {MESSAGES[1], "disk offline"}
+    assert crud.search_records(db, "connection") == []
+
+def test_uses_full_text_index(db, engine):
+    statement = _search_query(Record.__table__, list(Record.__table__.c), '"disk"', 10, service_name="svc-0")
+    sql = str(statement.compile(engine, compile_kwargs={"literal_binds": True}))
+    plan = " | ".join(row[3] for row in db.execute(text(f"EXPLAIN QUERY PLAN {sql}")))
+    assert "VIRTUAL TABLE INDEX" in plan
+    assert "SCAN records " not in plan + " "
+
+def test_rebuild_with_trigram_tokenizer(db, engine):
+    crud.insert_rows(db, _rows())
+    with engine.begin() as connection:
+        connection.exec_driver_sql("DROP TABLE records_fts")
+        search.rebuild(connection, "records", tokenizer="trigram")
+    # Substrings of 3+ characters now match, for existing and new records
+    assert set(_messages(crud.search_records(db, "dis"))) == {MESSAGES[0], MESSAGES[1]}
+    crud.insert_rows(db, [{**_rows()[0], "message": "Undiscovered host"}])
+    assert "Undiscovered host" in _messages(crud.search_records(db, "dis"))
+
+def test_search_across_partitions(db):
+    set_partitions(DailyPartitions(retention_days=0))
+    try:
+        first, second = datetime(2026, 3, 1), datetime(2026, 3, 2)
+        crud.insert_rows(db, _rows(first) + _rows(second))
+        matches = crud.search_records(db, "gateway")
+        assert len(matches) == 4
+        assert [crud.get_record(db, record.id).message for record, _ in matches] == _messages(matches)
+        assert {record.timestamp.date() for record, _ in crud.search_records(db, "gateway", since=second)} == {second.date()}
+    finally:
+        set_partitions(None)
+
+def test_search_endpoint(client):
+    client.post("/records/batch", json=[{"service_name": "api", "severity": "ERROR", "message": m} for m in MESSAGES])
+    response = client.get("/records/search", params={"q": "disk"})
+    assert response.status_code == 200
+    items = response.json()["items"]
+    assert [item["message"] for item in items] == [MESSAGES[1], MESSAGES[0]]
+    assert items[0]["score"] > items[1]["score"]
+    assert client.get(f"/records/{items[0]['id']}").json()["message"] == MESSAGES[1]
+
+    assert client.get("/records/search", params={"q": "disk", "severity": "INFO"}).json()["items"] == []
+    assert client.get("/records/search", params={"q": " "}).status_code == 400
+    assert client.get("/records/search", params={"q": "a\0b"}).status_code == 400
+    assert client.get("/records/search").status_code == 422
@@ -0,0 +1,201 @@
+import argparse
+import itertools
+import json
+import multiprocessing
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from collections import deque
+from datetime import datetime, timezone
+from typing import Callable, List, Dict, Any, Optional
+from .generator import generate_lines
+from .parser import LogParser, ParseStats
+from .output import write_json, write_ndjson
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+# Parser configurations, by the name used in results
+PARSERS = {
+    "regex": {"fast_path": False, "timestamp_cache_size": 0},
+    "regex+cache": {"fast_path": False},
+    "fast": {"fast_path": True, "timestamp_cache_size": 0},
+    "fast+cache": {"fast_path": True},
+}
+
+def measure(fn: Callable[[List[str]], object], lines: List[str], repeat: int = 3) -> float:
+    """
+    Returns the best observed throughput of fn(lines), in lines per second.
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(lines)
+        best = min(best, time.perf_counter() - start)
+    return len(lines) / best
+
+def parse_only(log_parser: LogParser) -> Callable[[List[str]], object]:
+    """
+    Drains iter_entries without serializing, isolating the parse cost.
+    """
+    return lambda lines: deque(log_parser.iter_entries(lines), maxlen=0)
+
+def _parse_lines(log_parser: LogParser, lines: List[str]):
+    for line in lines:
+        log_parser.parse_line(line)
+
+def _write(writer: Callable) -> Callable[[LogParser, List[str]], None]:
+    def run(log_parser: LogParser, lines: List[str]):
+        stats = ParseStats()
+        with open(os.devnull, "w", encoding="utf-8") as out:
+            writer(log_parser.iter_file(lines, stats), stats, out)
+    return run
+
+# What each mode runs over the generated lines
+MODES: Dict[str, Callable[[LogParser, List[str]], object]] = {
+    "parse": lambda log_parser, lines: parse_only(log_parser)(lines),
+    "parse_line": _parse_lines,
+    "parse_file": lambda log_parser, lines: log_parser.parse_file(lines),
+    "json": _write(write_json),
+    "ndjson": _write(write_ndjson),
+}
+
+def peak_rss_kb() -> Optional[int]:
+    """
+    High-water mark of this process's resident set size, in KiB.
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and KiB elsewhere
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+def run_case(spec: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Benchmarks one (parser, mode) pair. Meant to run in a fresh process, so
+    the peak RSS belongs to this case alone; allocations are traced in a
+    separate run so tracemalloc does not slow down the timed ones.
+    """
+    lines = list(generate_lines(**spec["generator"]))
+    run = MODES[spec["mode"]]
+    config = PARSERS[spec["parser"]]
+    baseline_rss = peak_rss_kb()
+
+    log_parser = LogParser(**config)
+    rate = measure(lambda lines: run(log_parser, lines), lines, spec["repeat"])
+    peak_rss = peak_rss_kb()
+
+    tracemalloc.start()
+    try:
+        run(LogParser(**config), lines)
+        _, alloc_peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "parser": spec["parser"],
+        "mode": spec["mode"],
+        "lines_per_sec": round(rate),
+        "peak_rss_kb": peak_rss,
+        # Peak above the memory held by the generated input itself
+        "rss_growth_kb": peak_rss - baseline_rss if peak_rss is not None else None,
+        "alloc_peak_bytes": alloc_peak
+    }
+
+def run_isolated(spec: Dict[str, Any]) -> Dict[str, Any]:
+    # "spawn" starts from a clean interpreter instead of a fork of this one
+    with multiprocessing.get_context("spawn").Pool(processes=1) as pool:
+        return pool.apply(run_case, (spec,))
+
+def git_commit() -> Optional[str]:
+    try:
+        result = subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            capture_output=True, text=True, check=True
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return result.stdout.strip()
+
+def _kib(value: Optional[int], unit: int) -> str:
+    return "-" if value is None else f"{value / unit:,.0f}"
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark LogParser throughput and memory.")
+    parser.add_argument("--lines", type=int, default=100_000, help="Number of synthetic lines.")
+    parser.add_argument("--error-rate", type=float, default=0.01, help="Fraction of malformed lines.")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the line generator.")
+    parser.add_argument(
+        "--timespec",
+        choices=["seconds", "milliseconds", "microseconds"],
+        default="seconds",
+        help="Timestamp resolution of the generated lines."
+    )
+    parser.add_argument(
+        "--mean-gap-us",
+        type=int,
+        default=1000,
+        help="Mean log time between lines, in microseconds; with --timespec it sets how often timestamps repeat."
+    )
+    parser.add_argument("--message-length", type=int, default=None, help="Pad messages to about this many characters.")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per case; the best is reported.")
+    parser.add_argument("--parsers", nargs="+", choices=list(PARSERS), default=list(PARSERS))
+    parser.add_argument("--modes", nargs="+", choices=list(MODES), default=list(MODES))
+    parser.add_argument("-o", "--output", help="Write the results as JSON to this file.", default=None)
+    parser.add_argument("--compare", help="Results JSON of an earlier run to compare throughput against.", default=None)
+    args = parser.parse_args()
+
+    generator = {
+        "count": args.lines,
+        "seed": args.seed,
+        "error_rate": args.error_rate,
+        "timespec": args.timespec,
+        "message_length": args.message_length,
+        "mean_gap_us": args.mean_gap_us
+    }
+    baseline = {}
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = {(r["parser"], r["mode"]): r for r in json.load(f)["results"]}
+
+    print(f"{'parser':<13}{'mode':<12}{'lines/s':>12}{'peak RSS (KiB)':>16}{'alloc peak (KiB)':>18}"
+          + (f"{'vs baseline':>13}" if baseline else ""))
+    results = []
+    for parser_name, mode in itertools.product(args.parsers, args.modes):
+        result = run_isolated({
+            "parser": parser_name,
+            "mode": mode,
+            "repeat": args.repeat,
+            "generator": generator
+        })
+        results.append(result)
+
+        row = (f"{parser_name:<13}{mode:<12}{result['lines_per_sec']:>12,}"
+               f"{_kib(result['peak_rss_kb'], 1):>16}{_kib(result['alloc_peak_bytes'], 1024):>18}")
+        previous = baseline.get((parser_name, mode))
+        if previous:
+            row += f"{result['lines_per_sec'] / previous['lines_per_sec'] - 1:>+13.1%}"
+        print(row)
+
+    if args.output:
+        report = {
+            "commit": git_commit(),
+            "created": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "generator": generator,
+            "repeat": args.repeat,
+            "results": results
+        }
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"Results written to {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,287 @@
+import ast
+import json
+import mmap
+import os
+import struct
+from array import array
+from pathlib import Path
+from typing import Iterable, Tuple, Dict, Any, TextIO, Optional, Union, List
+from .parser import ParseStats, LOG_RECORD
+from .errors import ErrorCollector
+from .schema import LogLevel
+from .timestamps import parse_iso_timestamp, to_epoch_micros
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Dictionary for the level column: code i stands for LEVELS[i]
+LEVELS = [level.value for level in LogLevel]
+LEVEL_CODES = {level: code for code, level in enumerate(LEVELS)}
+
+# Rows buffered before they are flushed to disk (one Parquet row group each)
+BATCH_SIZE = 64 * 1024
+
+NPY_LAYOUT = "log-parser-columns"
+NPY_LAYOUT_VERSION = 1
+NPY_MAGIC = b"\x93NUMPY\x01\x00"
+# Fixed .npy header size, reserved up front so the row count can be filled in at the end
+NPY_HEADER_SIZE = 128
+# .npy dtype descr -> (memoryview format, item size) for the dtypes used here
+NPY_DTYPES = {"<i8": ("q", 8), "|u1": ("B", 1)}
+
+class NpyColumnWriter:
+    """
+    Appends fixed-width values to a version 1.0 .npy file without numpy.
+    The header is rewritten with the final length on close.
+    """
+    def __init__(self, path: Union[str, Path], descr: str):
+        self.descr = descr
+        self.itemsize = NPY_DTYPES[descr][1]
+        self.count = 0
+        self._file = open(path, "wb")
+        self._file.write(self._header())
+
+    def _header(self) -> bytes:
+        header = f"{{'descr': '{self.descr}', 'fortran_order': False, 'shape': ({self.count},), }}"
+        header_len = NPY_HEADER_SIZE - len(NPY_MAGIC) - 2
+        # Space-padded and newline-terminated, as the format requires
+        return NPY_MAGIC + struct.pack("<H", header_len) + (header.ljust(header_len - 1) + "\n").encode("latin1")
+
+    def write(self, values: Union[array, bytes, bytearray]):
+        data = values.tobytes() if isinstance(values, array) else values
+        self._file.write(data)
+        self.count += len(data) // self.itemsize
+
+    def close(self):
+        self._file.seek(0)
+        self._file.write(self._header())
+        self._file.close()
+
+class _Columns:
+    """
+    Per-batch column buffers.
+    """
+    def __init__(self):
+        self.timestamps = array("q")
+        self.levels = array("B")
+        self.trace_ids: List[str] = []
+        self.messages: List[str] = []
+
+    def add(self, record: Dict[str, Any]):
+        self.timestamps.append(to_epoch_micros(parse_iso_timestamp(record["timestamp"])))
+        self.levels.append(LEVEL_CODES[record["level"]])
+        self.trace_ids.append(record["trace_id"])
+        self.messages.append(record["message"])
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+class _NpyWriter:
+    """
+    Directory layout: timestamp.npy (<i8 epoch micros), level.npy (|u1 codes into
+    meta.json's "levels"), and for each string column <name>.offsets.npy (<i8, one
+    more than the row count) plus <name>.data.npy (|u1 UTF-8 bytes); row i is
+    data[offsets[i]:offsets[i + 1]].
+    """
+    STRING_COLUMNS = ("trace_id", "message")
+
+    def __init__(self, path: str):
+        os.makedirs(path, exist_ok=True)
+        self.path = path
+        self.timestamp = NpyColumnWriter(os.path.join(path, "timestamp.npy"), "<i8")
+        self.level = NpyColumnWriter(os.path.join(path, "level.npy"), "|u1")
+        self.offsets = {}
+        self.data = {}
+        self.end = {}
+        for name in self.STRING_COLUMNS:
+            self.offsets[name] = NpyColumnWriter(os.path.join(path, f"{name}.offsets.npy"), "<i8")
+            self.data[name] = NpyColumnWriter(os.path.join(path, f"{name}.data.npy"), "|u1")
+            self.offsets[name].write(array("q", [0]))
+            self.end[name] = 0
+
+    def write_batch(self, columns: _Columns):
+        self.timestamp.write(columns.timestamps)
+        self.level.write(columns.levels)
+        for name, values in (("trace_id", columns.trace_ids), ("message", columns.messages)):
+            offsets = array("q")
+            data = bytearray()
+            end = self.end[name]
+            for value in values:
+                encoded = value.encode("utf-8")
+                data += encoded
+                end += len(encoded)
+                offsets.append(end)
+            self.offsets[name].write(offsets)
+            self.data[name].write(data)
+            self.end[name] = end
+
+    def close(self):
+        rows = self.timestamp.count
+        for writer in (self.timestamp, self.level, *self.offsets.values(), *self.data.values()):
+            writer.close()
+        with open(os.path.join(self.path, "meta.json"), "w", encoding="utf-8") as f:
+            json.dump({
+                "layout": NPY_LAYOUT,
+                "version": NPY_LAYOUT_VERSION,
+                "rows": rows,
+                "levels": LEVELS
+            }, f, indent=2)
+
+class _ParquetWriter:
+    def __init__(self, path: str):
+        self.schema = pa.schema([
+            ("timestamp", pa.timestamp("us", tz="UTC")),
+            ("level", pa.dictionary(pa.int8(), pa.string())),
+            ("trace_id", pa.string()),
+            ("message", pa.string()),
+        ])
+        self._levels = pa.array(LEVELS, pa.string())
+        self._writer = pq.ParquetWriter(path, self.schema)
+
+    def write_batch(self, columns: _Columns):
+        batch = pa.record_batch([
+            pa.array(columns.timestamps, pa.int64()).cast(self.schema.field("timestamp").type),
+            pa.DictionaryArray.from_arrays(pa.array(columns.levels, pa.int8()), self._levels),
+            pa.array(columns.trace_ids, pa.string()),
+            pa.array(columns.messages, pa.string()),
+        ], schema=self.schema)
+        self._writer.write_batch(batch)
+
+    def close(self):
+        self._writer.close()
+
+def write_columnar(
+    records: Iterable[Tuple[str, Dict[str, Any]]],
+    stats: ParseStats,
+    path: Union[str, Path],
+    metadata_out: Optional[TextIO] = None,
+    engine: str = "auto",
+    error_collector: Optional[ErrorCollector] = None,
+    batch_size: int = BATCH_SIZE
+) -> str:
+    """
+    Writes valid entries as columns: timestamps as int64 epoch microseconds
+    (naive timestamps taken as UTC), level dictionary-encoded, trace_id and
+    message as offset + UTF-8 byte buffers. engine "parquet" writes one
+    Parquet file; "npy" writes a directory of .npy files (see _NpyWriter);
+    "auto" picks Parquet when pyarrow is installed. Rows are flushed every
+    batch_size entries, so memory does not grow with input size.
+
+    Errors and the metadata counts do not fit the columns; they are written
+    to metadata_out as {"metadata": ..., "errors": [...]} when given.
+    Returns the engine used.
+    """
+    if engine == "auto":
+        engine = "parquet" if pq is not None else "npy"
+    if engine == "parquet":
+        if pq is None:
+            raise ImportError("Parquet output requires pyarrow.")
+        writer = _ParquetWriter(str(path))
+    elif engine == "npy":
+        writer = _NpyWriter(str(path))
+    else:
+        raise ValueError(f"Unsupported columnar engine '{engine}'. Expected 'auto', 'parquet' or 'npy'.")
+
+    errors = []
+    columns = _Columns()
+    try:
+        for kind, record in records:
+            if kind == LOG_RECORD:
+                columns.add(record)
+                if len(columns) >= batch_size:
+                    writer.write_batch(columns)
+                    columns = _Columns()
+            elif error_collector is not None:
+                error_collector.add(record)
+            elif metadata_out is not None:
+                errors.append(record)
+        if len(columns):
+            writer.write_batch(columns)
+    finally:
+        writer.close()
+
+    if metadata_out is not None:
+        metadata = stats.to_metadata()
+        if error_collector is not None:
+            errors = error_collector.errors
+            metadata.update(error_collector.to_metadata())
+        metadata_out.write(json.dumps({"metadata": metadata, "errors": errors}, indent=2))
+    return engine
+
+class StringColumn:
+    """
+    Read-only view of an offset + bytes string column; decodes rows on access.
+    """
+    def __init__(self, offsets, data):
+        self.offsets = offsets
+        self.data = data
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i: int) -> str:
+        if i < 0:
+            i += len(self)
+        return bytes(self.data[self.offsets[i]:self.offsets[i + 1]]).decode("utf-8")
+
+def load_npy(path: Union[str, Path]):
+    """
+    Memory-maps a 1-D .npy file: as a numpy memmap when numpy is installed,
+    otherwise as a read-only memoryview of the right item format.
+    """
+    if np is not None:
+        return np.load(path, mmap_mode="r")
+
+    with open(path, "rb") as f:
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    if mapped[:6] != NPY_MAGIC[:6]:
+        raise ValueError(f"'{path}' is not a .npy file.")
+    if mapped[6] == 1:
+        header_len, = struct.unpack_from("<H", mapped, 8)
+        start = 10 + header_len
+    else:
+        header_len, = struct.unpack_from("<I", mapped, 8)
+        start = 12 + header_len
+    header = ast.literal_eval(mapped[start - header_len:start].decode("latin1"))
+    if header["descr"] not in NPY_DTYPES:
+        raise ValueError(f"'{path}': dtype {header['descr']} needs numpy to read.")
+    return memoryview(mapped)[start:].cast(NPY_DTYPES[header["descr"]][0])
+
+def read_columnar(path: Union[str, Path]) -> Dict[str, Any]:
+    """
+    Memory-maps columns written by write_columnar.
+    A Parquet file comes back as {"table": pyarrow.Table}. An .npy directory
+    comes back as "timestamp" (int64 epoch micros), "level" (uint8 codes),
+    "levels" (the code -> level name list), and "trace_id" and "message"
+    as StringColumns. No column is copied into memory.
+    """
+    path = str(path)
+    if not os.path.isdir(path):
+        if pq is None:
+            raise ImportError("Reading Parquet output requires pyarrow.")
+        return {"table": pq.read_table(path, memory_map=True)}
+
+    with open(os.path.join(path, "meta.json"), "r", encoding="utf-8") as f:
+        meta = json.load(f)
+    if meta.get("layout") != NPY_LAYOUT or meta.get("version") != NPY_LAYOUT_VERSION:
+        raise ValueError(f"'{path}' is not a version {NPY_LAYOUT_VERSION} {NPY_LAYOUT} directory.")
+
+    columns: Dict[str, Any] = {
+        "timestamp": load_npy(os.path.join(path, "timestamp.npy")),
+        "level": load_npy(os.path.join(path, "level.npy")),
+        "levels": meta["levels"],
+    }
+    for name in _NpyWriter.STRING_COLUMNS:
+        columns[name] = StringColumn(
+            load_npy(os.path.join(path, f"{name}.offsets.npy")),
+            load_npy(os.path.join(path, f"{name}.data.npy"))
+        )
+    return columns
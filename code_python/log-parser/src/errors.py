@@ -0,0 +1,86 @@
+import json
+import random
+from collections import Counter
+from typing import Optional, List, Dict, Any, TextIO, Tuple
+
+def error_reasons(error: Any) -> List[str]:
+    """
+    Returns the reasons behind one error record's "error" value: the message
+    itself for plain-string errors, or "<field>: <type>" for each entry of a
+    Pydantic error list.
+    """
+    if isinstance(error, str):
+        return [error]
+    return [
+        f"{'.'.join(str(part) for part in item.get('loc', ())) or '<line>'}: {item.get('type', 'unknown')}"
+        for item in error
+    ]
+
+class ErrorCollector:
+    """
+    Bounded store for error records.
+
+    Keeps the first `max_errors` records verbatim plus a uniform reservoir
+    sample of `sample_size` records from the rest, and counts every error by
+    reason. Memory is bounded by max_errors + sample_size records and the
+    number of distinct reasons, however corrupted the input is. When `spill`
+    is given, every error record is also written there as one JSON object
+    per line, so the complete error stream is still available.
+    """
+    def __init__(
+        self,
+        max_errors: int = 100,
+        sample_size: int = 0,
+        spill: Optional[TextIO] = None,
+        seed: Optional[int] = None
+    ):
+        self.max_errors = max_errors
+        self.sample_size = sample_size
+        self.spill = spill
+        self.first: List[Dict[str, Any]] = []
+        # (arrival index among the non-first errors, record)
+        self._reservoir: List[Tuple[int, Dict[str, Any]]] = []
+        self.reasons: Counter = Counter()
+        self.seen = 0
+        self._random = random.Random(seed)
+
+    def add(self, record: Dict[str, Any]) -> bool:
+        """
+        Records one error. Returns True if it is kept among the first
+        max_errors, i.e. it can be written out right away.
+        """
+        self.seen += 1
+        self.reasons.update(error_reasons(record["error"]))
+        if self.spill is not None:
+            self.spill.write(json.dumps(record) + "\n")
+
+        if len(self.first) < self.max_errors:
+            self.first.append(record)
+            return True
+
+        # Reservoir sampling (Algorithm R) over the errors past the first max_errors
+        position = self.seen - self.max_errors - 1
+        if len(self._reservoir) < self.sample_size:
+            self._reservoir.append((position, record))
+        else:
+            slot = self._random.randrange(position + 1)
+            if slot < self.sample_size:
+                self._reservoir[slot] = (position, record)
+        return False
+
+    @property
+    def sample(self) -> List[Dict[str, Any]]:
+        # In input order rather than reservoir slot order
+        return [record for _, record in sorted(self._reservoir, key=lambda item: item[0])]
+
+    @property
+    def errors(self) -> List[Dict[str, Any]]:
+        return self.first + self.sample
+
+    def to_metadata(self) -> Dict[str, Any]:
+        retained = len(self.first) + len(self._reservoir)
+        return {
+            "errors_retained": retained,
+            "errors_dropped": self.seen - retained,
+            "error_reasons": dict(self.reasons.most_common())
+        }
@@ -0,0 +1,101 @@
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import Optional, Iterable, Callable, Union
+from .timestamps import parse_iso_timestamp, to_epoch_micros
+
+# Below this many bytes the binary search hands over to a linear scan
+SEEK_SCAN_THRESHOLD = 64 * 1024
+
+class LogFilter:
+    """
+    Predicate over the raw, still-unvalidated fields of a log line.
+    LogParser applies it straight after splitting a line, so lines that are
+    filtered out never reach LogEntry construction or validation.
+
+    A line whose timestamp cannot be parsed is let through: validation then
+    reports it as an error, exactly as without the filter.
+    """
+    def __init__(
+        self,
+        levels: Optional[Iterable[str]] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        trace_id: Optional[str] = None,
+        sorted_input: bool = False
+    ):
+        self.levels = frozenset(levels) if levels else None
+        self.since = since
+        self.until = until
+        self.since_us = to_epoch_micros(since) if since is not None else None
+        self.until_us = to_epoch_micros(until) if until is not None else None
+        self.trace_id = trace_id
+        # With time-sorted input, the first line past `until` ends the scan
+        self.sorted_input = sorted_input
+        self.exhausted = False
+
+    @property
+    def has_time_range(self) -> bool:
+        return self.since_us is not None or self.until_us is not None
+
+    def matches(
+        self,
+        timestamp: str,
+        level: str,
+        trace_id: str,
+        parse_timestamp: Callable[[str], datetime] = parse_iso_timestamp
+    ) -> bool:
+        # Plain string comparisons first; timestamp parsing is the expensive check
+        if self.levels is not None and level not in self.levels:
+            return False
+        if self.trace_id is not None and trace_id != self.trace_id:
+            return False
+        if self.since_us is None and self.until_us is None:
+            return True
+
+        try:
+            ts = to_epoch_micros(parse_timestamp(timestamp))
+        except ValueError:
+            return True
+        if self.since_us is not None and ts < self.since_us:
+            return False
+        if self.until_us is not None and ts > self.until_us:
+            if self.sorted_input:
+                self.exhausted = True
+            return False
+        return True
+
+def seek_since(
+    path: Union[str, Path],
+    since: datetime,
+    read_timestamp: Callable[[str], Optional[datetime]]
+) -> int:
+    """
+    Binary-searches a time-sorted plain file for the start of the first line
+    with a timestamp >= since. Returns a byte offset of a line start; every
+    line before it is guaranteed to be older than `since`, so those bytes
+    never need to be read. read_timestamp returns None for lines without a
+    usable timestamp, which are skipped while probing.
+    """
+    since_us = to_epoch_micros(since)
+    lo, hi = 0, os.path.getsize(path)
+
+    with open(path, "rb") as f:
+        while hi - lo > SEEK_SCAN_THRESHOLD:
+            mid = (lo + hi) // 2
+            # Move to the first line start at or after mid
+            f.seek(mid - 1)
+            f.readline()
+
+            # Probe forward to the first line with a usable timestamp
+            ts = None
+            while ts is None and f.tell() < hi:
+                raw = f.readline()
+                ts = read_timestamp(raw.decode("utf-8", errors="replace"))
+
+            if ts is not None and to_epoch_micros(ts) < since_us:
+                # Sorted: everything up to the end of the probed line is older
+                lo = f.tell()
+            else:
+                hi = mid
+    return lo
@@ -0,0 +1,188 @@
+import json
+import os
+import time
+from pathlib import Path
+from typing import Optional, TextIO, BinaryIO, Callable, Union, Dict, Any
+from .parser import LogParser, ParseStats, ERROR_RECORD
+from .output import ndjson_line
+from .sources import decode_lines
+
+# Bytes requested per read; a large backlog is processed in batches of this size
+READ_SIZE = 1 << 20
+
+def _after_nth_newline(data: bytes, n: int) -> int:
+    """
+    Offset just past the n-th newline in data, which must contain at least n.
+    """
+    position = -1
+    for _ in range(n):
+        position = data.index(b"\n", position + 1)
+    return position + 1
+
+class LogFollower:
+    """
+    Follows a growing log file like `tail -F`, parsing appended lines as they arrive.
+
+    Rotation is detected by an inode change and truncation by the file shrinking
+    below the current offset. After every batch the byte offset is saved to an
+    optional checkpoint file, so a restart resumes where it stopped. Output is
+    written and flushed once per batch, not once per line.
+
+    Delivery is at-least-once: a crash between writing a batch and saving its
+    checkpoint re-emits that batch on restart.
+    """
+    def __init__(
+        self,
+        path: Union[str, Path],
+        log_parser: LogParser,
+        out: TextIO,
+        checkpoint_path: Optional[Union[str, Path]] = None,
+        batch_size: int = 1000,
+        stats: Optional[ParseStats] = None
+    ):
+        self.path = str(path)
+        self.log_parser = log_parser
+        self.out = out
+        self.checkpoint_path = str(checkpoint_path) if checkpoint_path else None
+        self.batch_size = batch_size
+        self.stats = stats if stats is not None else ParseStats()
+
+        self._file: Optional[BinaryIO] = None
+        self.inode: Optional[int] = None
+        # Offset just past the last complete line that was emitted
+        self.offset = 0
+        self.line_number = 0
+        # Bytes of a line whose newline has not been written yet
+        self._partial = b""
+
+    def _load_checkpoint(self) -> Dict[str, Any]:
+        if not self.checkpoint_path or not os.path.exists(self.checkpoint_path):
+            return {}
+        with open(self.checkpoint_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def _save_checkpoint(self):
+        if not self.checkpoint_path:
+            return
+        state = {
+            "path": self.path,
+            "inode": self.inode,
+            "offset": self.offset,
+            "line_number": self.line_number
+        }
+        # Write-then-rename so a crash never leaves a half-written checkpoint
+        tmp_path = self.checkpoint_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(state, f)
+        os.replace(tmp_path, self.checkpoint_path)
+
+    def _open(self, resume: bool):
+        """
+        Opens the current file at self.path. When resume is set and the checkpoint
+        still describes this file, continues from the saved offset.
+        """
+        if self._file is not None:
+            self._file.close()
+        self._file = open(self.path, "rb")
+        st = os.fstat(self._file.fileno())
+        self.inode = st.st_ino
+        self.offset = 0
+        self.line_number = 0
+        self._partial = b""
+
+        if resume:
+            state = self._load_checkpoint()
+            if state.get("inode") == st.st_ino and state.get("offset", 0) <= st.st_size:
+                self.offset = state["offset"]
+                self.line_number = state.get("line_number", 0)
+        self._file.seek(self.offset)
+
+    def _emit(self, data: bytes) -> int:
+        """
+        Parses complete lines in data, writes them as one batch and checkpoints.
+        """
+        lines = decode_lines(data)
+        batch = []
+        for kind, record in self.log_parser.iter_file(lines, self.stats, source=self.path):
+            if kind == ERROR_RECORD:
+                record["line_number"] += self.line_number
+            batch.append(ndjson_line(kind, record))
+
+        if batch:
+            self.out.write("".join(batch))
+            self.out.flush()
+        self.offset += len(data)
+        self.line_number += len(lines)
+        self._save_checkpoint()
+        return len(batch)
+
+    def _read_available(self, final: bool = False) -> int:
+        """
+        Emits every complete line currently readable from the open file, in
+        batches of at most batch_size lines.
+        With final set (the file was rotated away), a trailing line without a
+        newline is emitted too, since nothing more will be appended to it.
+        """
+        emitted = 0
+        pending_lines = 0
+        while True:
+            chunk = self._file.read(READ_SIZE)
+            if chunk:
+                self._partial += chunk
+            pending_lines += chunk.count(b"\n")
+
+            # One read can bring in many batches: emit each full one
+            while pending_lines >= self.batch_size:
+                cut = _after_nth_newline(self._partial, self.batch_size)
+                data, self._partial = self._partial[:cut], self._partial[cut:]
+                emitted += self._emit(data)
+                pending_lines -= self.batch_size
+
+            if not chunk:
+                # The readable data ran out: emit the rest as a last, smaller batch
+                cut = len(self._partial) if final else self._partial.rfind(b"\n") + 1
+                if cut:
+                    data, self._partial = self._partial[:cut], self._partial[cut:]
+                    emitted += self._emit(data)
+                return emitted
+
+    def _check_rotation(self):
+        """
+        Reopens the file if it was rotated (new inode) or truncated (shrank).
+        """
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            # Mid-rotation: keep reading the old handle until a new file appears
+            return
+
+        if st.st_ino != self.inode:
+            # Drain what was appended to the old file before it was rotated away
+            self._read_available(final=True)
+            self._open(resume=False)
+        elif st.st_size < self.offset + len(self._partial):
+            self._open(resume=False)
+
+    def poll(self) -> int:
+        """
+        Processes everything appended since the last call.
+        Returns the number of records emitted.
+        """
+        if self._file is None:
+            self._open(resume=True)
+        self._check_rotation()
+        return self._read_available()
+
+    def run(self, poll_interval: float = 0.5, stop: Optional[Callable[[], bool]] = None):
+        """
+        Polls until stop() returns True (or forever), sleeping poll_interval
+        seconds whenever no new data arrived.
+        """
+        try:
+            while stop is None or not stop():
+                if self.poll() == 0:
+                    time.sleep(poll_interval)
+        finally:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
@@ -0,0 +1,168 @@
+import json
+import re
+from typing import Optional, Dict, Tuple, Callable, Iterable
+
+# Raw (timestamp, level, trace_id, message) strings, before any validation
+Fields = Tuple[str, str, str, str]
+
+# Regex pattern to match the log format: [TIMESTAMP] [LEVEL] [TRACE_ID] MESSAGE
+LOG_PATTERN = re.compile(
+    r"^\[(?P<timestamp>.*?)\] \[(?P<level>.*?)\] \[(?P<trace_id>.*?)\] (?P<message>.*)$"
+)
+
+REGEX_MISMATCH_ERROR = "Regex mismatch. Invalid format."
+UNKNOWN_FORMAT_ERROR = "Unrecognized log format."
+
+class LogFormat:
+    """
+    One input format: which characters its lines can start with, and how to
+    extract the raw fields from a stripped line.
+
+    `split` is the format's fastest extractor and may return None for lines
+    it does not handle; `match` is the reference extractor and has the final
+    say. Both return the same fields for any line `split` accepts.
+    """
+    def __init__(
+        self,
+        name: str,
+        first_chars: Iterable[str],
+        match: Callable[[str], Optional[Fields]],
+        split: Optional[Callable[[str], Optional[Fields]]] = None,
+        mismatch_error: Optional[str] = None
+    ):
+        self.name = name
+        self.first_chars = frozenset(first_chars)
+        self.match = match
+        self.split = split or match
+        self.mismatch_error = mismatch_error or f"Invalid {name} line."
+
+    def __repr__(self) -> str:
+        return f"LogFormat({self.name!r})"
+
+FORMATS: Dict[str, LogFormat] = {}
+# First character of a line -> the only format that can start with it
+_DISPATCH: Dict[str, LogFormat] = {}
+
+def register_format(log_format: LogFormat):
+    """
+    Adds a format to the registry. Formats must not share first characters,
+    so that dispatching a line is a single dict lookup.
+    """
+    for char in log_format.first_chars:
+        owner = _DISPATCH.get(char)
+        if owner is not None and owner.name != log_format.name:
+            raise ValueError(f"Format '{log_format.name}' conflicts with '{owner.name}' on {char!r}.")
+    FORMATS[log_format.name] = log_format
+    for char in log_format.first_chars:
+        _DISPATCH[char] = log_format
+
+def dispatch(line: str) -> Optional[LogFormat]:
+    """
+    Returns the format a stripped, non-empty line belongs to, by its first character.
+    """
+    return _DISPATCH.get(line[0])
+
+def get_format(name: str) -> LogFormat:
+    if name not in FORMATS:
+        raise ValueError(f"Unsupported input format '{name}'. Expected one of {sorted(FORMATS)}.")
+    return FORMATS[name]
+
+# --- [TIMESTAMP] [LEVEL] [TRACE_ID] MESSAGE ---
+
+def split_fields(line: str) -> Optional[Fields]:
+    """
+    Position-based equivalent of LOG_PATTERN for a stripped line.
+    Returns (timestamp, level, trace_id, message) exactly as the regex groups
+    would, or None when the line does not have the bracketed layout.
+    """
+    # '.' in LOG_PATTERN does not match newlines; leave those lines to the regex
+    if not line.startswith("[") or "\n" in line:
+        return None
+    # Left-to-right, non-overlapping first occurrences mirror the lazy '.*?' groups
+    parts = line.split("] [", 2)
+    if len(parts) != 3:
+        return None
+    trace_id, sep, message = parts[2].partition("] ")
+    if not sep:
+        return None
+    return parts[0][1:], parts[1], trace_id, message
+
+def match_bracketed(line: str) -> Optional[Fields]:
+    match = LOG_PATTERN.match(line)
+    if not match:
+        return None
+    return match.group("timestamp", "level", "trace_id", "message")
+
+BRACKETED = LogFormat("bracketed", "[", match_bracketed, split_fields, REGEX_MISMATCH_ERROR)
+
+# --- JSON lines: {"timestamp": ..., "level": ..., "trace_id": ..., "message": ...} ---
+
+# Accepted key spellings for each field, in order of preference
+JSON_KEYS = (
+    ("timestamp", "@timestamp", "time", "ts"),
+    ("level", "severity", "lvl"),
+    ("trace_id", "traceId", "trace"),
+    ("message", "msg"),
+)
+_LEVEL_ALIASES = {"WARNING": "WARN"}
+
+def match_json(line: str) -> Optional[Fields]:
+    try:
+        obj = json.loads(line)
+    except ValueError:
+        return None
+    if not isinstance(obj, dict):
+        return None
+
+    fields = []
+    for keys in JSON_KEYS:
+        value = next((obj[key] for key in keys if key in obj), None)
+        if value is None:
+            return None
+        fields.append(value if isinstance(value, str) else json.dumps(value))
+    level = fields[1].upper()
+    fields[1] = _LEVEL_ALIASES.get(level, level)
+    return tuple(fields)
+
+JSON_LINES = LogFormat("json", "{", match_json)
+
+# --- nginx "combined" access log, optionally followed by a request ID ---
+
+NGINX_PATTERN = re.compile(
+    r'^(?P<remote_addr>\S+) \S+ \S+ \[(?P<time_local>[^\]]*)\] "(?P<request>[^"]*)" '
+    r'(?P<status>\d{3}) (?P<body_bytes_sent>\S+) "[^"]*" "[^"]*"(?: "?(?P<request_id>[^"\s]+)"?)?$'
+)
+_MONTHS = {
+    name: f"{number:02d}"
+    for number, name in enumerate(("Jan", "Feb", "Mar", "Apr", "May", "Jun",
+                                   "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"), start=1)
+}
+
+def nginx_timestamp(time_local: str) -> str:
+    """
+    Rewrites nginx's $time_local (10/Oct/2000:13:55:36 -0700) as ISO 8601.
+    Anything else is returned unchanged, to be rejected by validation.
+    """
+    month = _MONTHS.get(time_local[3:6])
+    if month is None or len(time_local) != 26:
+        return time_local
+    return (
+        f"{time_local[7:11]}-{month}-{time_local[0:2]}T{time_local[12:20]}"
+        f"{time_local[21:24]}:{time_local[24:26]}"
+    )
+
+def match_nginx(line: str) -> Optional[Fields]:
+    match = NGINX_PATTERN.match(line)
+    if not match:
+        return None
+    status = int(match.group("status"))
+    level = "ERROR" if status >= 500 else "WARN" if status >= 400 else "INFO"
+    message = f'{match.group("remote_addr")} "{match.group("request")}" {status} {match.group("body_bytes_sent")}'
+    # nginx writes "-" for an unset $request_id, which is also a valid trace_id
+    return nginx_timestamp(match.group("time_local")), level, match.group("request_id") or "-", message
+
+# $remote_addr starts with an IPv4 digit or an IPv6 hex digit / colon
+NGINX = LogFormat("nginx", "0123456789abcdefABCDEF:", match_nginx)
+
+for _log_format in (BRACKETED, JSON_LINES, NGINX):
+    register_format(_log_format)
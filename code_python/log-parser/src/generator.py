@@ -0,0 +1,69 @@
+import random
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Iterator, Optional
+
+LEVELS = ["INFO", "INFO", "INFO", "DEBUG", "WARN", "ERROR"]
+# Vocabulary for padding messages to a requested length
+WORDS = ["request", "user", "cache", "db", "upstream", "retry", "payload", "session", "queue", "ok"]
+
+def _malformed_line(rng: random.Random, timestamp: str, trace_id: str) -> str:
+    """
+    Returns a line that fails either the regex or schema validation.
+    """
+    kind = rng.randrange(4)
+    if kind == 0:
+        return f"{timestamp} INFO {trace_id} missing brackets"
+    if kind == 1:
+        return f"[not-a-timestamp] [INFO] [{trace_id}] bad timestamp"
+    if kind == 2:
+        return f"[{timestamp}] [CRITICAL] [{trace_id}] unknown level"
+    return f"[{timestamp}] [INFO] [TRACE_{trace_id}] bad trace id"
+
+def _message(rng: random.Random, length: int) -> str:
+    """
+    Returns a message of roughly `length` characters.
+    """
+    words = [f"Request handled in {rng.randrange(1, 500)}ms"]
+    size = len(words[0])
+    while size < length:
+        word = rng.choice(WORDS)
+        words.append(word)
+        size += len(word) + 1
+    return " ".join(words)
+
+def generate_lines(
+    count: int,
+    seed: int = 0,
+    error_rate: float = 0.0,
+    timespec: str = "microseconds",
+    message_length: Optional[int] = None,
+    mean_gap_us: int = 1000
+) -> Iterator[str]:
+    """
+    Yields `count` synthetic log lines in the bracketed format.
+    Output is fully determined by `seed`; a fraction `error_rate` of the
+    lines are malformed. `timespec` ("seconds", "milliseconds" or
+    "microseconds") sets the timestamp resolution, as in datetime.isoformat.
+    Together with `mean_gap_us`, the mean log time between two lines, it
+    controls how many distinct timestamps appear. `message_length` pads
+    messages to about that many characters.
+    """
+    rng = random.Random(seed)
+    current = datetime(2023, 10, 27, 10, 0, 0, tzinfo=timezone.utc)
+
+    for _ in range(count):
+        # By default roughly a thousand lines per second of log time
+        current += timedelta(microseconds=rng.randrange(2 * mean_gap_us))
+        timestamp = current.isoformat(timespec=timespec).replace("+00:00", "Z")
+        trace_id = str(uuid.UUID(int=rng.getrandbits(128)))
+
+        if rng.random() < error_rate:
+            yield _malformed_line(rng, timestamp, trace_id)
+        else:
+            level = rng.choice(LEVELS)
+            if message_length is None:
+                message = f"Request handled in {rng.randrange(1, 500)}ms"
+            else:
+                message = _message(rng, message_length)
+            yield f"[{timestamp}] [{level}] [{trace_id}] {message}"
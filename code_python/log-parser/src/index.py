@@ -0,0 +1,215 @@
+import os
+import sqlite3
+from datetime import datetime
+from pathlib import Path
+from typing import Iterator, List, Optional, Tuple, Dict, Any, Union
+from .parser import LogParser, ParseStats, LOG_RECORD, ERROR_RECORD
+from .schema import LogEntry
+from .timestamps import to_epoch_micros
+
+# Rows buffered before each executemany during a build
+INSERT_BATCH_SIZE = 10_000
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+-- Clustered on trace_id, so one lookup is a single index range scan
+CREATE TABLE IF NOT EXISTS traces (
+    trace_id TEXT NOT NULL,
+    offset INTEGER NOT NULL,
+    PRIMARY KEY (trace_id, offset)
+) WITHOUT ROWID;
+-- Sparse: one row every `sparse_every` lines
+CREATE TABLE IF NOT EXISTS time_index (
+    ts INTEGER NOT NULL,
+    offset INTEGER NOT NULL,
+    line_number INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_time_index_ts ON time_index (ts);
+"""
+
+class StaleIndexError(Exception):
+    pass
+
+class LogIndex:
+    """
+    On-disk SQLite index over one plain-text log file.
+
+    `traces` maps every trace_id to the byte offsets of its lines, so a lookup
+    seeks straight to them and parses nothing else. `time_index` is a sparse
+    timestamp -> (offset, line number) sample used to bound time-range scans;
+    it assumes the log is sorted by time, as appended logs are.
+    """
+    def __init__(self, index_path: Union[str, Path]):
+        self.index_path = str(index_path)
+        self.conn = sqlite3.connect(self.index_path)
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self) -> "LogIndex":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @property
+    def log_path(self) -> str:
+        return self._meta("log_path")
+
+    def _meta(self, key: str) -> Optional[str]:
+        row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def build(self, log_path: Union[str, Path], log_parser: LogParser, sparse_every: int = 1000) -> int:
+        """
+        (Re)builds the index for log_path in a single transaction.
+        Returns the number of indexed entries.
+        """
+        log_path = str(log_path)
+        st = os.stat(log_path)
+        indexed = 0
+
+        with self.conn:
+            self.conn.execute("DELETE FROM meta")
+            self.conn.execute("DELETE FROM traces")
+            self.conn.execute("DELETE FROM time_index")
+
+            traces: List[Tuple[str, int]] = []
+            samples: List[Tuple[int, int, int]] = []
+            offset = 0
+            with open(log_path, "rb") as f:
+                for line_number, raw in enumerate(f):
+                    entry = log_parser.parse_line(raw.decode("utf-8"))
+                    if entry is not None:
+                        indexed += 1
+                        traces.append((entry.trace_id, offset))
+                        if line_number % sparse_every == 0:
+                            # line_number counts the lines before this offset
+                            samples.append((to_epoch_micros(entry.timestamp), offset, line_number))
+                    offset += len(raw)
+
+                    if len(traces) >= INSERT_BATCH_SIZE:
+                        self.conn.executemany("INSERT OR IGNORE INTO traces VALUES (?, ?)", traces)
+                        traces.clear()
+
+            self.conn.executemany("INSERT OR IGNORE INTO traces VALUES (?, ?)", traces)
+            self.conn.executemany("INSERT INTO time_index VALUES (?, ?, ?)", samples)
+            self.conn.executemany("INSERT INTO meta VALUES (?, ?)", [
+                ("log_path", log_path),
+                ("inode", str(st.st_ino)),
+                ("size", str(offset)),
+            ])
+        return indexed
+
+    def _check_fresh(self):
+        """
+        Refuses to read a log that was replaced or truncated since the build.
+        Appended data is fine: it is simply not covered by the index.
+        """
+        log_path = self.log_path
+        if log_path is None:
+            raise StaleIndexError(f"Index '{self.index_path}' has not been built.")
+        st = os.stat(log_path)
+        if str(st.st_ino) != self._meta("inode") or st.st_size < int(self._meta("size")):
+            raise StaleIndexError(f"'{log_path}' changed since the index was built; rebuild it.")
+
+    def trace_offsets(self, trace_id: str) -> List[int]:
+        rows = self.conn.execute(
+            "SELECT offset FROM traces WHERE trace_id = ? ORDER BY offset", (trace_id,)
+        )
+        return [row[0] for row in rows]
+
+    def iter_trace(
+        self,
+        trace_id: str,
+        log_parser: LogParser,
+        stats: Optional[ParseStats] = None
+    ) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """
+        Yields the records for one trace_id, reading only its lines.
+        """
+        self._check_fresh()
+        log_path = self.log_path
+        with open(log_path, "rb") as f:
+            for offset in self.trace_offsets(trace_id):
+                f.seek(offset)
+                yield from log_parser.iter_file([f.readline().decode("utf-8")], stats, source=log_path)
+
+    def _range_bounds(self, since: Optional[datetime], until: Optional[datetime]) -> Tuple[int, int, Optional[int]]:
+        """
+        Returns (start_offset, start_line_number, stop_offset) covering [since, until].
+        """
+        start_offset, start_line = 0, 0
+        if since is not None:
+            # Strictly earlier sample: lines sharing the `since` timestamp may precede it
+            row = self.conn.execute(
+                "SELECT offset, line_number FROM time_index WHERE ts < ? ORDER BY ts DESC LIMIT 1",
+                (to_epoch_micros(since),)
+            ).fetchone()
+            if row:
+                start_offset, start_line = row
+
+        stop_offset = None
+        if until is not None:
+            row = self.conn.execute(
+                "SELECT MIN(offset) FROM time_index WHERE ts > ?", (to_epoch_micros(until),)
+            ).fetchone()
+            stop_offset = row[0]
+        return start_offset, start_line, stop_offset
+
+    def iter_range(
+        self,
+        since: Optional[datetime],
+        until: Optional[datetime],
+        log_parser: LogParser,
+        stats: Optional[ParseStats] = None
+    ) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """
+        Yields the records with since <= timestamp <= until, plus malformed
+        lines between them, reading only the part of the file the sparse index
+        says can contain them.
+        """
+        self._check_fresh()
+        log_path = self.log_path
+        start_offset, start_line, stop_offset = self._range_bounds(since, until)
+        since_us = to_epoch_micros(since) if since is not None else None
+        until_us = to_epoch_micros(until) if until is not None else None
+
+        with open(log_path, "rb") as f:
+            f.seek(start_offset)
+
+            def lines() -> Iterator[str]:
+                position = start_offset
+                for raw in f:
+                    if stop_offset is not None and position >= stop_offset:
+                        return
+                    position += len(raw)
+                    yield raw.decode("utf-8")
+
+            # The log is time-sorted: malformed lines count as in range once the
+            # first in-range entry was seen, and the scan ends at the first entry past `until`
+            started = since_us is None
+            for item in log_parser.iter_entries(lines()):
+                if isinstance(item, LogEntry):
+                    ts = to_epoch_micros(item.timestamp)
+                    if until_us is not None and ts > until_us:
+                        return
+                    if not started:
+                        if ts < since_us:
+                            continue
+                        started = True
+                    if stats is not None:
+                        stats.valid_count += 1
+                    record = item.model_dump(mode='json')
+                    record["source"] = log_path
+                    yield LOG_RECORD, record
+                elif started:
+                    if stats is not None:
+                        stats.error_count += 1
+                    item["line_number"] += start_line
+                    item["source"] = log_path
+                    yield ERROR_RECORD, item
@@ -1,29 +1,260 @@
 import sys
 import json
 import argparse
-from pathlib import Path
-from .parser import LogParser
+from contextlib import ExitStack
+from .parser import LogParser, ParseStats, AUTO_FORMAT, MIXED_FORMAT
+from .formats import FORMATS
+from .output import write_json, write_ndjson
+from .columnar import write_columnar
+from .parallel import iter_files_parallel
+from .sources import expand_inputs, iter_paths, detect_compression, open_text
+from .summary import LogSummary, BUCKETS
+from .index import LogIndex, StaleIndexError
+from .timestamps import parse_iso_timestamp
+from .filters import LogFilter
+from .schema import LogLevel
+from .follow import LogFollower
+from .errors import ErrorCollector
+
+def iso_datetime(value: str):
+    """
+    argparse type for ISO 8601 timestamps, parsed like log timestamps.
+    """
+    try:
+        return parse_iso_timestamp(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid ISO 8601 timestamp: '{value}'")
 
 def main():
     parser = argparse.ArgumentParser(description="Parse log files into structured JSON.")
-    parser.add_argument("file", help="Path to the log file to parse.")
+    parser.add_argument(
+        "files",
+        nargs="+",
+        help="Log files, directories or glob patterns. gzip, bzip2 and xz files are decompressed on the fly."
+    )
     parser.add_argument("-o", "--output", help="Path to the output JSON file.", default=None)
+    parser.add_argument(
+        "--format",
+        choices=["json", "ndjson", "columnar"],
+        default="json",
+        help="Output format. 'ndjson' streams one record per line with constant memory. "
+             "'columnar' writes entries column-wise to -o: Parquet if pyarrow is installed, "
+             "otherwise a directory of .npy files."
+    )
+    parser.add_argument(
+        "--input-format",
+        choices=[AUTO_FORMAT, MIXED_FORMAT, *FORMATS],
+        default="bracketed",
+        help="Input line format. 'auto' detects it per file from the first valid line; "
+             "'mixed' detects it for every line."
+    )
+    parser.add_argument(
+        "--metadata-file",
+        help="NDJSON: write metadata counts to this sidecar file instead of a trailer record. "
+             "Columnar: where metadata and errors go (default: <output>.meta.json).",
+        default=None
+    )
+    parser.add_argument(
+        "--max-errors",
+        type=int,
+        help="Keep only the first N error records in the output; all errors are still counted by reason.",
+        default=None
+    )
+    parser.add_argument(
+        "--error-sample",
+        type=int,
+        help="With --max-errors: also keep a uniform random sample of N of the remaining errors.",
+        default=0
+    )
+    parser.add_argument(
+        "--error-spill",
+        help="With --max-errors: write every error record to this file, one JSON object per line.",
+        default=None
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Parse in N processes: plain files are split into newline-aligned byte ranges, "
+             "compressed files are parsed one per process."
+    )
+    parser.add_argument(
+        "--follow",
+        action="store_true",
+        help="Keep reading a single plain file as it grows, like 'tail -F'. Always writes NDJSON."
+    )
+    parser.add_argument(
+        "--checkpoint",
+        help="Follow mode: file storing the byte offset reached, so a restart resumes from it.",
+        default=None
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=1000,
+        help="Follow mode: maximum number of lines parsed and written per batch."
+    )
+    parser.add_argument(
+        "--poll-interval",
+        type=float,
+        default=0.5,
+        help="Follow mode: seconds to wait when no new data is available."
+    )
+    parser.add_argument(
+        "--summary",
+        action="store_true",
+        help="Only report aggregates (level counts, errors per time bucket, top trace IDs) in one constant-memory pass."
+    )
+    parser.add_argument(
+        "--bucket",
+        choices=sorted(BUCKETS),
+        default="minute",
+        help="Summary mode: time bucket size for error counts."
+    )
+    parser.add_argument(
+        "--top-k",
+        type=int,
+        default=10,
+        help="Summary mode: number of busiest trace IDs to report."
+    )
+    parser.add_argument(
+        "--build-index",
+        metavar="INDEX",
+        help="Build an on-disk trace_id/time index (SQLite) for a single plain file and exit.",
+        default=None
+    )
+    parser.add_argument(
+        "--index",
+        metavar="INDEX",
+        help="Answer --trace or --since/--until from this index, reading only the matching lines.",
+        default=None
+    )
+    parser.add_argument(
+        "--level",
+        action="append",
+        choices=[level.value for level in LogLevel],
+        help="Keep only lines with this level (repeatable). Checked before validation.",
+        default=None
+    )
+    parser.add_argument("--trace", help="Keep only lines with this trace_id.", default=None)
+    parser.add_argument("--since", type=iso_datetime, help="Keep only lines at or after this ISO 8601 time.", default=None)
+    parser.add_argument("--until", type=iso_datetime, help="Keep only lines at or before this ISO 8601 time.", default=None)
+    parser.add_argument(
+        "--sorted",
+        action="store_true",
+        help="Input is sorted by time: --since binary-searches plain files and reading stops after --until."
+    )
     args = parser.parse_args()
 
-    file_path = Path(args.file)
-    if not file_path.exists():
-        print(f"Error: File '{file_path}' not found.", file=sys.stderr)
+    if args.index and not (args.trace or args.since or args.until):
+        parser.error("--index needs --trace or --since/--until")
+    if (args.error_sample or args.error_spill) and args.max_errors is None:
+        parser.error("--error-sample and --error-spill need --max-errors")
+    if args.format == "columnar" and not args.output:
+        parser.error("--format columnar needs -o/--output")
+
+    try:
+        paths = expand_inputs(args.files)
+    except FileNotFoundError as e:
+        print(f"Error: {e}", file=sys.stderr)
         sys.exit(1)
 
-    log_parser = LogParser()
+    log_filter = None
+    if args.level or args.trace or args.since or args.until:
+        log_filter = LogFilter(
+            levels=args.level,
+            since=args.since,
+            until=args.until,
+            trace_id=args.trace,
+            # The index's range lookups already rely on time order
+            sorted_input=args.sorted or bool(args.index)
+        )
+
+    log_parser = LogParser(log_filter=log_filter, input_format=args.input_format)
+    stats = ParseStats()
+
+    if args.follow:
+        if len(paths) != 1 or detect_compression(paths[0]) is not None:
+            print("Error: --follow needs exactly one uncompressed file.", file=sys.stderr)
+            sys.exit(1)
+        follow(paths[0], log_parser, stats, args)
+        return
+
+    if args.summary:
+        summarize(paths, log_parser, args)
+        return
+
+    if args.build_index:
+        if len(paths) != 1 or detect_compression(paths[0]) is not None:
+            print("Error: --build-index needs exactly one uncompressed file.", file=sys.stderr)
+            sys.exit(1)
+        with LogIndex(args.build_index) as index:
+            # The index has to cover every line, so it is built without filters
+            indexed = index.build(paths[0], LogParser(input_format=args.input_format))
+        print(f"Indexed {indexed} entries from {paths[0]} into {args.build_index}")
+        return
 
     try:
-        # Use generator to read file line by line
-        with open(file_path, "r", encoding="utf-8") as f:
-            result = log_parser.parse_file(f)
+        with ExitStack() as stack:
+            if args.index:
+                index = stack.enter_context(LogIndex(args.index))
+                if args.trace:
+                    records = index.iter_trace(args.trace, log_parser, stats)
+                else:
+                    records = index.iter_range(args.since, args.until, log_parser, stats)
+            elif args.workers > 1:
+                records = iter_files_parallel(paths, log_parser, args.workers, stats)
+            else:
+                # Use generators to read files line by line
+                records = iter_paths(paths, log_parser, stats)
+
+            if args.format == "columnar":
+                # -o names the Parquet file or .npy directory, written by write_columnar itself
+                out = None
+            elif args.output:
+                out = stack.enter_context(open(args.output, "w", encoding="utf-8"))
+            else:
+                out = sys.stdout
 
-        output_json = json.dumps(result, indent=2)
+            error_collector = None
+            if args.max_errors is not None:
+                spill = None
+                if args.error_spill:
+                    spill = stack.enter_context(open(args.error_spill, "w", encoding="utf-8"))
+                error_collector = ErrorCollector(args.max_errors, args.error_sample, spill)
+
+            if args.format == "ndjson":
+                metadata_out = None
+                if args.metadata_file:
+                    metadata_out = stack.enter_context(open(args.metadata_file, "w", encoding="utf-8"))
+                write_ndjson(records, stats, out, metadata_out, error_collector)
+            elif args.format == "columnar":
+                metadata_path = args.metadata_file or args.output.rstrip("/") + ".meta.json"
+                metadata_out = stack.enter_context(open(metadata_path, "w", encoding="utf-8"))
+                write_columnar(records, stats, args.output, metadata_out, error_collector=error_collector)
+            else:
+                write_json(records, stats, out, error_collector)
+                if not args.output:
+                    out.write("\n")
 
+        if args.output:
+            print(f"Successfully wrote output to {args.output}")
+
+    except Exception as e:
+        print(f"Error processing file: {e}", file=sys.stderr)
+        sys.exit(1)
+
+def summarize(paths, log_parser: LogParser, args: argparse.Namespace):
+    """
+    Streams every input through a LogSummary and writes the aggregates as JSON.
+    """
+    summary = LogSummary(bucket=args.bucket, top_k=args.top_k)
+    try:
+        for path in paths:
+            with open_text(path) as f:
+                summary.consume(log_parser.iter_entries(f))
+
+        output_json = json.dumps(summary.to_dict(), indent=2)
         if args.output:
             with open(args.output, "w", encoding="utf-8") as out_f:
                 out_f.write(output_json)
@@ -35,5 +266,27 @@ def main():
         print(f"Error processing file: {e}", file=sys.stderr)
         sys.exit(1)
 
+def follow(path, log_parser: LogParser, stats: ParseStats, args: argparse.Namespace):
+    """
+    Runs follow mode until interrupted. Output files are appended to, so a
+    restart from a checkpoint continues the same output.
+    """
+    with ExitStack() as stack:
+        if args.output:
+            out = stack.enter_context(open(args.output, "a", encoding="utf-8"))
+        else:
+            out = sys.stdout
+
+        follower = LogFollower(
+            path, log_parser, out,
+            checkpoint_path=args.checkpoint,
+            batch_size=args.batch_size,
+            stats=stats
+        )
+        try:
+            follower.run(poll_interval=args.poll_interval)
+        except KeyboardInterrupt:
+            pass
+
 if __name__ == "__main__":
     main()
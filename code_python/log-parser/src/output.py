@@ -0,0 +1,81 @@
+import json
+from typing import Iterable, Tuple, Dict, Any, TextIO, Optional
+from .parser import ParseStats, LOG_RECORD, ERROR_RECORD
+from .errors import ErrorCollector
+
+METADATA_RECORD = "metadata"
+
+def ndjson_line(kind: str, record: Dict[str, Any]) -> str:
+    """
+    Serializes one record as a newline-terminated NDJSON line tagged with its type.
+    """
+    return json.dumps({"type": kind, **record}) + "\n"
+
+def _metadata(stats: ParseStats, error_collector: Optional[ErrorCollector]) -> Dict[str, Any]:
+    metadata = stats.to_metadata()
+    if error_collector is not None:
+        metadata.update(error_collector.to_metadata())
+    return metadata
+
+def write_json(
+    records: Iterable[Tuple[str, Dict[str, Any]]],
+    stats: ParseStats,
+    out: TextIO,
+    error_collector: Optional[ErrorCollector] = None
+):
+    """
+    Writes the classic single-document report (metadata, logs, errors).
+    The whole result is materialized before serialization; with an
+    ErrorCollector only the errors it retains are kept.
+    """
+    logs = []
+    errors = []
+    for kind, record in records:
+        if kind == LOG_RECORD:
+            logs.append(record)
+        elif error_collector is not None:
+            error_collector.add(record)
+        else:
+            errors.append(record)
+
+    if error_collector is not None:
+        errors = error_collector.errors
+
+    result = {
+        "metadata": _metadata(stats, error_collector),
+        "logs": logs,
+        "errors": errors
+    }
+    out.write(json.dumps(result, indent=2))
+
+def write_ndjson(
+    records: Iterable[Tuple[str, Dict[str, Any]]],
+    stats: ParseStats,
+    out: TextIO,
+    metadata_out: Optional[TextIO] = None,
+    error_collector: Optional[ErrorCollector] = None
+):
+    """
+    Writes one JSON object per line as soon as each record is produced.
+    Every object carries a "type" field ("log" or "error"). Metadata counts are
+    written as a trailing {"type": "metadata", ...} record, or to metadata_out
+    (a sidecar file) when given. Memory use does not grow with input size.
+
+    With an ErrorCollector, the first errors it keeps are written as they
+    arrive and its random sample of the rest just before the metadata.
+    """
+    for kind, record in records:
+        if kind == ERROR_RECORD and error_collector is not None:
+            if not error_collector.add(record):
+                continue
+        out.write(ndjson_line(kind, record))
+
+    if error_collector is not None:
+        for record in error_collector.sample:
+            out.write(ndjson_line(ERROR_RECORD, record))
+
+    metadata = _metadata(stats, error_collector)
+    if metadata_out is not None:
+        metadata_out.write(json.dumps(metadata, indent=2))
+    else:
+        out.write(ndjson_line(METADATA_RECORD, metadata))
@@ -0,0 +1,192 @@
+import json
+import os
+from collections import deque
+from multiprocessing import Pool
+from pathlib import Path
+from typing import List, Tuple, Dict, Any, Iterable, Iterator, Optional, Union
+from .parser import LogParser, ParseStats, AUTO_FORMAT, LOG_RECORD
+from .sources import detect_compression, open_text, decode_lines
+
+# Lower bound for a single work unit; smaller ranges cost more in IPC than they save.
+MIN_CHUNK_SIZE = 1 << 20
+# Upper bound, whatever the input size: the parent holds the results of at
+# most WINDOW_PER_WORKER units per worker, so this bounds its memory.
+MAX_CHUNK_SIZE = 2 << 20
+WINDOW_PER_WORKER = 2
+
+# A worker's records: log records as JSON text, error records as dicts
+CompactRecords = List[Tuple[str, Union[str, Dict[str, Any]]]]
+
+# Per-process parser, installed by the pool initializer, and its copies
+# fixed on the format detected for a file.
+_worker_parser: Optional[LogParser] = None
+_worker_format_parsers: Dict[str, LogParser] = {}
+
+def split_ranges(path: Union[str, Path], chunk_size: int) -> List[Tuple[int, int]]:
+    """
+    Splits a file into (start, end) byte ranges of roughly chunk_size bytes.
+    Every range except the last ends right after a newline, so no line is
+    ever cut in two and ranges can be parsed independently.
+    """
+    size = os.path.getsize(path)
+    ranges = []
+    start = 0
+
+    with open(path, "rb") as f:
+        while start < size:
+            end = start + chunk_size
+            if end >= size:
+                end = size
+            else:
+                # Move the boundary forward to just past the next newline
+                f.seek(end)
+                f.readline()
+                end = f.tell()
+            ranges.append((start, end))
+            start = end
+
+    return ranges
+
+def range_formats(path: Union[str, Path], ranges: List[Tuple[int, int]], log_parser: LogParser) -> List[Optional[str]]:
+    """
+    Input format for each range of a file parsed with "auto" (None: the
+    parser's own). Ranges up to the one holding the file's first valid line
+    detect it themselves, exactly as a single-process parse does; the ranges
+    after it are parsed in the format detected there, instead of each
+    detecting from its own first line. Reads ranges only until that line.
+    """
+    with open(path, "rb") as f:
+        for i, (start, end) in enumerate(ranges):
+            f.seek(start)
+            detected = log_parser.detect_format(decode_lines(f.read(end - start)))
+            if detected is not None:
+                return [None] * (i + 1) + [detected] * (len(ranges) - i - 1)
+    return [None] * len(ranges)
+
+def _init_worker(log_parser: LogParser):
+    global _worker_parser
+    _worker_parser = log_parser
+    _worker_format_parsers.clear()
+
+def _range_parser(input_format: Optional[str]) -> LogParser:
+    if input_format is None:
+        return _worker_parser
+    if input_format not in _worker_format_parsers:
+        _worker_format_parsers[input_format] = _worker_parser.with_format(input_format)
+    return _worker_format_parsers[input_format]
+
+def _compact(records: Iterable[Tuple[str, Dict[str, Any]]]) -> CompactRecords:
+    # Log records are serialized in the worker: a string is a fraction of the
+    # size of a dict, in the pipe and while waiting in the parent. Error
+    # records are rare, get their line numbers rebased, and hold tuples that
+    # JSON would turn into lists, so they stay dicts.
+    return [(kind, json.dumps(record) if kind == LOG_RECORD else record) for kind, record in records]
+
+def _parse_range(task: Tuple[str, Optional[int], Optional[int], Optional[str]]) -> Tuple[CompactRecords, int]:
+    """
+    Parses one byte range in a worker process, in the given input format
+    (None: the parser's own).
+    Returns the compacted records (with range-local line numbers) and the
+    number of lines the range contained, so the caller can rebase line numbers.
+    A range of (None, None) means the whole file, used for compressed files
+    which cannot be split by byte offset.
+    """
+    path, start, end, input_format = task
+    log_parser = _range_parser(input_format)
+    if start is None:
+        with open_text(path) as f:
+            return _compact(log_parser.iter_file(f)), 0
+
+    with open(path, "rb") as f:
+        f.seek(start)
+        data = f.read(end - start)
+
+    lines = decode_lines(data)
+    return _compact(log_parser.iter_file(lines)), len(lines)
+
+def iter_files_parallel(
+    paths: Iterable[Union[str, Path]],
+    log_parser: LogParser,
+    workers: int,
+    stats: Optional[ParseStats] = None,
+    chunk_size: Optional[int] = None,
+    annotate_source: bool = True
+) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """
+    Multi-process counterpart of sources.iter_paths.
+    Plain files are cut into newline-aligned byte ranges; each compressed file
+    is a single work unit. Units are parsed in a process pool and merged back
+    in input order with line numbers rebased per file, so the output is
+    identical to the single-process parse. With input format "auto", each
+    plain file's format is detected here, once, from its first valid line
+    (see range_formats).
+
+    At most WINDOW_PER_WORKER units per worker are in flight or waiting to
+    be consumed, so a slow consumer stalls the workers instead of letting
+    parsed records pile up in memory.
+    """
+    paths = [str(path) for path in paths]
+    plain = {path for path in paths if detect_compression(path) is None}
+    if chunk_size is None:
+        # A few ranges per worker keeps the pool busy when ranges differ in cost
+        total_size = sum(os.path.getsize(path) for path in plain)
+        chunk_size = min(max(total_size // (workers * 4) + 1, MIN_CHUNK_SIZE), MAX_CHUNK_SIZE)
+
+    tasks = []
+    for path in paths:
+        if path in plain:
+            ranges = split_ranges(path, chunk_size)
+            if log_parser.input_format == AUTO_FORMAT:
+                formats = range_formats(path, ranges, log_parser)
+            else:
+                formats = [None] * len(ranges)
+            tasks.extend((path, start, end, input_format) for (start, end), input_format in zip(ranges, formats))
+        else:
+            tasks.append((path, None, None, None))
+
+    line_offset = 0
+
+    with Pool(processes=workers, initializer=_init_worker, initargs=(log_parser,)) as pool:
+        # Results are taken in submission order, which is input order
+        remaining = iter(tasks)
+        pending = deque()
+        for task in remaining:
+            pending.append((task, pool.apply_async(_parse_range, (task,))))
+            if len(pending) == workers * WINDOW_PER_WORKER:
+                break
+
+        while pending:
+            (path, start, *_), result = pending.popleft()
+            records, line_count = result.get()
+            task = next(remaining, None)
+            if task is not None:
+                pending.append((task, pool.apply_async(_parse_range, (task,))))
+
+            if not start:
+                # First unit of a file (or a whole compressed file)
+                line_offset = 0
+            for kind, record in records:
+                if kind == LOG_RECORD:
+                    record = json.loads(record)
+                    if stats is not None:
+                        stats.valid_count += 1
+                else:
+                    record["line_number"] += line_offset
+                    if stats is not None:
+                        stats.error_count += 1
+                if annotate_source:
+                    record["source"] = path
+                yield kind, record
+            line_offset += line_count
+
+def iter_file_parallel(
+    path: Union[str, Path],
+    log_parser: LogParser,
+    workers: int,
+    stats: Optional[ParseStats] = None,
+    chunk_size: Optional[int] = None
+) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """
+    Multi-process counterpart of LogParser.iter_file for a single file on disk.
+    """
+    return iter_files_parallel([path], log_parser, workers, stats, chunk_size, annotate_source=False)
@@ -1,17 +1,171 @@
-import re
-from typing import Optional, List, Dict, Any, Iterable
+import copy
+from typing import Optional, List, Dict, Any, Iterable, Iterator, Tuple, Union, Callable
 from datetime import datetime, timezone
 from pydantic import ValidationError
-from .schema import LogEntry
-
-# Regex pattern to match the log format: [TIMESTAMP] [LEVEL] [TRACE_ID] MESSAGE
-LOG_PATTERN = re.compile(
-    r"^\[(?P<timestamp>.*?)\] \[(?P<level>.*?)\] \[(?P<trace_id>.*?)\] (?P<message>.*)$"
+from .schema import LogEntry, LogLevel
+from .timestamps import TimestampCache, parse_iso_timestamp
+from .filters import LogFilter
+from .errors import ErrorCollector
+# LOG_PATTERN, REGEX_MISMATCH_ERROR and split_fields are re-exported for existing importers
+from .formats import (
+    LogFormat, LOG_PATTERN, REGEX_MISMATCH_ERROR, UNKNOWN_FORMAT_ERROR,
+    split_fields, dispatch, get_format
 )
 
-class LogParser:
+# Lookup tables for the fast path's cheap checks
+_LEVELS = {level.value: level for level in LogLevel}
+_TRACE_ID_CHARS = "0123456789abcdef-"
+
+# Input format modes besides the registered format names
+AUTO_FORMAT = "auto"
+MIXED_FORMAT = "mixed"
+
+_FIELD_ORDER = ("timestamp", "level", "trace_id", "message")
+
+# Record kinds yielded by LogParser.iter_file
+LOG_RECORD = "log"
+ERROR_RECORD = "error"
+
+def _error_details(e: ValidationError) -> List[Dict[str, Any]]:
+    """
+    Pydantic's error list, made JSON-serializable: validator exceptions in
+    "ctx" (e.g. the ValueError behind a bad timestamp) become their message.
+    """
+    details = e.errors(include_url=False)
+    for item in details:
+        ctx = item.get("ctx")
+        if ctx:
+            item["ctx"] = {
+                key: value if isinstance(value, (str, int, float, bool, type(None))) else str(value)
+                for key, value in ctx.items()
+            }
+    return details
+
+class ParseStats:
+    """
+    Running counters for a (possibly streaming) parse.
+    Memory use is constant regardless of how many lines are processed.
+    """
     def __init__(self):
-        pass
+        # specific timezone aware now
+        self.start_time = datetime.now(timezone.utc)
+        self.valid_count = 0
+        self.error_count = 0
+
+    def to_metadata(self) -> Dict[str, Any]:
+        return {
+            "timestamp": self.start_time.isoformat(),
+            "total_processed": self.valid_count + self.error_count,
+            "valid_count": self.valid_count,
+            "error_count": self.error_count
+        }
+
+def build_entry_fast(
+    timestamp: str,
+    level: str,
+    trace_id: str,
+    message: str,
+    parse_timestamp: Callable[[str], datetime] = parse_iso_timestamp
+) -> Optional[LogEntry]:
+    """
+    Builds a LogEntry without Pydantic validation after cheap hand-written
+    checks that mirror the LogEntry validators. Returns None if any check fails,
+    in which case the caller must use full Pydantic validation.
+    """
+    level_value = _LEVELS.get(level)
+    if level_value is None:
+        return None
+    # Equivalent to the ^[a-f0-9\-]+$ pattern: stripping every allowed char leaves nothing
+    if not trace_id or trace_id.strip(_TRACE_ID_CHARS):
+        return None
+    try:
+        parsed = parse_timestamp(timestamp)
+    except ValueError:
+        return None
+    return LogEntry.from_trusted(parsed, level_value, trace_id, message)
+
+class LogParser:
+    def __init__(
+        self,
+        fast_path: bool = True,
+        timestamp_cache_size: int = 1024,
+        log_filter: Optional[LogFilter] = None,
+        input_format: str = "bracketed"
+    ):
+        """
+        fast_path: try the format's regex-free splitter and unvalidated construction first
+        and only fall back to its reference parser (LOG_PATTERN for bracketed lines)
+        + full Pydantic validation for lines that fail its checks. Results are
+        identical either way.
+        timestamp_cache_size: number of timestamp strings kept by the TimestampCache;
+        0 disables caching.
+        log_filter: predicate checked on the raw fields before validation;
+        lines it rejects are skipped entirely (neither entries nor errors).
+        input_format: a registered format name (see formats.FORMATS); "mixed" to
+        dispatch every line on its first character; or "auto" to dispatch only
+        until the first valid line of each stream and then stay on its format.
+        """
+        self.fast_path = fast_path
+        self.log_filter = log_filter
+        self.input_format = input_format
+        if input_format in (AUTO_FORMAT, MIXED_FORMAT):
+            self._format: Optional[LogFormat] = None
+        else:
+            self._format = get_format(input_format)
+        if timestamp_cache_size > 0:
+            self._parse_timestamp = TimestampCache(timestamp_cache_size).parse
+        else:
+            self._parse_timestamp = parse_iso_timestamp
+
+    def _extract(self, line: str, log_format: LogFormat) -> Optional[Tuple[str, str, str, str]]:
+        fields = log_format.split(line) if self.fast_path else None
+        if fields is None:
+            fields = log_format.match(line)
+        return fields
+
+    def _parse(self, line: str, log_format: Optional[LogFormat] = None) -> Tuple[Optional[LogEntry], Any]:
+        """
+        Parses a stripped, non-empty line in log_format, or in the format its
+        first character dispatches to when log_format is None.
+        Returns (entry, None) on success or (None, error) on failure, where error
+        is the value reported in the "error" field of parse_file's output.
+        Returns (None, None) for a line rejected by the filter.
+        """
+        if log_format is None:
+            log_format = dispatch(line)
+            if log_format is None:
+                return None, UNKNOWN_FORMAT_ERROR
+
+        fields = log_format.split(line) if self.fast_path else None
+        if fields is None:
+            fields = log_format.match(line)
+            if fields is None:
+                return None, log_format.mismatch_error
+
+        # Both extractors yield the same fields, so filtering decides the same either way
+        log_filter = self.log_filter
+        if log_filter is not None and not log_filter.matches(
+            fields[0], fields[1], fields[2], self._parse_timestamp
+        ):
+            return None, None
+
+        if self.fast_path:
+            entry = build_entry_fast(*fields, self._parse_timestamp)
+            if entry is not None:
+                return entry, None
+
+        data = dict(zip(_FIELD_ORDER, fields))
+        try:
+            # Hand the validator a datetime when the cache can produce one; invalid
+            # values stay strings so Pydantic reports the usual error
+            data["timestamp"] = self._parse_timestamp(data["timestamp"])
+        except ValueError:
+            pass
+
+        try:
+            return LogEntry(**data), None
+        except ValidationError as e:
+            return None, _error_details(e)
 
     def parse_line(self, line: str) -> Optional[LogEntry]:
         """
@@ -23,61 +177,141 @@ class LogParser:
         if not line:
             return None
 
-        match = LOG_PATTERN.match(line)
-        if not match:
-            return None
-
-        data = match.groupdict()
+        entry, _ = self._parse(line, self._format)
+        return entry
 
+    def read_timestamp(self, line: str) -> Optional[datetime]:
+        """
+        Returns the parsed timestamp of a line, or None if it has none.
+        Used to probe lines without building entries.
+        """
+        line = line.strip()
+        log_format = self._format or (dispatch(line) if line else None)
+        if log_format is None:
+            return None
+        fields = self._extract(line, log_format)
+        if fields is None:
+            return None
         try:
-            return LogEntry(**data)
-        except ValidationError:
+            return self._parse_timestamp(fields[0])
+        except ValueError:
             return None
 
-    def parse_file(self, lines: Iterable[str]) -> Dict[str, Any]:
+    def detect_format(self, lines: Iterable[str]) -> Optional[str]:
         """
-        Parses an iterable of lines and returns a structured dictionary
-        containing metadata, valid logs, and errors.
+        The format "auto" settles on for a stream: that of its first valid
+        line, as in iter_entries. Returns None if no line is valid.
         """
-        valid_logs = []
-        errors = []
+        for line in lines:
+            line = line.strip()
+            if not line:
+                continue
+            entry, _ = self._parse(line, self._format)
+            if entry is not None:
+                return (self._format or dispatch(line)).name
+        return None
 
-        # specific timezone aware now
-        start_time = datetime.now(timezone.utc)
+    def with_format(self, input_format: str) -> "LogParser":
+        """
+        A copy of this parser reading input_format, sharing its filter and
+        timestamp cache.
+        """
+        log_parser = copy.copy(self)
+        log_parser.input_format = input_format
+        log_parser._format = get_format(input_format)
+        return log_parser
+
+    def iter_entries(self, lines: Iterable[str]) -> Iterator[Union[LogEntry, Dict[str, Any]]]:
+        """
+        Lazily parses an iterable of lines.
+        Yields a LogEntry for every valid line and an error dictionary
+        for every malformed one. Blank lines are skipped but still counted
+        towards line numbers.
+        Lines rejected by the filter are skipped; with time-sorted input the
+        scan stops at the first line past the filter's `until`.
+        """
+        log_filter = self.log_filter
+        if log_filter is not None:
+            log_filter.exhausted = False
+        log_format = self._format
+        detect = self.input_format == AUTO_FORMAT
 
         for i, line in enumerate(lines, start=1):
             line = line.strip()
             if not line:
                 continue
 
-            match = LOG_PATTERN.match(line)
-            if not match:
-                errors.append({
+            entry, error = self._parse(line, log_format)
+            if entry is not None:
+                if detect and log_format is None:
+                    # Detected: the rest of the stream skips dispatch
+                    log_format = dispatch(line)
+                yield entry
+            elif error is not None:
+                yield {
                     "line_number": i,
                     "raw_content": line,
-                    "error": "Regex mismatch. Invalid format."
-                })
-                continue
+                    "error": error
+                }
+            elif log_filter.exhausted:
+                return
 
-            data = match.groupdict()
+    def iter_file(
+        self,
+        lines: Iterable[str],
+        stats: Optional[ParseStats] = None,
+        source: Optional[str] = None
+    ) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """
+        Streaming counterpart of parse_file.
+        Yields (kind, record) tuples as soon as each line is parsed, where kind
+        is LOG_RECORD or ERROR_RECORD and record is JSON-serializable.
+        If a ParseStats instance is given, its counters are updated in place.
+        If source is given, every record carries it under "source".
+        """
+        for item in self.iter_entries(lines):
+            if isinstance(item, LogEntry):
+                if stats is not None:
+                    stats.valid_count += 1
+                kind, record = LOG_RECORD, item.model_dump(mode='json')
+            else:
+                if stats is not None:
+                    stats.error_count += 1
+                kind, record = ERROR_RECORD, item
+            if source is not None:
+                record["source"] = source
+            yield kind, record
 
-            try:
-                entry = LogEntry(**data)
-                valid_logs.append(entry.model_dump(mode='json'))
-            except ValidationError as e:
-                errors.append({
-                    "line_number": i,
-                    "raw_content": line,
-                    "error": e.errors(include_url=False)
-                })
+    def parse_file(
+        self,
+        lines: Iterable[str],
+        error_collector: Optional[ErrorCollector] = None
+    ) -> Dict[str, Any]:
+        """
+        Parses an iterable of lines and returns a structured dictionary
+        containing metadata, valid logs, and errors.
+        With an ErrorCollector, "errors" holds only the records it retains
+        and the metadata gains its per-reason counts.
+        """
+        valid_logs: List[Dict[str, Any]] = []
+        errors: List[Dict[str, Any]] = []
+        stats = ParseStats()
+
+        for kind, record in self.iter_file(lines, stats):
+            if kind == LOG_RECORD:
+                valid_logs.append(record)
+            elif error_collector is not None:
+                error_collector.add(record)
+            else:
+                errors.append(record)
+
+        metadata = stats.to_metadata()
+        if error_collector is not None:
+            errors = error_collector.errors
+            metadata.update(error_collector.to_metadata())
 
         return {
-            "metadata": {
-                "timestamp": start_time.isoformat(),
-                "total_processed": len(valid_logs) + len(errors),
-                "valid_count": len(valid_logs),
-                "error_count": len(errors)
-            },
+            "metadata": metadata,
             "logs": valid_logs,
             "errors": errors
         }
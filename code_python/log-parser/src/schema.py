@@ -2,6 +2,8 @@ from datetime import datetime
 from enum import Enum
 from pydantic import BaseModel, Field, field_validator, ConfigDict
 
+_object_setattr = object.__setattr__
+
 class LogLevel(str, Enum):
     INFO = "INFO"
     ERROR = "ERROR"
@@ -26,3 +28,25 @@ class LogEntry(BaseModel):
             return datetime.fromisoformat(v.replace("Z", "+00:00"))
         except ValueError:
             raise ValueError("Invalid timestamp format. Expected ISO 8601.")
+
+    @classmethod
+    def from_trusted(cls, timestamp: datetime, level: LogLevel, trace_id: str, message: str) -> "LogEntry":
+        """
+        Builds an entry from values the caller has already checked, skipping validation.
+        Produces the same instance state as model_construct with every field set,
+        without its per-field alias and default handling (which costs more than
+        full validation for this small model).
+        """
+        entry = cls.__new__(cls)
+        _object_setattr(entry, "__dict__", {
+            "timestamp": timestamp,
+            "level": level,
+            "trace_id": trace_id,
+            "message": message
+        })
+        _object_setattr(entry, "__pydantic_fields_set__", set(_FIELD_NAMES))
+        _object_setattr(entry, "__pydantic_extra__", None)
+        _object_setattr(entry, "__pydantic_private__", None)
+        return entry
+
+_FIELD_NAMES = frozenset(LogEntry.model_fields)
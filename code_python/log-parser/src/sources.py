@@ -0,0 +1,115 @@
+import bz2
+import glob
+import gzip
+import io
+import lzma
+from pathlib import Path
+from typing import Iterable, List, Optional, TextIO, Iterator, Tuple, Dict, Any, Union
+from .parser import LogParser, ParseStats, ERROR_RECORD
+from .filters import seek_since
+
+# Magic bytes identifying each supported compression format
+MAGIC_BYTES = {
+    "gzip": b"\x1f\x8b",
+    "bzip2": b"BZh",
+    "xz": b"\xfd7zXZ\x00",
+}
+
+_OPENERS = {
+    "gzip": gzip.open,
+    "bzip2": bz2.open,
+    "xz": lzma.open,
+}
+
+_GLOB_CHARS = frozenset("*?[")
+
+def expand_inputs(patterns: Iterable[str]) -> List[Path]:
+    """
+    Resolves CLI inputs into an ordered list of files.
+    Each pattern may be a file, a directory (its files, sorted by name) or a
+    glob (matches sorted by name). Raises FileNotFoundError for a pattern that
+    matches nothing.
+    """
+    paths: List[Path] = []
+    for pattern in patterns:
+        if _GLOB_CHARS.intersection(pattern):
+            matches = [Path(p) for p in sorted(glob.glob(pattern)) if Path(p).is_file()]
+        else:
+            path = Path(pattern)
+            if path.is_dir():
+                matches = sorted(p for p in path.iterdir() if p.is_file() and not p.name.startswith("."))
+            elif path.is_file():
+                matches = [path]
+            else:
+                matches = []
+
+        if not matches:
+            raise FileNotFoundError(f"File '{pattern}' not found.")
+        paths.extend(matches)
+    return paths
+
+def detect_compression(path: Union[str, Path]) -> Optional[str]:
+    """
+    Returns "gzip", "bzip2" or "xz" based on the file's magic bytes, or None
+    for plain text. File extensions are ignored.
+    """
+    with open(path, "rb") as f:
+        head = f.read(6)
+    for name, magic in MAGIC_BYTES.items():
+        if head.startswith(magic):
+            return name
+    return None
+
+def open_text(path: Union[str, Path], compression: Optional[str] = None) -> TextIO:
+    """
+    Opens a log file for streaming text reads, decompressing on the fly.
+    Line splitting matches open(path, "r") for plain files.
+    """
+    if compression is None:
+        compression = detect_compression(path)
+    if compression is None:
+        return open(path, "r", encoding="utf-8")
+    return _OPENERS[compression](path, "rt", encoding="utf-8")
+
+def decode_lines(data: bytes) -> List[str]:
+    """
+    Splits a block of raw bytes that ends on a line boundary into text lines.
+    Uses the same universal-newline splitting as open(path, "r"), so byte-level
+    readers (ranges, follow mode) see exactly the lines a text reader would.
+    """
+    return io.StringIO(data.decode("utf-8"), newline=None).readlines()
+
+def iter_paths(
+    paths: Iterable[Path],
+    log_parser: LogParser,
+    stats: Optional[ParseStats] = None
+) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """
+    Streams every file through log_parser.iter_file, one after another.
+    Each record carries the name of the file it came from in "source";
+    line numbers restart at 1 for every file.
+
+    When the parser's filter has a `since` bound on time-sorted input, plain
+    files are binary-searched and reading starts at the first candidate line.
+    The skipped lines are never read, so line numbers after the jump are
+    unknown and error records report "line_number": null.
+    """
+    log_filter = log_parser.log_filter
+    for path in paths:
+        offset = 0
+        if (log_filter is not None and log_filter.sorted_input and log_filter.since is not None
+                and detect_compression(path) is None):
+            offset = seek_since(path, log_filter.since, log_parser.read_timestamp)
+
+        if offset == 0:
+            with open_text(path) as f:
+                yield from log_parser.iter_file(f, stats, source=str(path))
+            continue
+
+        with open(path, "rb") as raw:
+            raw.seek(offset)
+            with io.TextIOWrapper(raw, encoding="utf-8") as f:
+                for kind, record in log_parser.iter_file(f, stats, source=str(path)):
+                    if kind == ERROR_RECORD:
+                        record["line_number"] = None
+                    yield kind, record
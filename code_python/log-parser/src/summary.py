@@ -0,0 +1,110 @@
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Dict, Any, Iterable, List, Union, Hashable
+from .schema import LogEntry, LogLevel
+
+# Supported time bucket sizes and the datetime fields zeroed to reach each bucket's start
+BUCKETS = {
+    "minute": {"second": 0, "microsecond": 0},
+    "hour": {"minute": 0, "second": 0, "microsecond": 0},
+}
+
+class MisraGries:
+    """
+    Fixed-size frequent-items sketch (Misra-Gries).
+    Keeps at most `capacity` counters. Any item occurring more than
+    n / (capacity + 1) times in a stream of n items is guaranteed to be kept,
+    and each reported count undercounts the true count by at most that bound.
+    Updates are amortized O(1).
+    """
+    def __init__(self, capacity: int = 1000):
+        self.capacity = capacity
+        self.counts: Dict[Hashable, int] = {}
+        self.total = 0
+
+    def add(self, item: Hashable):
+        self.total += 1
+        counts = self.counts
+        if item in counts:
+            counts[item] += 1
+        elif len(counts) < self.capacity:
+            counts[item] = 1
+        else:
+            # Decrement everything; each decrement cancels an earlier increment,
+            # so the total work stays linear in the stream length
+            for key in list(counts):
+                if counts[key] == 1:
+                    del counts[key]
+                else:
+                    counts[key] -= 1
+
+    @property
+    def error_bound(self) -> int:
+        return self.total // (self.capacity + 1)
+
+    def top(self, k: int) -> List[Dict[str, Any]]:
+        items = sorted(self.counts.items(), key=lambda kv: kv[1], reverse=True)[:k]
+        return [{"trace_id": key, "count": count} for key, count in items]
+
+class LogSummary:
+    """
+    One-pass aggregates over parsed log entries, without keeping the entries.
+    Memory is bounded by the sketch size and the number of time buckets
+    (which grows with the time span covered, not with the number of lines).
+    """
+    def __init__(self, bucket: str = "minute", top_k: int = 10, sketch_size: int = 1000):
+        if bucket not in BUCKETS:
+            raise ValueError(f"Unsupported bucket '{bucket}'. Expected one of {sorted(BUCKETS)}.")
+        self.bucket = bucket
+        self.top_k = top_k
+        self._truncate = BUCKETS[bucket]
+        self.level_counts: Counter = Counter()
+        self.error_buckets: Counter = Counter()
+        self.trace_ids = MisraGries(sketch_size)
+        self.valid_count = 0
+        self.parse_error_count = 0
+
+    def add_entry(self, entry: LogEntry):
+        self.valid_count += 1
+        self.level_counts[entry.level.value] += 1
+        self.trace_ids.add(entry.trace_id)
+        if entry.level is LogLevel.ERROR:
+            self.error_buckets[self._bucket_start(entry.timestamp)] += 1
+
+    def add_parse_error(self):
+        self.parse_error_count += 1
+
+    def consume(self, items: Iterable[Union[LogEntry, Dict[str, Any]]]):
+        """
+        Feeds the output of LogParser.iter_entries into the summary.
+        """
+        for item in items:
+            if isinstance(item, LogEntry):
+                self.add_entry(item)
+            else:
+                self.add_parse_error()
+
+    def _bucket_start(self, timestamp: datetime) -> datetime:
+        # Buckets are cut in UTC, so equal instants share one whatever their
+        # offset; naive timestamps are taken to be UTC
+        if timestamp.tzinfo is None:
+            timestamp = timestamp.replace(tzinfo=timezone.utc)
+        else:
+            timestamp = timestamp.astimezone(timezone.utc)
+        return timestamp.replace(**self._truncate)
+
+    def to_dict(self) -> Dict[str, Any]:
+        total = self.valid_count + self.parse_error_count
+        return {
+            "total_processed": total,
+            "valid_count": self.valid_count,
+            "parse_error_count": self.parse_error_count,
+            "parse_error_rate": self.parse_error_count / total if total else 0.0,
+            "levels": {level.value: self.level_counts.get(level.value, 0) for level in LogLevel},
+            "bucket": self.bucket,
+            "errors_per_bucket": {
+                start.isoformat(): count for start, count in sorted(self.error_buckets.items())
+            },
+            "top_trace_ids": self.trace_ids.top(self.top_k),
+            "top_trace_ids_max_undercount": self.trace_ids.error_bound
+        }
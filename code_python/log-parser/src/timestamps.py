@@ -0,0 +1,70 @@
+from datetime import datetime, timezone
+from typing import Dict
+
+# After a poor window, lookups skip the cache for maxsize * BYPASS_FACTOR calls before probing again
+BYPASS_FACTOR = 64
+
+def parse_iso_timestamp(value: str) -> datetime:
+    """
+    Uncached timestamp parsing, identical to LogEntry.parse_timestamp.
+    """
+    return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+def to_epoch_micros(value: datetime) -> int:
+    """
+    Converts a timestamp to integer microseconds since the Unix epoch.
+    Naive timestamps are taken to be UTC.
+    """
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    delta = value - _EPOCH
+    return (delta.days * 86_400 + delta.seconds) * 1_000_000 + delta.microseconds
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+class TimestampCache:
+    """
+    Bounded cache of parsed timestamps keyed by the raw timestamp string.
+    Bursts of lines written within the same second (or millisecond) share one
+    timestamp string, so a hit replaces replace() + fromisoformat with a dict lookup.
+
+    Keying by the second prefix and adding the fraction back was measured to be
+    several times slower than the C fromisoformat it would replace (building the
+    timedelta/replace() alone costs more), so only exact repeats are cached.
+    When timestamps rarely repeat (microsecond resolution) the cache backs off
+    instead of paying for an insert on every line.
+    """
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = maxsize
+        self._cache: Dict[str, datetime] = {}
+        self.hits = 0
+        self.misses = 0
+        self._hits_at_reset = 0
+        self._bypass_remaining = 0
+
+    def parse(self, value: str) -> datetime:
+        """
+        Returns exactly what parse_iso_timestamp(value) returns, raising the same
+        ValueError on invalid input. Invalid values are never cached.
+        """
+        if self._bypass_remaining:
+            self._bypass_remaining -= 1
+            return parse_iso_timestamp(value)
+
+        parsed = self._cache.get(value)
+        if parsed is not None:
+            self.hits += 1
+            return parsed
+
+        parsed = parse_iso_timestamp(value)
+        self.misses += 1
+        if len(self._cache) >= self.maxsize:
+            # Log time only moves forward, so old keys are dead weight: start over.
+            # If fewer than half the lookups since the last reset were hits,
+            # caching costs more than it saves for this input.
+            if self.hits - self._hits_at_reset < self.maxsize:
+                self._bypass_remaining = self.maxsize * BYPASS_FACTOR
+            self._cache.clear()
+            self._hits_at_reset = self.hits
+        self._cache[value] = parsed
+        return parsed
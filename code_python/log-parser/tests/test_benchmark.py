@@ -0,0 +1,33 @@
+import pytest
+from src.benchmark import MODES, run_case
+from src.generator import generate_lines
+from src.parser import LogParser
+
+def test_generator_is_seeded_and_honours_its_knobs():
+    assert list(generate_lines(50, seed=3)) == list(generate_lines(50, seed=3))
+    assert list(generate_lines(50, seed=3)) != list(generate_lines(50, seed=4))
+
+    long_lines = list(generate_lines(200, seed=1, message_length=200))
+    messages = [LogParser().parse_line(line).message for line in long_lines]
+    assert all(200 <= len(message) < 220 for message in messages)
+
+    # A larger gap between lines means more distinct timestamps
+    sparse = {line[:21] for line in generate_lines(1000, timespec="seconds", mean_gap_us=100_000)}
+    dense = {line[:21] for line in generate_lines(1000, timespec="seconds", mean_gap_us=1000)}
+    assert len(sparse) > 10 * len(dense)
+
+    errors = LogParser().parse_file(generate_lines(2000, error_rate=0.1))["errors"]
+    assert 150 < len(errors) < 250
+
+@pytest.mark.parametrize("mode", list(MODES))
+def test_run_case_reports_every_metric(mode):
+    result = run_case({
+        "parser": "fast+cache",
+        "mode": mode,
+        "repeat": 1,
+        "generator": {"count": 200, "seed": 0, "error_rate": 0.05}
+    })
+    assert result["mode"] == mode
+    assert result["lines_per_sec"] > 0
+    assert result["peak_rss_kb"] > 0
+    assert result["alloc_peak_bytes"] > 0
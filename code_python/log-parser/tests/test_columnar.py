@@ -0,0 +1,68 @@
+import io
+import json
+import pytest
+from datetime import datetime, timezone
+import src.columnar as columnar
+from src.columnar import write_columnar, read_columnar, LEVELS
+from src.generator import generate_lines
+from src.parser import LogParser, ParseStats
+
+@pytest.fixture
+def lines():
+    return list(generate_lines(500, seed=2, error_rate=0.05, message_length=30)) + [
+        "[2023-10-27T10:00:00+02:00] [DEBUG] [abc] Ünïcödé message ✓"
+    ]
+
+def _write(lines, path, engine):
+    stats = ParseStats()
+    metadata_out = io.StringIO()
+    write_columnar(LogParser().iter_file(lines, stats), stats, path, metadata_out, engine=engine, batch_size=64)
+    return json.loads(metadata_out.getvalue())
+
+def _epoch_micros(iso: str) -> int:
+    dt = datetime.fromisoformat(iso.replace("Z", "+00:00"))
+    return (dt - datetime(1970, 1, 1, tzinfo=timezone.utc)) // datetime.resolution
+
+@pytest.mark.parametrize("without_numpy", [False, True])
+def test_npy_columns_round_trip(lines, tmp_path, monkeypatch, without_numpy):
+    if without_numpy:
+        monkeypatch.setattr(columnar, "np", None)
+    expected = LogParser().parse_file(lines)
+    report = _write(lines, tmp_path / "out", "npy")
+    columns = read_columnar(tmp_path / "out")
+
+    logs = expected["logs"]
+    assert len(columns["timestamp"]) == len(columns["message"]) == len(logs)
+    assert list(columns["timestamp"]) == [_epoch_micros(log["timestamp"]) for log in logs]
+    assert [columns["levels"][code] for code in columns["level"]] == [log["level"] for log in logs]
+    assert [columns["trace_id"][i] for i in range(len(logs))] == [log["trace_id"] for log in logs]
+    assert columns["message"][-1] == "Ünïcödé message ✓"
+
+    assert report["metadata"]["error_count"] == len(expected["errors"])
+    assert [e["line_number"] for e in report["errors"]] == [e["line_number"] for e in expected["errors"]]
+
+def test_npy_files_load_with_numpy(lines, tmp_path):
+    np = pytest.importorskip("numpy")
+    _write(lines, tmp_path / "out", "npy")
+    timestamps = np.load(tmp_path / "out" / "timestamp.npy")
+    assert timestamps.dtype == np.int64
+    assert np.all(np.diff(timestamps[:-1]) >= 0)
+    assert np.load(tmp_path / "out" / "level.npy").max() < len(LEVELS)
+
+def test_parquet_round_trip(lines, tmp_path):
+    pytest.importorskip("pyarrow")
+    expected = LogParser().parse_file(lines)["logs"]
+    _write(lines, tmp_path / "out.parquet", "parquet")
+    table = read_columnar(tmp_path / "out.parquet")["table"]
+
+    assert table.num_rows == len(expected)
+    assert table.column("level").to_pylist() == [log["level"] for log in expected]
+    assert table.column("message").to_pylist()[-1] == "Ünïcödé message ✓"
+    micros = table.column("timestamp").cast("int64").to_pylist()
+    assert micros == [_epoch_micros(log["timestamp"]) for log in expected]
+
+def test_parquet_engine_requires_pyarrow(tmp_path, monkeypatch):
+    monkeypatch.setattr(columnar, "pq", None)
+    assert write_columnar(iter([]), ParseStats(), tmp_path / "out", engine="auto") == "npy"
+    with pytest.raises(ImportError):
+        write_columnar(iter([]), ParseStats(), tmp_path / "out.parquet", engine="parquet")
@@ -0,0 +1,68 @@
+import io
+import json
+from src.errors import ErrorCollector, error_reasons
+from src.output import write_json, write_ndjson
+from src.parser import LogParser, ParseStats, REGEX_MISMATCH_ERROR
+
+def _corrupted_lines(count: int):
+    lines = []
+    for i in range(count):
+        lines.append(f"[2023-10-27T10:00:00Z] [INFO] [abc-{i % 3}] Line {i}")
+        lines.append(f"garbage {i}" if i % 2 else f"[2023-13-45T10:00:00Z] [INFO] [abc] Bad {i}")
+    return lines
+
+def test_collector_keeps_first_and_samples_rest():
+    collector = ErrorCollector(max_errors=5, sample_size=10, seed=1)
+    kept = [collector.add({"line_number": i, "error": REGEX_MISMATCH_ERROR}) for i in range(1000)]
+
+    assert kept[:5] == [True] * 5 and not any(kept[5:])
+    assert [e["line_number"] for e in collector.first] == list(range(5))
+    sampled = [e["line_number"] for e in collector.sample]
+    assert len(sampled) == 10 and sampled == sorted(sampled) and min(sampled) >= 5
+    assert collector.to_metadata() == {
+        "errors_retained": 15,
+        "errors_dropped": 985,
+        "error_reasons": {REGEX_MISMATCH_ERROR: 1000}
+    }
+
+def test_parse_file_with_collector_counts_reasons_and_spills():
+    spill = io.StringIO()
+    collector = ErrorCollector(max_errors=3, spill=spill)
+    result = LogParser().parse_file(_corrupted_lines(100), collector)
+
+    assert len(result["logs"]) == 100
+    assert len(result["errors"]) == 3
+    metadata = result["metadata"]
+    assert metadata["error_count"] == 100
+    assert metadata["errors_dropped"] == 97
+    assert metadata["error_reasons"] == {REGEX_MISMATCH_ERROR: 50, "timestamp: value_error": 50}
+
+    spilled = [json.loads(line) for line in spill.getvalue().splitlines()]
+    assert [e["line_number"] for e in spilled] == list(range(2, 201, 2))
+
+def test_bad_timestamp_errors_are_json_serializable():
+    lines = ["[2023-13-45T10:00:00Z] [INFO] [abc] Bad timestamp"]
+    out = io.StringIO()
+    stats = ParseStats()
+    write_json(LogParser().iter_file(lines, stats), stats, out)
+    error = json.loads(out.getvalue())["errors"][0]["error"][0]
+    assert error["ctx"] == {"error": "Invalid timestamp format. Expected ISO 8601."}
+
+def test_ndjson_writes_first_errors_then_sample():
+    stats = ParseStats()
+    out = io.StringIO()
+    collector = ErrorCollector(max_errors=2, sample_size=3, seed=0)
+    write_ndjson(LogParser().iter_file(_corrupted_lines(20), stats), stats, out, error_collector=collector)
+
+    records = [json.loads(line) for line in out.getvalue().splitlines()]
+    errors = [r for r in records if r["type"] == "error"]
+    assert [e["line_number"] for e in errors[:2]] == [2, 4]
+    assert len(errors) == 5
+    assert records[-1]["type"] == "metadata"
+    assert records[-1]["errors_dropped"] == 15
+
+def test_error_reasons():
+    assert error_reasons("Regex mismatch. Invalid format.") == ["Regex mismatch. Invalid format."]
+    assert error_reasons([{"loc": ("level",), "type": "enum"}, {"loc": (), "type": "missing"}]) == [
+        "level: enum", "<line>: missing"
+    ]
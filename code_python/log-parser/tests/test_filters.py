@@ -0,0 +1,85 @@
+import pytest
+from datetime import datetime, timedelta, timezone
+from src.filters import LogFilter, seek_since
+from src.parser import LogParser, ParseStats
+from src.sources import iter_paths
+from src.schema import LogEntry
+
+def _ts(minute: int) -> datetime:
+    return datetime(2023, 10, 27, 10, minute, tzinfo=timezone.utc)
+
+@pytest.fixture
+def sorted_log(tmp_path):
+    lines = []
+    for i in range(6000):
+        ts = (_ts(0) + timedelta(seconds=i)).isoformat()
+        level = "ERROR" if i % 3 == 0 else "INFO"
+        lines.append(f"[{ts}] [{level}] [abc-{i % 4}] Line {i}")
+    path = tmp_path / "sorted.log"
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    return path
+
+@pytest.mark.parametrize("fast_path", [True, False])
+def test_filtered_lines_are_neither_validated_nor_counted(fast_path, monkeypatch):
+    validated = []
+    original = LogEntry.from_trusted.__func__
+    monkeypatch.setattr(LogEntry, "from_trusted", classmethod(
+        lambda cls, *args: validated.append(args) or original(cls, *args)
+    ))
+    original_init = LogEntry.__init__
+    monkeypatch.setattr(LogEntry, "__init__", lambda self, **kw: validated.append(kw) or original_init(self, **kw))
+
+    lines = [
+        "[2023-10-27T10:00:00Z] [INFO] [abc-1] kept",
+        "[2023-10-27T10:01:00Z] [DEBUG] [abc-1] wrong level",
+        "[2023-10-27T10:02:00Z] [INFO] [abc-2] wrong trace",
+        "[2023-10-27T10:09:00Z] [INFO] [abc-1] too late",
+        "Invalid Line",
+    ]
+    log_filter = LogFilter(levels=["INFO"], trace_id="abc-1", until=_ts(5))
+    parser = LogParser(fast_path=fast_path, log_filter=log_filter)
+    result = parser.parse_file(lines)
+
+    assert [log["message"] for log in result["logs"]] == ["kept"]
+    # Malformed lines cannot be filtered and are still reported
+    assert [e["line_number"] for e in result["errors"]] == [5]
+    assert result["metadata"]["total_processed"] == 2
+    assert len(validated) == 1
+
+def test_unparseable_timestamp_passes_through_to_validation():
+    parser = LogParser(log_filter=LogFilter(since=_ts(0)))
+    result = parser.parse_file(["[not-a-time] [INFO] [abc] message"])
+    assert len(result["errors"]) == 1
+
+def test_seek_since_skips_earlier_lines(sorted_log):
+    since = _ts(40)
+    offset = seek_since(sorted_log, since, LogParser().read_timestamp)
+    assert offset > 0
+
+    head = sorted_log.read_bytes()[:offset].decode("utf-8").splitlines()
+    assert head and all(LogParser().read_timestamp(line) < since for line in head)
+
+def test_sorted_range_matches_full_scan(sorted_log):
+    log_filter = LogFilter(since=_ts(40), until=_ts(45), levels=["ERROR"], sorted_input=True)
+    stats = ParseStats()
+    records = list(iter_paths([sorted_log], LogParser(log_filter=log_filter), stats))
+
+    unsorted = LogFilter(since=_ts(40), until=_ts(45), levels=["ERROR"])
+    expected = list(iter_paths([sorted_log], LogParser(log_filter=unsorted)))
+
+    assert records == expected
+    assert stats.valid_count == len(records) == 101
+    assert log_filter.exhausted
+
+def test_exhausted_filter_stops_reading():
+    consumed = []
+
+    def lines():
+        for i in range(60):
+            consumed.append(i)
+            yield f"[2023-10-27T10:{i:02d}:00Z] [INFO] [abc] Line {i}"
+
+    parser = LogParser(log_filter=LogFilter(until=_ts(9), sorted_input=True))
+    entries = list(parser.iter_entries(lines()))
+    assert len(entries) == 10
+    assert len(consumed) == 11
@@ -0,0 +1,85 @@
+import io
+import json
+import os
+import pytest
+from src.follow import LogFollower
+from src.parser import LogParser
+
+LINE = "[2023-10-27T10:00:00Z] [INFO] [abc-123] Line {}\n"
+
+class CountingWriter(io.StringIO):
+    def __init__(self):
+        super().__init__()
+        self.writes = 0
+
+    def write(self, s):
+        self.writes += 1
+        return super().write(s)
+
+def messages(out):
+    return [json.loads(l).get("message") or json.loads(l)["raw_content"] for l in out.getvalue().splitlines()]
+
+@pytest.fixture
+def log_path(tmp_path):
+    path = tmp_path / "app.log"
+    path.write_text("")
+    return path
+
+def test_follow_emits_appended_lines_in_batches(log_path, tmp_path):
+    out = CountingWriter()
+    follower = LogFollower(log_path, LogParser(), out, checkpoint_path=tmp_path / "ckpt.json")
+    assert follower.poll() == 0
+
+    with open(log_path, "a") as f:
+        f.write("".join(LINE.format(i) for i in range(100)))
+        f.write("[2023-10-27T10:00:00Z] [INFO] [abc-123] partial")
+    assert follower.poll() == 100
+    assert out.writes == 1
+
+    with open(log_path, "a") as f:
+        f.write(" line\nbroken\n")
+    assert follower.poll() == 2
+    assert messages(out)[-2:] == ["partial line", "broken"]
+    assert json.loads(out.getvalue().splitlines()[-1])["line_number"] == 102
+
+def test_follow_batches_never_exceed_batch_size(log_path):
+    out = CountingWriter()
+    follower = LogFollower(log_path, LogParser(), out, batch_size=30)
+    with open(log_path, "a") as f:
+        f.write("".join(LINE.format(i) for i in range(100)))
+    # 100 lines in one read: three full batches and a last one of 10
+    assert follower.poll() == 100
+    assert out.writes == 4
+    assert messages(out) == [f"Line {i}" for i in range(100)]
+
+def test_follow_resumes_from_checkpoint(log_path, tmp_path):
+    checkpoint = tmp_path / "ckpt.json"
+    log_path.write_text(LINE.format(1) + LINE.format(2))
+    out = io.StringIO()
+    LogFollower(log_path, LogParser(), out, checkpoint_path=checkpoint).poll()
+
+    with open(log_path, "a") as f:
+        f.write(LINE.format(3))
+    out = io.StringIO()
+    LogFollower(log_path, LogParser(), out, checkpoint_path=checkpoint).poll()
+    assert messages(out) == ["Line 3"]
+    assert json.loads(checkpoint.read_text())["offset"] == os.path.getsize(log_path)
+
+def test_follow_handles_rotation_and_truncation(log_path, tmp_path):
+    out = io.StringIO()
+    follower = LogFollower(log_path, LogParser(), out)
+    log_path.write_text(LINE.format(1))
+    follower.poll()
+
+    # Rotation: the old file gets a last line, then is moved away
+    with open(log_path, "a") as f:
+        f.write(LINE.format(2).rstrip("\n"))
+    os.rename(log_path, tmp_path / "app.log.1")
+    log_path.write_text(LINE.format(3))
+    follower.poll()
+    assert messages(out) == ["Line 1", "Line 2", "Line 3"]
+
+    # Truncation in place, detected because the file shrank below the offset
+    log_path.write_text("[2023-10-27T10:00:00Z] [INFO] [abc] L4\n")
+    follower.poll()
+    assert messages(out)[-1] == "L4"
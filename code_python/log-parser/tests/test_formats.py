@@ -0,0 +1,84 @@
+import pytest
+from datetime import datetime, timedelta, timezone
+from src.formats import (
+    FORMATS, LogFormat, register_format, dispatch, nginx_timestamp, UNKNOWN_FORMAT_ERROR
+)
+from src.parser import LogParser, REGEX_MISMATCH_ERROR
+
+BRACKETED_LINE = "[2023-10-27T10:00:00Z] [INFO] [abc-123] User logged in"
+JSON_LINE = '{"timestamp": "2023-10-27T10:00:01Z", "level": "warning", "trace_id": "abc-124", "msg": "Slow query"}'
+NGINX_LINE = (
+    '192.168.1.7 - - [27/Oct/2023:12:00:02 +0200] "GET /health HTTP/1.1" 503 19 "-" "curl/8.0" abc-125'
+)
+
+def test_dispatch_by_first_character():
+    assert dispatch(BRACKETED_LINE) is FORMATS["bracketed"]
+    assert dispatch(JSON_LINE) is FORMATS["json"]
+    assert dispatch(NGINX_LINE) is FORMATS["nginx"]
+    assert dispatch("garbage") is None
+
+def test_register_format_rejects_overlapping_first_characters():
+    with pytest.raises(ValueError):
+        register_format(LogFormat("other-json", "{", lambda line: None))
+    assert FORMATS["json"].name == "json"
+
+def test_nginx_timestamp_to_iso():
+    assert nginx_timestamp("10/Oct/2000:13:55:36 -0700") == "2000-10-10T13:55:36-07:00"
+    assert nginx_timestamp("not a time") == "not a time"
+
+def test_mixed_input_parses_every_format():
+    parser = LogParser(input_format="mixed")
+    result = parser.parse_file([BRACKETED_LINE, JSON_LINE, NGINX_LINE, "garbage", "{not json"])
+
+    logs = result["logs"]
+    assert [log["trace_id"] for log in logs] == ["abc-123", "abc-124", "abc-125"]
+    assert [log["level"] for log in logs] == ["INFO", "WARN", "ERROR"]
+    assert logs[2]["message"] == '192.168.1.7 "GET /health HTTP/1.1" 503 19'
+    # Every line is the same instant in a different notation
+    times = {datetime.fromisoformat(log["timestamp"].replace("Z", "+00:00")) for log in logs}
+    assert len(times) == 3 and max(times) - min(times) == timedelta(seconds=2)
+    assert [e["error"] for e in result["errors"]] == [UNKNOWN_FORMAT_ERROR, "Invalid json line."]
+
+def test_auto_detects_once_then_stays_on_format():
+    parser = LogParser(input_format="auto")
+    lines = [JSON_LINE, BRACKETED_LINE]
+    result = parser.parse_file(lines)
+    assert len(result["logs"]) == 1
+    # Detected as JSON lines, so the bracketed line is an invalid JSON line
+    assert result["errors"][0]["error"] == "Invalid json line."
+
+    result = LogParser(input_format="auto").parse_file([BRACKETED_LINE, JSON_LINE])
+    assert result["errors"][0]["error"] == REGEX_MISMATCH_ERROR
+
+def test_auto_detects_once_per_file_in_parallel(tmp_path):
+    from src.parallel import iter_file_parallel
+
+    # Detected as JSON lines on line 2; later ranges start with bracketed lines
+    lines = ["garbage", JSON_LINE] + [BRACKETED_LINE, JSON_LINE] * 50
+    path = tmp_path / "mixed.log"
+    path.write_text("\n".join(lines), encoding="utf-8")
+
+    parser = LogParser(input_format="auto")
+    assert parser.detect_format(lines) == "json"
+    assert parser.detect_format(["garbage"]) is None
+    expected = parser.parse_file(lines)
+    actual = list(iter_file_parallel(path, parser, workers=2, chunk_size=len(BRACKETED_LINE) * 4))
+    assert [record for kind, record in actual if kind == "log"] == expected["logs"]
+    assert [record for kind, record in actual if kind == "error"] == expected["errors"]
+    assert len(expected["logs"]) == 51
+
+@pytest.mark.parametrize("fast_path", [True, False])
+def test_json_lines_validation_errors_match_bracketed(fast_path):
+    parser = LogParser(fast_path=fast_path, input_format="json")
+    result = parser.parse_file([
+        '{"timestamp": "2023-10-27T10:00:00Z", "level": "TRACE", "trace_id": "abc", "message": "x"}',
+        '{"timestamp": "yesterday", "level": "INFO", "trace_id": "abc", "message": "x"}',
+    ])
+    assert [e["error"][0]["loc"] for e in result["errors"]] == [("level",), ("timestamp",)]
+
+def test_default_format_is_bracketed_only():
+    result = LogParser().parse_file([JSON_LINE])
+    assert result["errors"][0]["error"] == REGEX_MISMATCH_ERROR
+    assert LogParser(input_format="nginx").parse_line(NGINX_LINE).timestamp == datetime(
+        2023, 10, 27, 10, 0, 2, tzinfo=timezone.utc
+    )
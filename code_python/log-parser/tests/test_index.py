@@ -0,0 +1,48 @@
+import pytest
+from datetime import datetime, timezone
+from src.index import LogIndex, StaleIndexError
+from src.parser import LogParser
+
+@pytest.fixture
+def log_file(tmp_path):
+    lines = []
+    for i in range(50):
+        lines.append(f"[2023-10-27T10:{i:02d}:00Z] [INFO] [abc-{i % 5}] Line {i}")
+        if i == 30:
+            lines.append("Invalid Line")
+    path = tmp_path / "app.log"
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    return path
+
+@pytest.fixture
+def index(log_file, tmp_path):
+    with LogIndex(tmp_path / "app.idx") as index:
+        index.build(log_file, LogParser(), sparse_every=7)
+        yield index
+
+def test_trace_lookup_reads_only_matching_lines(index):
+    records = list(index.iter_trace("abc-3", LogParser()))
+    assert [r["message"] for _, r in records] == [f"Line {i}" for i in range(3, 50, 5)]
+    assert list(index.iter_trace("no-such-trace", LogParser())) == []
+
+def test_time_range_lookup_matches_full_scan(index, log_file):
+    parser = LogParser()
+    since = datetime(2023, 10, 27, 10, 20, tzinfo=timezone.utc)
+    until = datetime(2023, 10, 27, 10, 35, tzinfo=timezone.utc)
+
+    records = list(index.iter_range(since, until, parser))
+    logs = [r["message"] for kind, r in records if kind == "log"]
+    errors = [r for kind, r in records if kind == "error"]
+
+    assert logs == [f"Line {i}" for i in range(20, 36)]
+    full = parser.parse_file(open(log_file, encoding="utf-8"))
+    assert errors[0]["line_number"] == full["errors"][0]["line_number"] == 32
+
+    start, _, stop = index._range_bounds(since, until)
+    assert start > 0 and stop < log_file.stat().st_size
+
+def test_index_detects_replaced_log(index, log_file):
+    log_file.unlink()
+    log_file.write_text("[2023-10-27T10:00:00Z] [INFO] [abc-3] new\n")
+    with pytest.raises(StaleIndexError):
+        list(index.iter_trace("abc-3", LogParser()))
@@ -82,3 +82,221 @@ def test_parse_file_validation_error(parser):
     error_list = result["errors"][0]["error"]
     assert isinstance(error_list, list) # Pydantic returns list of dicts
     assert any(e['type'] == 'enum' for e in error_list)
+
+def test_iter_file_is_lazy(parser):
+    def lines():
+        yield "[2023-10-27T10:00:00Z] [INFO] [abc-123] Line 1"
+        raise AssertionError("iter_file consumed more input than requested")
+
+    kind, record = next(parser.iter_file(lines()))
+    assert kind == "log"
+    assert record["message"] == "Line 1"
+
+def test_write_ndjson_trailer_and_sidecar(parser):
+    import io
+    import json
+    from src.output import write_ndjson
+    from src.parser import ParseStats
+
+    lines = [
+        "[2023-10-27T10:00:00Z] [INFO] [abc-123] Line 1",
+        "Invalid Line",
+    ]
+    stats = ParseStats()
+    out = io.StringIO()
+    write_ndjson(parser.iter_file(lines, stats), stats, out)
+    records = [json.loads(l) for l in out.getvalue().splitlines()]
+
+    assert [r["type"] for r in records] == ["log", "error", "metadata"]
+    assert records[1]["line_number"] == 2
+    assert records[2]["valid_count"] == 1
+    assert records[2]["error_count"] == 1
+
+    stats = ParseStats()
+    out, sidecar = io.StringIO(), io.StringIO()
+    write_ndjson(parser.iter_file(lines, stats), stats, out, sidecar)
+    assert [json.loads(l)["type"] for l in out.getvalue().splitlines()] == ["log", "error"]
+    assert json.loads(sidecar.getvalue())["total_processed"] == 2
+
+def test_split_ranges_align_to_newlines(tmp_path):
+    from src.parallel import split_ranges
+
+    path = tmp_path / "app.log"
+    path.write_bytes(b"aaaa\nbb\n\ncccccc\nd")
+    ranges = split_ranges(path, chunk_size=3)
+    data = path.read_bytes()
+
+    assert ranges[0][0] == 0 and ranges[-1][1] == len(data)
+    for (_, end), (start, _) in zip(ranges, ranges[1:]):
+        assert end == start
+        assert data[end - 1:end] == b"\n"
+
+def test_iter_file_parallel_matches_single_process(parser, tmp_path):
+    from src.parallel import iter_file_parallel
+
+    lines = []
+    for i in range(200):
+        if i % 7 == 0:
+            lines.append("garbage line")
+        elif i % 11 == 0:
+            lines.append("")
+        elif i % 13 == 0:
+            lines.append(f"[2023-10-27T10:00:{i % 60:02d}Z] [FATAL] [abc-{i}] bad level")
+        else:
+            lines.append(f"[2023-10-27T10:00:{i % 60:02d}Z] [INFO] [abc-{i}] Line {i}")
+    path = tmp_path / "app.log"
+    path.write_text("\r\n".join(lines), encoding="utf-8")
+
+    with open(path, "r", encoding="utf-8") as f:
+        expected = list(parser.iter_file(f))
+    actual = list(iter_file_parallel(path, parser, workers=2, chunk_size=256))
+
+    assert actual == expected
+
+def test_fast_path_matches_regex_path():
+    import json
+    from src.generator import generate_lines
+    from src.parser import LogParser
+
+    lines = list(generate_lines(500, seed=1, error_rate=0.2)) + [
+        "[2023-10-27T10:00:00Z] [INFO] [abc-123]  leading space in message",
+        "[2023-10-27T10:00:00+02:00] [WARN] [abc] [nested] brackets",
+        "[2023-10-27 10:00:00] [DEBUG] [0-0] space separated timestamp",
+        "[2023-10-27T10:00:00Z] [INFO] [] empty trace id",
+        "[2023-10-27T10:00:00Z] [info] [abc] lower-case level",
+        "[2023-10-27T10:00:00Z] [INFO] [abc]",
+        "[[2023-10-27T10:00:00Z] [INFO] [abc] doubled bracket",
+        "[2023-10-27T10:00:00Z] [INFO] [abc] multi\nline",
+    ]
+
+    regex_result = LogParser(fast_path=False).parse_file(lines)
+    fast_result = LogParser(fast_path=True).parse_file(lines)
+
+    assert fast_result["logs"] == regex_result["logs"]
+    # Pydantic error contexts hold exception instances, which only compare by identity
+    assert json.dumps(fast_result["errors"]) == json.dumps(regex_result["errors"])
+    assert fast_result["metadata"]["valid_count"] > 0
+
+@pytest.mark.parametrize("values", [
+    ["2023-10-27T10:00:00Z", "2023-10-27T10:00:00.123Z", "2023-10-27T10:00:00.123456Z"],
+    ["2023-10-27T10:00:00+05:30", "2023-10-27T10:00:00.5+05:30", "2023-10-27T10:00:00.000001+05:30"],
+    ["2023-10-27T10:00:00", "2023-10-27T10:00:00.250", "2023-10-27 10:00:00.250"],
+    ["2023-10-27", "2023-10-27T10:00:00.123456789Z", "2023-10-27T10:00:60.123Z", "garbage"],
+])
+def test_timestamp_cache_matches_fromisoformat(values):
+    from src.timestamps import TimestampCache, parse_iso_timestamp
+
+    cache = TimestampCache(maxsize=2)
+    for value in values * 2:
+        try:
+            expected = parse_iso_timestamp(value)
+        except ValueError:
+            with pytest.raises(ValueError):
+                cache.parse(value)
+            continue
+        actual = cache.parse(value)
+        assert actual == expected
+        assert actual.tzinfo == expected.tzinfo
+    assert len(cache._cache) <= 2
+
+def test_timestamp_cache_backs_off_when_values_do_not_repeat():
+    from src.timestamps import TimestampCache, parse_iso_timestamp
+
+    cache = TimestampCache(maxsize=4)
+    repeated = ["2023-10-27T10:00:00Z"] * 10
+    assert [cache.parse(v) for v in repeated] == [parse_iso_timestamp(v) for v in repeated]
+    assert cache.hits == 9
+
+    unique = [f"2023-10-27T10:00:00.{i:06d}Z" for i in range(10)]
+    assert [cache.parse(v) for v in unique] == [parse_iso_timestamp(v) for v in unique]
+    assert cache._bypass_remaining > 0
+
+def test_compressed_and_multi_file_inputs(parser, tmp_path):
+    import bz2
+    import gzip
+    import lzma
+    from src.parallel import iter_files_parallel
+    from src.sources import detect_compression, expand_inputs, iter_paths
+
+    content = "[2023-10-27T10:00:00Z] [INFO] [abc-123] Line 1\nInvalid Line\n"
+    logs = tmp_path / "logs"
+    logs.mkdir()
+    (logs / "app.log").write_text(content, encoding="utf-8")
+    # Extensions are deliberately misleading: detection uses magic bytes
+    (logs / "app.log.1").write_bytes(gzip.compress(content.encode()))
+    (logs / "app.log.2.gz").write_bytes(bz2.compress(content.encode()))
+    (logs / "app.log.3").write_bytes(lzma.compress(content.encode()))
+
+    assert [detect_compression(p) for p in sorted(logs.iterdir())] == [None, "gzip", "bzip2", "xz"]
+    assert expand_inputs([str(logs)]) == expand_inputs([str(logs / "app.log*")])
+    with pytest.raises(FileNotFoundError):
+        expand_inputs([str(tmp_path / "missing*.log")])
+
+    paths = expand_inputs([str(logs)])
+    records = list(iter_paths(paths, parser))
+    assert len(records) == 8
+    assert [r["source"] for _, r in records] == [str(p) for p in paths for _ in range(2)]
+    assert all(r["line_number"] == 2 for kind, r in records if kind == "error")
+
+    assert list(iter_files_parallel(paths, parser, workers=2, chunk_size=16)) == records
+
+def test_summary_aggregates_in_one_pass(parser):
+    from src.summary import LogSummary
+
+    lines = [
+        "[2023-10-27T10:00:05Z] [ERROR] [aaa] boom",
+        "[2023-10-27T10:00:59Z] [ERROR] [aaa] boom again",
+        "[2023-10-27T10:01:00Z] [ERROR] [bbb] other",
+        "[2023-10-27T10:01:30Z] [INFO] [aaa] fine",
+        "Invalid Line",
+    ]
+    summary = LogSummary(bucket="minute", top_k=1)
+    summary.consume(parser.iter_entries(lines))
+    result = summary.to_dict()
+
+    assert result["levels"] == {"INFO": 1, "ERROR": 3, "WARN": 0, "DEBUG": 0}
+    assert result["errors_per_bucket"] == {
+        "2023-10-27T10:00:00+00:00": 2,
+        "2023-10-27T10:01:00+00:00": 1,
+    }
+    assert result["top_trace_ids"] == [{"trace_id": "aaa", "count": 3}]
+    assert result["parse_error_rate"] == pytest.approx(0.2)
+
+    hourly = LogSummary(bucket="hour")
+    hourly.consume(parser.iter_entries(lines))
+    assert hourly.to_dict()["errors_per_bucket"] == {"2023-10-27T10:00:00+00:00": 3}
+
+def test_summary_buckets_are_utc(parser):
+    from src.summary import LogSummary
+
+    lines = [
+        # The same minute in three notations
+        "[2023-10-27T15:30:10+05:30] [ERROR] [aaa] boom",
+        "[2023-10-27T10:00:20Z] [ERROR] [aaa] boom",
+        "[2023-10-27T10:00:30] [ERROR] [aaa] boom",
+        # Later in UTC, though earlier as text
+        "[2023-10-27T09:31:00-01:00] [ERROR] [aaa] boom",
+    ]
+    summary = LogSummary(bucket="minute")
+    summary.consume(parser.iter_entries(lines))
+    assert list(summary.to_dict()["errors_per_bucket"].items()) == [
+        ("2023-10-27T10:00:00+00:00", 3),
+        ("2023-10-27T10:31:00+00:00", 1),
+    ]
+
+    # Hours are UTC hours, not hours of the entry's own offset
+    hourly = LogSummary(bucket="hour")
+    hourly.consume(parser.iter_entries(lines))
+    assert hourly.to_dict()["errors_per_bucket"] == {"2023-10-27T10:00:00+00:00": 4}
+
+def test_misra_gries_keeps_heavy_hitters_in_fixed_space():
+    from src.summary import MisraGries
+
+    sketch = MisraGries(capacity=10)
+    for i in range(10_000):
+        sketch.add("hot" if i % 3 == 0 else f"cold-{i}")
+        assert len(sketch.counts) <= 10
+
+    top = sketch.top(1)[0]
+    assert top["trace_id"] == "hot"
+    assert 3334 - sketch.error_bound <= top["count"] <= 3334